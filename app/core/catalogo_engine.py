@@ -3,14 +3,30 @@
 Catalogo Engine — carrega o catálogo oficial (planilha),
 normaliza em memória e expõe APIs para:
 - resolver_modelo_defeito(modelo_defeito) -> modelo_final, status
+- resolver_modelos_batch(series) -> DataFrame MODELO_FINAL/STATUS (coluna inteira)
 - listar_nao_contabilizados()
+- resumo_auditoria() / status_auditoria()  # auditoria sobre a base de defeitos (incremental)
 - atualizar_catalogo(novas_linhas)  # para aprendizado manual/automático
-Persistência do lookup é feita em data/processed/catalogo_lookup.parquet (ou .json).
+- compactar_lookup()                 # incorpora os deltas ao lookup base
+Persistência do lookup é feita em data/processed/catalogo_lookup.parquet (base) mais
+deltas append-only em data/processed/catalogo_lookup_deltas/ (um parquet por atualização,
+gravados sob trava de arquivo); a leitura aplica os deltas em ordem sobre a base.
+O resolver é compilado em memória (dois dicts) e recompilado quando o catálogo
+oficial ou o lookup persistido mudam (mtime/tamanho) ou após atualizar_catalogo.
 """
 
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
 from pathlib import Path
+import numpy as np
 import pandas as pd
-from typing import Optional, Tuple, Dict
+from typing import Optional, Tuple, Dict, List
+
+from services.text_normalizer import normalizar, normalizar_serie
+from utils.ingestao import ler_excel
 
 ROOT = Path.cwd()
 PATH_RAW = ROOT / "data" / "raw"
@@ -26,28 +42,34 @@ CANDIDATE_FILES = [
 
 # arquivo onde guardamos o lookup aprendido (apenas este arquivo pode ser gravado pelo sistema)
 LOOKUP_PATH = PATH_PROCESSED / "catalogo_lookup.parquet"
+LOOKUP_COLS = ["MODELO_DEFEITO", "SE_TRATA_DE", "CORRESPONDE_A", "MODELO_PRODUCAO", "MODELO_FINAL", "STATUS"]
+TRAVA_TIMEOUT_S = 30.0
+TRAVA_ORFA_S = 120.0  # trava mais velha que isso é de um processo que morreu
 
 # helpers de normalização (apenas em memória)
-def _safe_str(x) -> str:
-    if pd.isna(x):
-        return ""
-    return str(x).strip()
-
 def _norm(s: Optional[str]) -> str:
-    s = _safe_str(s).upper()
-    # compactar espaços e remover caracteres problemáticos mantendo ponto, - e /
-    s = " ".join(s.split())
-    s = ''.join(ch for ch in s if (ch.isalnum() or ch.isspace() or ch in ['-', '/', '.', '%']))
-    s = " ".join(s.split())
-    return s
+    # caixa alta, espaços compactados, só alfanuméricos e - / . % (modo "catalogo")
+    return normalizar(s, "catalogo")
+
+def _mapear_unicos(s: pd.Series, fn, nulo) -> np.ndarray:
+    """Aplica fn uma vez por valor distinto de s (nulos recebem `nulo`)."""
+    codigos, unicos = pd.factorize(s)
+    valores = np.empty(len(unicos) + 1, dtype=object)
+    valores[:-1] = fn(list(unicos))
+    valores[-1] = nulo
+    return valores[codigos]
+
+def _norm_series(s: pd.Series) -> pd.Series:
+    """_norm vetorizado (cada valor distinto é normalizado uma única vez)."""
+    return normalizar_serie(s, "catalogo")
 
 # carrega a planilha oficial (apenas leitura)
 def _load_catalogo_oficial() -> pd.DataFrame:
     for p in CANDIDATE_FILES:
         if p.exists():
-            # pandas lê xlsx/ods/csv automaticamente via engine
+            # pandas lê xlsx/ods/csv automaticamente via engine (planilhas via cache colunar)
             try:
-                df = pd.read_excel(p) if p.suffix.lower() in (".xlsx", ".ods", ".xls") else pd.read_csv(p)
+                df = ler_excel(p) if p.suffix.lower() in (".xlsx", ".ods", ".xls") else pd.read_csv(p)
             except Exception:
                 df = pd.read_csv(p, encoding="utf-8", engine="python")
             # padronizar colnames para facilitar
@@ -55,16 +77,112 @@ def _load_catalogo_oficial() -> pd.DataFrame:
             return df
     raise FileNotFoundError("Arquivo de catálogo não encontrado em data/raw/catalogo_modelos.*")
 
-# carrega lookup persistido (se existir)
+# -----------------------
+# Lookup persistido: base + deltas append-only
+# -----------------------
+def _dir_deltas() -> Path:
+    return LOOKUP_PATH.with_name(f"{LOOKUP_PATH.stem}_deltas")
+
+
+def _listar_deltas() -> List[Path]:
+    """Deltas em ordem de gravação (o nome começa pelo instante em ns)."""
+    d = _dir_deltas()
+    return sorted(d.glob("*.parquet")) if d.exists() else []
+
+
+@contextmanager
+def _trava_lookup(timeout: float = TRAVA_TIMEOUT_S):
+    """Trava exclusiva entre processos/sessões (arquivo criado com O_EXCL)."""
+    trava = LOOKUP_PATH.with_suffix(".lock")
+    limite = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(trava, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - trava.stat().st_mtime > TRAVA_ORFA_S:
+                    trava.unlink()
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() > limite:
+                raise TimeoutError(f"Trava do lookup ocupada: {trava}")
+            time.sleep(0.01)
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        yield
+    finally:
+        trava.unlink(missing_ok=True)
+
+
+def _dedup_por_chave(df: pd.DataFrame) -> pd.DataFrame:
+    """Última linha de cada MODELO_DEFEITO normalizado (deltas mais novos vencem)."""
+    chave = _norm_series(df["MODELO_DEFEITO"])
+    return df[~chave.duplicated(keep="last")]
+
+
+# carrega lookup persistido (se existir): base + deltas ainda não compactados
+def _assinatura_base() -> Optional[tuple]:
+    try:
+        st = LOOKUP_PATH.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
 def _load_persisted_lookup() -> pd.DataFrame:
-    if LOOKUP_PATH.exists():
-        return pd.read_parquet(LOOKUP_PATH)
+    # sem trava: deltas listados ANTES de ler a base; se a base mudou no meio
+    # (compactação concorrente trocou a base e apagou deltas), relê tudo
+    while True:
+        assinatura = _assinatura_base()
+        caminhos = _listar_deltas()
+        try:
+            partes = [pd.read_parquet(LOOKUP_PATH)] if assinatura is not None else []
+            deltas = [pd.read_parquet(p) for p in caminhos]
+        except FileNotFoundError:
+            continue  # compactação concorrente removeu um delta (já está na base): reler
+        if _assinatura_base() == assinatura:
+            break
+    if deltas:
+        return _dedup_por_chave(pd.concat(partes + deltas, ignore_index=True, sort=False)).reset_index(drop=True)
+    if partes:
+        return partes[0]
     # criar empty
     return pd.DataFrame(columns=["MODELO_DEFEITO", "SE_TRATA_DE", "CORRESPONDE_A", "MODELO_FINAL", "STATUS"])
 
+def _gravar_atomico(df: pd.DataFrame, path: Path):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
 # persiste lookup (sobrescreve arquivo de lookup apenas)
 def _save_lookup(df: pd.DataFrame):
-    df.to_parquet(LOOKUP_PATH, index=False)
+    _gravar_atomico(df, LOOKUP_PATH)
+
+def _anexar_delta(df: pd.DataFrame) -> Path:
+    """Grava um delta (custo proporcional às linhas novas, não ao lookup)."""
+    d = _dir_deltas()
+    d.mkdir(parents=True, exist_ok=True)
+    with _trava_lookup():
+        # sob a trava, o instante em ns dá a ordem total entre gravadores concorrentes
+        path = d / f"{time.time_ns():020d}-{os.getpid()}-{uuid.uuid4().hex[:8]}.parquet"
+        _gravar_atomico(df, path)
+    return path
+
+def _preenchido(s: pd.Series, exigir_texto: bool) -> np.ndarray:
+    """Valor utilizável do lookup persistido: não nulo, não vazio (e não só espaços)."""
+    def _ok(valores):
+        return [bool(v) and (not exigir_texto or str(v).strip() != "") for v in valores]
+    return _mapear_unicos(s, _ok, False).astype(bool)
+
+def _coalesce(df_merge: pd.DataFrame, col: str, exigir_texto: bool = True) -> pd.Series:
+    """Persistido (col_PERS) quando preenchido, senão oficial (col_OFF)."""
+    vazio = pd.Series(None, index=df_merge.index, dtype=object)
+    pers = df_merge.get(f"{col}_PERS", vazio).astype(object)
+    off = df_merge.get(f"{col}_OFF", vazio).astype(object)
+    return pers.where(_preenchido(pers, exigir_texto), off)
 
 # construir lookup combinado: oficial + persistido
 def build_lookup(force_reload: bool = False) -> pd.DataFrame:
@@ -103,51 +221,79 @@ def build_lookup(force_reload: bool = False) -> pd.DataFrame:
         if must not in df_official.columns:
             df_official[must] = ""
 
-    # normalize text (in-memory only)
-    df_official["MODELO_DEFEITO_NORM"] = df_official["MODELO_DEFEITO"].apply(_norm)
-    df_official["CORRESPONDE_A_NORM"] = df_official["CORRESPONDE_A"].apply(_norm)
-    df_official["MODELO_PRODUCAO_NORM"] = df_official["MODELO_PRODUCAO"].apply(_norm)
-
     # load persisted lookup and merge (persisted may contain manual corrections/additions)
     df_persist = _load_persisted_lookup()
     if not df_persist.empty:
-        df_persist["MODELO_DEFEITO_NORM"] = df_persist["MODELO_DEFEITO"].apply(_norm)
-        # If persisted overrides official, prefer persisted
-        # join by MODELO_DEFEITO_NORM
+        # persistido tem precedência sobre o oficial (join por MODELO_DEFEITO normalizado)
+        df_official["MODELO_DEFEITO_NORM"] = _norm_series(df_official["MODELO_DEFEITO"])
+        df_persist = df_persist.assign(MODELO_DEFEITO_NORM=_norm_series(df_persist["MODELO_DEFEITO"]))
         df_merge = pd.merge(df_official, df_persist, on="MODELO_DEFEITO_NORM", how="left", suffixes=("_OFF", "_PERS"))
-        # choose persistence if available
-        def coalesce(row, col):
-            v = row.get(f"{col}_PERS")
-            if v and str(v).strip():
-                return v
-            return row.get(f"{col}_OFF")
-        rows = []
-        for _, r in df_merge.iterrows():
-            modelo_defeito = r.get("MODELO_DEFEITO_PERS") if r.get("MODELO_DEFEITO_PERS") else r.get("MODELO_DEFEITO_OFF")
-            se_trata = coalesce(r, "SE_TRATA_DE")
-            corresponde = coalesce(r, "CORRESPONDE_A")
-            modelo_prod = coalesce(r, "MODELO_PRODUCAO")
-            rows.append({
-                "MODELO_DEFEITO": modelo_defeito,
-                "SE_TRATA_DE": se_trata,
-                "CORRESPONDE_A": corresponde,
-                "MODELO_PRODUCAO": modelo_prod
-            })
-        df_lookup = pd.DataFrame(rows)
+        df_lookup = pd.DataFrame({
+            col: _coalesce(df_merge, col, exigir_texto=(col != "MODELO_DEFEITO"))
+            for col in ["MODELO_DEFEITO", "SE_TRATA_DE", "CORRESPONDE_A", "MODELO_PRODUCAO"]
+        })
     else:
         df_lookup = df_official[["MODELO_DEFEITO", "SE_TRATA_DE", "CORRESPONDE_A", "MODELO_PRODUCAO"]].copy()
 
     # finalize: MODELO_FINAL = normalized CORRESPONDE_A (fallback: própria MODELO_DEFEITO se SE_TRATA_DE == PRODUTO)
-    df_lookup["MODELO_DEFEITO_NORM"] = df_lookup["MODELO_DEFEITO"].apply(_norm)
-    df_lookup["MODELO_FINAL"] = df_lookup["CORRESPONDE_A"].where(df_lookup["CORRESPONDE_A"].astype(str).str.strip() != "", df_lookup["MODELO_DEFEITO"])
-    df_lookup["MODELO_FINAL_NORM"] = df_lookup["MODELO_FINAL"].apply(_norm)
-    # mark status: se MODELO_PRODUCAO_NORM existe em lista de producao do catálogo -> OK, else NAO_CONTABILIZADO
-    prod_set = set(df_lookup["MODELO_PRODUCAO"].apply(_norm).unique())
-    df_lookup["STATUS"] = df_lookup["MODELO_PRODUCAO"].apply(lambda x: "OK" if _norm(x) in prod_set and _norm(x) != "" else "NAO_CONTABILIZADO")
+    corresponde_preenchido = _mapear_unicos(df_lookup["CORRESPONDE_A"], lambda us: [str(u).strip() != "" for u in us], True)
+    df_lookup["MODELO_FINAL"] = df_lookup["CORRESPONDE_A"].where(corresponde_preenchido.astype(bool), df_lookup["MODELO_DEFEITO"])
+    # mark status: MODELO_PRODUCAO preenchido -> OK, else NAO_CONTABILIZADO
+    # (o antigo teste "está no conjunto de produção do catálogo" usava o conjunto da própria coluna: sempre verdadeiro)
+    prod_norm = _norm_series(df_lookup["MODELO_PRODUCAO"])
+    df_lookup["STATUS"] = np.where(prod_norm != "", "OK", "NAO_CONTABILIZADO").astype(object)
     # keep only columns we need (in-memory)
     out = df_lookup[["MODELO_DEFEITO", "SE_TRATA_DE", "CORRESPONDE_A", "MODELO_PRODUCAO", "MODELO_FINAL", "STATUS"]].copy()
     return out
 
+# -----------------------
+# Resolver compilado (cache em memória)
+# -----------------------
+_RESOLVER: Optional[dict] = None
+
+
+def _assinatura_fontes() -> tuple:
+    """(caminho, mtime, tamanho) do catálogo oficial e do lookup persistido (base e deltas)."""
+    assinatura = []
+    for p in [*CANDIDATE_FILES, LOOKUP_PATH]:
+        st = p.stat() if p.exists() else None
+        assinatura.append((str(p), st.st_mtime_ns if st else None, st.st_size if st else None))
+    deltas = _listar_deltas()
+    assinatura.append((str(_dir_deltas()), deltas[-1].name if deltas else None, len(deltas)))
+    return tuple(assinatura)
+
+
+def _compilar_resolver(lookup: pd.DataFrame) -> dict:
+    """Dicts chave normalizada -> (MODELO_FINAL, STATUS); vale a primeira linha de cada chave."""
+    valores = list(zip(lookup["MODELO_FINAL"], lookup["STATUS"]))
+    por_defeito: Dict[str, Tuple[str, str]] = {}
+    por_producao: Dict[str, Tuple[str, str]] = {}
+    for k, v in zip(_norm_series(lookup["MODELO_DEFEITO"]), valores):
+        por_defeito.setdefault(k, v)
+    for k, v in zip(_norm_series(lookup["MODELO_PRODUCAO"]), valores):
+        por_producao.setdefault(k, v)
+    return {"por_defeito": por_defeito, "por_producao": por_producao}
+
+
+def invalidar_resolver():
+    global _RESOLVER
+    _RESOLVER = None
+
+
+def obter_resolver() -> dict:
+    """Resolver em memória, recompilado só quando as fontes mudam."""
+    global _RESOLVER
+    assinatura = _assinatura_fontes()
+    if _RESOLVER is None or _RESOLVER["assinatura"] != assinatura:
+        _RESOLVER = {"assinatura": assinatura, **_compilar_resolver(build_lookup())}
+    return _RESOLVER
+
+
+def _resolver_chave(resolver: dict, key: str) -> Optional[Tuple[str, str]]:
+    # busca direta por MODELO_DEFEITO normalizado; fallback: MODELO_PRODUCAO
+    return resolver["por_defeito"].get(key) or resolver["por_producao"].get(key)
+
+
 # API: resolver modelo defeito -> modelo_final, status
 def resolver_modelo_defeito(modelo_defeito: str) -> Tuple[str, str]:
     """
@@ -156,53 +302,212 @@ def resolver_modelo_defeito(modelo_defeito: str) -> Tuple[str, str]:
       modelo_final = string do modelo padronizado (a ser usado internamente pelo PPM)
       status = "OK" | "NAO_CONTABILIZADO" | "UNKNOWN"
     """
-    lookup = build_lookup()
-    key = _norm(modelo_defeito)
-    # busca direta por MODELO_DEFEITO normalizado
-    candidates = lookup[lookup["MODELO_DEFEITO"].apply(_norm) == key]
-    if not candidates.empty:
-        row = candidates.iloc[0]
-        return (row["MODELO_FINAL"], row["STATUS"])
-    # fallback: buscar se modelo_defeito corresponde diretamente a algum MODELO_PRODUCAO
-    cand2 = lookup[lookup["MODELO_PRODUCAO"].apply(_norm) == key]
-    if not cand2.empty:
-        row = cand2.iloc[0]
-        return (row["MODELO_FINAL"], row["STATUS"])
+    achado = _resolver_chave(obter_resolver(), _norm(modelo_defeito))
+    if achado is not None:
+        return achado
     # unknown -> retornar original (mas sinalizar)
     return (modelo_defeito, "UNKNOWN")
 
+
+def resolver_modelos_batch(modelos: pd.Series) -> pd.DataFrame:
+    """
+    Resolve uma coluna inteira de modelos de defeito (cada valor distinto uma única vez).
+    Retorna DataFrame (mesmo índice) com MODELO_FINAL e STATUS.
+    """
+    resolver = obter_resolver()
+    codigos, unicos = pd.factorize(modelos, use_na_sentinel=False)
+    finais = np.empty(len(unicos), dtype=object)
+    status = np.empty(len(unicos), dtype=object)
+    for i, valor in enumerate(unicos):
+        finais[i], status[i] = _resolver_chave(resolver, _norm(valor)) or (valor, "UNKNOWN")
+    return pd.DataFrame({"MODELO_FINAL": finais[codigos], "STATUS": status[codigos]}, index=modelos.index)
+
 # API: atualizar lookup (aprender novos mapeamentos)
 def atualizar_catalogo(novas_linhas: pd.DataFrame):
     """
     novas_linhas: DataFrame com colunas MODELO_DEFEITO, SE_TRATA_DE, CORRESPONDE_A, MODELO_PRODUCAO (opcional)
-    O método faz append/merge no arquivo LOOKUP_PATH (persistido), sem alterar os arquivos raw.
+    As linhas são gravadas como um delta append-only ao lado de LOOKUP_PATH (sem reler nem
+    regravar o lookup inteiro e sem alterar os arquivos raw); a leitura aplica os deltas em
+    ordem (última linha por MODELO_DEFEITO normalizado vence). Retorna as linhas gravadas.
     """
     if not isinstance(novas_linhas, pd.DataFrame):
         raise ValueError("novas_linhas deve ser um pandas.DataFrame")
-    # ler persistido, concatenar (usando MODELO_DEFEITO como chave), deduplicar por MODELO_DEFEITO_NORM
-    df_persist = _load_persisted_lookup()
-    base = df_persist.copy() if not df_persist.empty else pd.DataFrame(columns=["MODELO_DEFEITO", "SE_TRATA_DE", "CORRESPONDE_A", "MODELO_PRODUCAO", "MODELO_FINAL", "STATUS"])
+    novas_linhas = novas_linhas.copy()
     # compute MODELO_FINAL from CORRESPONDE_A (if provided)
     if "CORRESPONDE_A" in novas_linhas.columns:
         novas_linhas["MODELO_FINAL"] = novas_linhas["CORRESPONDE_A"].where(novas_linhas["CORRESPONDE_A"].astype(str).str.strip() != "", novas_linhas["MODELO_DEFEITO"])
     else:
         novas_linhas["MODELO_FINAL"] = novas_linhas["MODELO_DEFEITO"]
-    # concat and dedupe by normalized key
-    combined = pd.concat([base, novas_linhas], ignore_index=True, sort=False).fillna("")
-    combined["KEY"] = combined["MODELO_DEFEITO"].apply(_norm)
-    combined = combined.drop_duplicates(subset=["KEY"], keep="last")
+    delta = novas_linhas.reindex(columns=LOOKUP_COLS).astype(object).fillna("")
+    delta = _dedup_por_chave(delta).reset_index(drop=True)
     # recalc status (best-effort)
-    combined["STATUS"] = combined["MODELO_PRODUCAO"].apply(lambda x: "OK" if _norm(x) != "" else "NAO_CONTABILIZADO")
-    # keep columns
-    combined = combined[["MODELO_DEFEITO", "SE_TRATA_DE", "CORRESPONDE_A", "MODELO_PRODUCAO", "MODELO_FINAL", "STATUS"]]
-    _save_lookup(combined)
-    return combined
+    delta["STATUS"] = np.where(_norm_series(delta["MODELO_PRODUCAO"]) != "", "OK", "NAO_CONTABILIZADO").astype(object)
+    if not delta.empty:
+        _anexar_delta(delta)
+    invalidar_resolver()
+    return delta
+
+def compactar_lookup() -> int:
+    """
+    Incorpora os deltas pendentes ao lookup base (sob a trava) e remove-os.
+    Retorna quantos deltas foram compactados.
+    """
+    with _trava_lookup():
+        deltas = _listar_deltas()
+        if not deltas:
+            return 0
+        combined = _load_persisted_lookup().reindex(columns=LOOKUP_COLS).astype(object).fillna("")
+        combined["STATUS"] = np.where(_norm_series(combined["MODELO_PRODUCAO"]) != "", "OK", "NAO_CONTABILIZADO").astype(object)
+        _save_lookup(combined)
+        for p in deltas:
+            p.unlink(missing_ok=True)
+    invalidar_resolver()
+    print(f"[Catalogo] {len(deltas)} delta(s) compactado(s) em {LOOKUP_PATH.name}")
+    return len(deltas)
+
+# -----------------------
+# Auditoria sobre a base de defeitos (tabela-resumo incremental)
+# -----------------------
+# resumo por modelo (chave normalizada de DESCRICAO): LINHAS de defeito, MODELO_FINAL, STATUS
+# - linhas novas no fim da base: só elas são contadas (marca d'água = nº de linhas + hash da última)
+# - lookup/catálogo mudou: só os modelos distintos são resolvidos de novo (não as linhas)
+DEFEITOS_PATH = PATH_RAW / "base_de_dados_defeitos.xlsx"
+AUDITORIA_PATH = PATH_PROCESSED / "cache" / "catalogo_auditoria"
+RESUMO_COLS = ["CHAVE", "MODELO", "LINHAS", "MODELO_FINAL", "STATUS"]
+
+_AUDITORIA: Optional[dict] = None
+
+
+def _assinatura_arquivo(path: Path) -> Optional[list]:
+    if not path.exists():
+        return None
+    st = path.stat()
+    return [str(path), st.st_mtime_ns, st.st_size]
+
+
+def _hash_linha(df: pd.DataFrame, i: int) -> str:
+    return str(int(pd.util.hash_pandas_object(df.iloc[[i]].astype(str), index=False).iloc[0]))
+
+
+def _contar_modelos(descricoes: pd.Series) -> pd.DataFrame:
+    """CHAVE (_norm), MODELO (primeira grafia vista) e LINHAS por modelo."""
+    df = pd.DataFrame({"CHAVE": _norm_series(descricoes), "MODELO": descricoes.astype(object).values})
+    df = df[df["CHAVE"] != ""]
+    return df.groupby("CHAVE", sort=False).agg(MODELO=("MODELO", "first"), LINHAS=("MODELO", "size")).reset_index()
+
+
+def _somar_contagens(resumo: pd.DataFrame, novos: pd.DataFrame) -> pd.DataFrame:
+    if resumo.empty:
+        return novos.reindex(columns=RESUMO_COLS)
+    juntos = pd.concat([resumo, novos], ignore_index=True, sort=False)
+    somado = juntos.groupby("CHAVE", sort=False).agg(
+        MODELO=("MODELO", "first"), LINHAS=("LINHAS", "sum"),
+        MODELO_FINAL=("MODELO_FINAL", "first"), STATUS=("STATUS", "first"))
+    return somado.reset_index()[RESUMO_COLS]
+
+
+def _carregar_auditoria(path: Path) -> dict:
+    meta_path, resumo_path = path / "meta.json", path / "resumo.parquet"
+    if meta_path.exists() and resumo_path.exists():
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        return {**meta, "resumo": pd.read_parquet(resumo_path)}
+    return {"defeitos": None, "linhas": 0, "hash_ultima": None, "resolver": None,
+            "resumo": pd.DataFrame(columns=RESUMO_COLS)}
+
+
+def _salvar_auditoria(estado: dict, path: Path):
+    path.mkdir(parents=True, exist_ok=True)
+    _gravar_atomico(estado["resumo"], path / "resumo.parquet")
+    meta = {k: v for k, v in estado.items() if k != "resumo"}
+    tmp = path / f".meta.{os.getpid()}.tmp"
+    tmp.write_text(json.dumps(meta, default=str), encoding="utf-8")
+    os.replace(tmp, path / "meta.json")
+
+
+def _ler_descricoes(path: Path) -> pd.DataFrame:
+    df = ler_excel(path)
+    df.columns = [str(c).strip().upper() for c in df.columns]
+    if "DESCRICAO" not in df.columns:
+        raise ValueError("Coluna 'DESCRICAO' não encontrada na base de defeitos.")
+    return df
+
+
+def atualizar_auditoria(path_defeitos: Optional[Path] = None, path: Optional[Path] = None) -> pd.DataFrame:
+    """
+    Mantém a tabela-resumo da auditoria (memória + AUDITORIA_PATH) e a retorna.
+    Nada é relido se a base de defeitos e as fontes do catálogo não mudaram.
+    """
+    global _AUDITORIA
+    path_defeitos = Path(path_defeitos or DEFEITOS_PATH)
+    path = Path(path or AUDITORIA_PATH)
+    assinatura_def = _assinatura_arquivo(path_defeitos)
+    assinatura_res = [list(a) for a in _assinatura_fontes()]
+
+    estado = _AUDITORIA if _AUDITORIA is not None and _AUDITORIA["path"] == str(path) else None
+    if estado is None:
+        estado = {**_carregar_auditoria(path), "path": str(path)}
+    if estado["defeitos"] == assinatura_def and estado["resolver"] == assinatura_res:
+        _AUDITORIA = estado
+        return estado["resumo"]
+
+    resumo = estado["resumo"]
+    pendentes = np.ones(len(resumo), dtype=bool) if estado["resolver"] != assinatura_res else np.zeros(len(resumo), dtype=bool)
+    if estado["defeitos"] != assinatura_def:
+        df_def = _ler_descricoes(path_defeitos) if assinatura_def else pd.DataFrame(columns=["DESCRICAO"])
+        n = estado["linhas"]
+        continua = 0 < n <= len(df_def) and _hash_linha(df_def, n - 1) == estado["hash_ultima"]
+        if not continua:
+            resumo, n = pd.DataFrame(columns=RESUMO_COLS), 0  # base reescrita: recontagem completa
+        novos = _contar_modelos(df_def["DESCRICAO"].iloc[n:])
+        resumo = _somar_contagens(resumo, novos)
+        pendentes = np.ones(len(resumo), dtype=bool) if estado["resolver"] != assinatura_res or not continua \
+            else resumo["STATUS"].isna().to_numpy()
+        estado.update(defeitos=assinatura_def, linhas=len(df_def),
+                      hash_ultima=_hash_linha(df_def, len(df_def) - 1) if len(df_def) else None)
+
+    if pendentes.any():
+        resolver = obter_resolver()
+        resumo = resumo.astype({"MODELO_FINAL": object, "STATUS": object})
+        resolvidos = [_resolver_chave(resolver, k) or (m, "UNKNOWN")
+                      for k, m in zip(resumo["CHAVE"][pendentes], resumo["MODELO"][pendentes])]
+        resumo.loc[pendentes, "MODELO_FINAL"] = [r[0] for r in resolvidos]
+        resumo.loc[pendentes, "STATUS"] = [r[1] for r in resolvidos]
+    resumo["LINHAS"] = resumo["LINHAS"].astype("int64")
+
+    estado.update(resumo=resumo, resolver=assinatura_res)
+    _salvar_auditoria({k: v for k, v in estado.items() if k != "path"}, path)
+    _AUDITORIA = estado
+    return resumo
+
+
+def resumo_auditoria(path_defeitos: Optional[Path] = None) -> pd.DataFrame:
+    """Resumo por modelo da base de defeitos, com mais linhas afetadas primeiro."""
+    resumo = atualizar_auditoria(path_defeitos)
+    return resumo[["MODELO", "MODELO_FINAL", "STATUS", "LINHAS"]].sort_values(
+        "LINHAS", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def listar_nao_contabilizados(path_defeitos: Optional[Path] = None) -> pd.DataFrame:
+    """Modelos da base de defeitos que não entram no PPM (NAO_CONTABILIZADO ou UNKNOWN)."""
+    resumo = resumo_auditoria(path_defeitos)
+    return resumo[resumo["STATUS"] != "OK"].reset_index(drop=True)
+
 
 # helper para auditoria
-def status_auditoria() -> Dict[str, int]:
-    df = build_lookup()
-    total = len(df)
-    ok = len(df[df["STATUS"] == "OK"])
-    nao = len(df[df["STATUS"] != "OK"])
-    unknown = 0  # placeholders; resolver_modelo_defeito pode retornar UNKNOWN para itens não previstos
-    return {"total": total, "ok": ok, "nao_contabilizados": nao, "unknown": unknown}
\ No newline at end of file
+def status_auditoria(path_defeitos: Optional[Path] = None) -> Dict[str, int]:
+    """
+    Contagem de modelos (distintos) da base de defeitos por status e linhas de defeito afetadas.
+    """
+    resumo = atualizar_auditoria(path_defeitos)
+    modelos = resumo["STATUS"].value_counts()
+    linhas = resumo.groupby("STATUS")["LINHAS"].sum()
+    return {
+        "total": int(len(resumo)),
+        "ok": int(modelos.get("OK", 0)),
+        "nao_contabilizados": int(modelos.get("NAO_CONTABILIZADO", 0)),
+        "unknown": int(modelos.get("UNKNOWN", 0)),
+        "linhas_total": int(resumo["LINHAS"].sum()),
+        "linhas_ok": int(linhas.get("OK", 0)),
+        "linhas_nao_contabilizadas": int(linhas.get("NAO_CONTABILIZADO", 0)),
+        "linhas_unknown": int(linhas.get("UNKNOWN", 0)),
+    }
@@ -0,0 +1,193 @@
+# app/core/catalogo_trigramas.py
+"""
+Índice de trigramas do catálogo — sugestões para modelos UNKNOWN
+- entradas: valores normalizados (_norm) de MODELO_DEFEITO, CORRESPONDE_A e MODELO_PRODUCAO
+- índice invertido trigrama -> entradas (CSR do scipy), persistido em
+  data/processed/cache/catalogo_trigramas (npz + json)
+- score = Jaccard entre os conjuntos de trigramas (só entradas com trigramas em comum são tocadas)
+- reconstruído quando o catálogo oficial / lookup persistido mudam (mesma assinatura do resolver)
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from app.core import catalogo_engine
+
+INDEX_PATH = catalogo_engine.PATH_PROCESSED / "cache" / "catalogo_trigramas"
+COLUNAS_INDEXADAS = ["MODELO_DEFEITO", "CORRESPONDE_A", "MODELO_PRODUCAO"]
+
+
+def trigramas(texto: str) -> List[str]:
+    """Trigramas distintos de um texto já normalizado (com bordas: ' AB', 'AB ')."""
+    if not texto:
+        return []
+    t = f" {texto} "
+    return list(dict.fromkeys(t[i:i + 3] for i in range(len(t) - 2)))
+
+
+class IndiceTrigramas:
+    """
+    Índice invertido de trigramas sobre as entradas do catálogo.
+    Cada entrada guarda o texto normalizado e a resolução (MODELO_FINAL, STATUS)
+    da primeira linha do lookup em que aparece.
+    """
+
+    def __init__(self, textos: List[str], modelos_finais: List[str], status: List[str],
+                 vocabulario: Dict[str, int], matriz: sparse.csr_matrix, assinatura=None):
+        self.textos = textos
+        self.modelos_finais = modelos_finais
+        self.status = status
+        self.vocabulario = vocabulario
+        self.matriz = matriz                       # entradas x trigramas (binária)
+        self.invertido = matriz.T.tocsr()          # trigramas x entradas
+        self.tamanhos = np.diff(matriz.indptr)     # nº de trigramas por entrada
+        self.assinatura = assinatura
+
+    def __len__(self):
+        return len(self.textos)
+
+    # -----------------------
+    # Construção / persistência
+    # -----------------------
+    @classmethod
+    def construir(cls, lookup: pd.DataFrame, assinatura=None) -> "IndiceTrigramas":
+        entradas: Dict[str, Tuple[str, str]] = {}
+        for col in COLUNAS_INDEXADAS:
+            for texto, final, st in zip(catalogo_engine._norm_series(lookup[col]), lookup["MODELO_FINAL"], lookup["STATUS"]):
+                if texto and texto not in entradas:
+                    entradas[texto] = (final, st)
+
+        textos = list(entradas)
+        vocabulario: Dict[str, int] = {}
+        indices, indptr = [], [0]
+        for texto in textos:
+            indices.extend(vocabulario.setdefault(g, len(vocabulario)) for g in trigramas(texto))
+            indptr.append(len(indices))
+        matriz = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int32)),
+            shape=(len(textos), len(vocabulario)),
+        )
+        return cls(textos, [entradas[t][0] for t in textos], [entradas[t][1] for t in textos],
+                   vocabulario, matriz, assinatura)
+
+    def salvar(self, path: Optional[Path] = None):
+        path = Path(path or INDEX_PATH)
+        path.mkdir(parents=True, exist_ok=True)
+        sparse.save_npz(path / "matriz.tmp.npz", self.matriz)
+        meta = {
+            "assinatura": self.assinatura,
+            "textos": self.textos,
+            "modelos_finais": self.modelos_finais,
+            "status": self.status,
+            "vocabulario": self.vocabulario,
+        }
+        (path / "meta.tmp.json").write_text(json.dumps(meta, ensure_ascii=False, default=str), encoding="utf-8")
+        (path / "matriz.tmp.npz").replace(path / "matriz.npz")
+        (path / "meta.tmp.json").replace(path / "meta.json")
+
+    @classmethod
+    def carregar(cls, path: Optional[Path] = None) -> Optional["IndiceTrigramas"]:
+        path = Path(path or INDEX_PATH)
+        if not (path / "meta.json").exists() or not (path / "matriz.npz").exists():
+            return None
+        meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+        matriz = sparse.load_npz(path / "matriz.npz").tocsr()
+        if matriz.shape[0] != len(meta["textos"]):
+            return None
+        return cls(meta["textos"], meta["modelos_finais"], meta["status"], meta["vocabulario"],
+                   matriz, meta["assinatura"])
+
+    # -----------------------
+    # Busca
+    # -----------------------
+    def _ranquear(self, ids: np.ndarray, comuns: np.ndarray, n_trigramas: int,
+                  k: int, minimo: float) -> List[Tuple[int, float]]:
+        scores = comuns / (self.tamanhos[ids] + n_trigramas - comuns)
+        manter = scores >= minimo
+        ids, scores = ids[manter], scores[manter]
+        if len(ids) > k:
+            topo = np.argpartition(-scores, k - 1)[:k]
+            ids, scores = ids[topo], scores[topo]
+        ordem = np.lexsort((ids, -scores))  # score desc, empate pela ordem do catálogo
+        return [(int(ids[i]), float(scores[i])) for i in ordem]
+
+    def _resultado(self, pares: List[Tuple[int, float]]) -> List[dict]:
+        return [{"CANDIDATO": self.textos[i], "SCORE": round(s, 4),
+                 "MODELO_FINAL": self.modelos_finais[i], "STATUS": self.status[i]} for i, s in pares]
+
+    def buscar(self, texto: str, k: int = 5, minimo: float = 0.3) -> List[dict]:
+        """Candidatos ranqueados para um modelo (texto bruto; é normalizado aqui)."""
+        gs = trigramas(catalogo_engine._norm(texto))
+        ids_trigrama = [self.vocabulario[g] for g in gs if g in self.vocabulario]
+        if not ids_trigrama:
+            return []
+        inv = self.invertido
+        postings = np.concatenate([inv.indices[inv.indptr[g]:inv.indptr[g + 1]] for g in ids_trigrama])
+        ids, comuns = np.unique(postings, return_counts=True)
+        return self._resultado(self._ranquear(ids, comuns, len(gs), k, minimo))
+
+    def buscar_lote(self, textos: pd.Series, k: int = 5, minimo: float = 0.3) -> pd.DataFrame:
+        """
+        Candidatos para vários modelos de uma vez (produto esparso consultas x entradas).
+        Retorna DataFrame longo: CONSULTA, RANK, CANDIDATO, SCORE, MODELO_FINAL, STATUS.
+        """
+        consultas = list(pd.unique(textos.dropna().astype(str)))
+        indices, indptr, n_trigramas = [], [0], []
+        for texto in consultas:
+            gs = trigramas(catalogo_engine._norm(texto))
+            n_trigramas.append(len(gs))
+            indices.extend(self.vocabulario[g] for g in gs if g in self.vocabulario)
+            indptr.append(len(indices))
+        q = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int32)),
+            shape=(len(consultas), len(self.vocabulario)),
+        )
+        comuns = (q @ self.invertido).tocsr()
+
+        linhas = []
+        for i, consulta in enumerate(consultas):
+            ini, fim = comuns.indptr[i], comuns.indptr[i + 1]
+            pares = self._ranquear(comuns.indices[ini:fim], comuns.data[ini:fim].astype(np.int64), n_trigramas[i], k, minimo)
+            for rank, r in enumerate(self._resultado(pares), start=1):
+                linhas.append({"CONSULTA": consulta, "RANK": rank, **r})
+        return pd.DataFrame(linhas, columns=["CONSULTA", "RANK", "CANDIDATO", "SCORE", "MODELO_FINAL", "STATUS"])
+
+
+# -----------------------
+# Índice em memória / disco
+# -----------------------
+_INDICE: Optional[IndiceTrigramas] = None
+
+
+def _assinatura() -> list:
+    return [list(a) for a in catalogo_engine._assinatura_fontes()]
+
+
+def obter_indice(path: Optional[Path] = None) -> IndiceTrigramas:
+    """Índice atual: memória -> disco -> reconstrução (quando as fontes do catálogo mudam)."""
+    global _INDICE
+    assinatura = _assinatura()
+    if _INDICE is not None and _INDICE.assinatura == assinatura:
+        return _INDICE
+
+    indice = IndiceTrigramas.carregar(path)
+    if indice is None or indice.assinatura != assinatura:
+        indice = IndiceTrigramas.construir(catalogo_engine.build_lookup(), assinatura)
+        indice.salvar(path)
+    _INDICE = indice
+    return indice
+
+
+def sugerir_mapeamentos(modelos: pd.Series, k: int = 3, minimo: float = 0.3) -> pd.DataFrame:
+    """
+    Sugestões para os modelos de defeito que o resolver devolve como UNKNOWN
+    (todos os valores distintos resolvidos e buscados em lote).
+    """
+    resolvidos = catalogo_engine.resolver_modelos_batch(modelos)
+    unknowns = modelos[resolvidos["STATUS"] == "UNKNOWN"]
+    return obter_indice().buscar_lote(unknowns, k=k, minimo=minimo)
@@ -7,6 +7,8 @@
 import pandas as pd
 from pathlib import Path
 
+from utils.ingestao import ler_excel
+
 # Caminhos oficiais
 ROOT = Path.cwd()
 PATH_RAW = ROOT / "data" / "raw"
@@ -16,7 +18,7 @@ PATH_RAW = ROOT / "data" / "raw"
 # ------------------------------------------------------------
 def carregar_base_producao() -> pd.DataFrame:
     path = PATH_RAW / "base_de_dados_prod.xlsx"
-    df = pd.read_excel(path)
+    df = ler_excel(path)
 
     df.columns = df.columns.str.upper()
 
@@ -34,7 +36,7 @@ def carregar_base_producao() -> pd.DataFrame:
 
 def carregar_catalogo_modelos() -> pd.DataFrame:
     path = PATH_RAW / "catalogo_modelos.xlsx"
-    df = pd.read_excel(path)
+    df = ler_excel(path)
 
     df.columns = df.columns.str.upper()
 
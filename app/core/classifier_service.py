@@ -1,32 +1,198 @@
 # BLOCK 3 — services/classifier_service.py
 import json
+import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
-import joblib
-from services.text_normalizer import normalizar_texto
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from app.core.compiled_classifier import PreditorCompilado, probabilidade_ovr, probabilidades_de_decisao
+from app.core.model_registry import REGISTRO
+from services.text_normalizer import normalizar_lote, normalizar_texto
 
 PATH_MODELS = Path("models")
 PATH_LEXICON = PATH_MODELS / "lexicon.json"
 PATH_MODEL = PATH_MODELS / "classifier_v1.joblib"
 PATH_VECTORIZER = PATH_MODELS / "tfidf_vectorizer_v1.joblib"
+PATH_COMPILADO = PATH_MODELS / "compiled" / "classifier_v1"
+
+# predict_topk: confiança (probabilidade do 1º código) mínima para aceitar sem revisão.
+# Padrão só para modelos com predict_proba (LogisticRegression) sem limiar calibrado;
+# o limiar calibrado de cada versão fica em models/limiar_confianca_<versao>.json
+LIMIAR_CONFIANCA = 0.6
+PRECISAO_ALVO = 0.9
+MODELOS_COM_PROBABILIDADE = ("LogisticRegression",)
+ROTA_ACEITO = "ACEITO"
+ROTA_REVISAO = "REVISAO"
+
+class CachePredicoes:
+    """
+    Cache limitado das predições do modelo (texto normalizado -> código).
+    - politica "lru" (acerto renova a entrada) ou "fifo" (ordem de inserção)
+    - versao = SHA256 de lexicon + vetorizador + modelo; versão diferente esvazia o cache
+    - contadores: acertos, faltas, descartes (por tamanho) e invalidacoes (por versão)
+    """
+
+    POLITICAS = ("lru", "fifo")
+
+    def __init__(self, tamanho: int = 10_000, politica: str = "lru"):
+        if politica not in self.POLITICAS:
+            raise ValueError(f"politica deve ser uma de {self.POLITICAS}")
+        if tamanho < 1:
+            raise ValueError("tamanho deve ser >= 1")
+        self.tamanho = tamanho
+        self.politica = politica
+        self.versao: Optional[Tuple[str, ...]] = None
+        self._itens: "OrderedDict[str, str]" = OrderedDict()
+        self._trava = threading.Lock()
+        self.acertos = self.faltas = self.descartes = self.invalidacoes = 0
+
+    def __len__(self):
+        return len(self._itens)
+
+    def _conferir_versao(self, versao):
+        if versao != self.versao:
+            if self._itens:
+                self.invalidacoes += 1
+            self._itens.clear()
+            self.versao = versao
+
+    def obter(self, chave: str, versao) -> Optional[str]:
+        with self._trava:
+            self._conferir_versao(versao)
+            valor = self._itens.get(chave)
+            if valor is None:
+                self.faltas += 1
+                return None
+            self.acertos += 1
+            if self.politica == "lru":
+                self._itens.move_to_end(chave)
+            return valor
+
+    def guardar(self, chave: str, valor: str, versao):
+        with self._trava:
+            self._conferir_versao(versao)
+            self._itens[chave] = valor
+            if self.politica == "lru":
+                self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho:
+                self._itens.popitem(last=False)
+                self.descartes += 1
+
+    def limpar(self):
+        with self._trava:
+            self._itens.clear()
+
+    def stats(self) -> dict:
+        consultas = self.acertos + self.faltas
+        return {
+            "tamanho": len(self._itens), "capacidade": self.tamanho, "politica": self.politica,
+            "acertos": self.acertos, "faltas": self.faltas, "descartes": self.descartes,
+            "invalidacoes": self.invalidacoes,
+            "taxa_acerto": round(self.acertos / consultas, 4) if consultas else 0.0,
+        }
+
 
 class ClassifierService:
+    """
+    Lexicon + modelo (fallback). Os artefatos vêm do registro do processo
+    (app.core.model_registry): criar o serviço não lê nada do disco, e um
+    retreino que grava arquivos novos é visto no próximo acesso.
+    cache (opcional): CachePredicoes para as predições do modelo — textos que
+    não estão no lexicon e se repetem deixam de pagar transform + predict.
+    compilado: usa models/compiled/classifier_<modelo> (numpy + mmap, sem sklearn) quando
+    ele foi gerado a partir dos .joblib atuais; senão, vetorizador + modelo sklearn.
+    modelo: versão dos artefatos ("v1" padrão, "v2", ...); ver AvaliacaoSombra.
+    """
+
+    def __init__(self, registro=REGISTRO, cache: Optional[CachePredicoes] = None, compilado: bool = True,
+                 modelo: str = "v1"):
+        self.registro = registro
+        self.cache = cache
+        self.compilado = compilado
+        self.modelo = modelo
+
+    def _caminhos(self) -> Tuple[Path, Path, Path]:
+        """(vetorizador, modelo, compilado) da versão em uso."""
+        if self.modelo == "v1":
+            return PATH_VECTORIZER, PATH_MODEL, PATH_COMPILADO
+        return (PATH_MODELS / f"tfidf_vectorizer_{self.modelo}.joblib",
+                PATH_MODELS / f"classifier_{self.modelo}.joblib",
+                PATH_MODELS / "compiled" / f"classifier_{self.modelo}")
+
+    @property
+    def lexicon(self) -> dict:
+        return self.registro.obter(PATH_LEXICON) or {}
+
+    @property
+    def vectorizer(self):
+        return self.registro.obter(self._caminhos()[0])
 
-    def __init__(self):
-        # carregar lexicon
-        self.lexicon = {}
-        if PATH_LEXICON.exists():
-            with open(PATH_LEXICON, "r", encoding="utf-8") as f:
-                self.lexicon = json.load(f)
+    @property
+    def model(self):
+        return self.registro.obter(self._caminhos()[1])
 
-        # carregar modelo (fallback)
-        self.vectorizer = None
-        self.model = None
+    def preditor_compilado(self) -> Optional[PreditorCompilado]:
+        """Formato compilado em dia com os .joblib (SHA256 de origem confere) ou None."""
+        if not self.compilado:
+            return None
+        path_vectorizer, path_model, path_compilado = self._caminhos()
+        try:
+            preditor = self.registro.obter(path_compilado / "meta.json", carregar=PreditorCompilado.carregar)
+        except (OSError, ValueError, KeyError):
+            return None
+        if preditor is None:
+            return None
+        origem = preditor.origem
+        if (origem.get("vectorizer") != self.registro.sha256(path_vectorizer)
+                or origem.get("classifier") != self.registro.sha256(path_model)):
+            return None  # compilado desatualizado (retreino sem nova exportação)
+        return preditor
 
-        if PATH_VECTORIZER.exists():
-            self.vectorizer = joblib.load(PATH_VECTORIZER)
+    def versao(self) -> Tuple[str, ...]:
+        """SHA256 dos artefatos em uso (lexicon, vetorizador, modelo), sem carregá-los."""
+        return tuple(self.registro.sha256(p) or "" for p in (PATH_LEXICON, *self._caminhos()[:2]))
 
-        if PATH_MODEL.exists():
-            self.model = joblib.load(PATH_MODEL)
+    def _inferencia(self) -> Optional[Callable[[List[str]], Iterable]]:
+        preditor = self.preditor_compilado()
+        if preditor is not None:
+            return preditor.predict
+        model, vectorizer = self.model, self.vectorizer
+        if model and vectorizer:
+            return lambda chaves: model.predict(vectorizer.transform(chaves))  # CSR: o modelo linear aceita esparso
+        return None
+
+    def _decisao(self) -> Optional[Tuple[np.ndarray, Callable[[List[str]], np.ndarray], bool]]:
+        """(classes, chaves -> função de decisão, ovr) do compilado ou do sklearn."""
+        preditor = self.preditor_compilado()
+        if preditor is not None:
+            return preditor.classes, preditor.decision_function, preditor.meta.get("probabilidade") == "ovr"
+        model, vectorizer = self.model, self.vectorizer
+        if not (model and vectorizer):
+            return None
+        return (model.classes_, lambda chaves: model.decision_function(vectorizer.transform(chaves)),
+                probabilidade_ovr(model))
+
+    def _predizer_modelo(self, chaves: List[str]) -> Optional[Dict[str, str]]:
+        """Predição do modelo para chaves normalizadas distintas (cache -> uma única inferência)."""
+        inferir = self._inferencia()
+        if inferir is None:
+            return None
+        por_chave = {}
+        if self.cache is not None:
+            versao = self.versao()
+            for k in chaves:
+                pred = self.cache.obter(k, versao)
+                if pred is not None:
+                    por_chave[k] = pred
+            chaves = [k for k in chaves if k not in por_chave]
+        if chaves:
+            novos = dict(zip(chaves, (str(p) for p in inferir(chaves))))
+            por_chave.update(novos)
+            if self.cache is not None:
+                for k, pred in novos.items():
+                    self.cache.guardar(k, pred, versao)
+        return por_chave
 
     def predict(self, raw_text: str) -> str:
         """
@@ -40,13 +206,283 @@ class ClassifierService:
         key = normalizar_texto(raw_text)
 
         # PRIORIDADE MÁXIMA → se está no lexicon, retorna sempre o valor real
-        if key in self.lexicon:
-            return self.lexicon[key]
+        lexicon = self.lexicon
+        if key in lexicon:
+            return lexicon[key]
 
         # fallback com o modelo (às vezes não será necessário)
-        if self.model and self.vectorizer:
-            x = self.vectorizer.transform([key]).toarray()
-            pred = self.model.predict(x)[0]
-            return str(pred)
+        por_chave = self._predizer_modelo([key])
+        return por_chave[key] if por_chave is not None else ""
+
+    def _chaves(self, texts: Iterable[str]) -> Tuple[np.ndarray, List[Optional[str]]]:
+        """
+        (código de cada texto, chave normalizada de cada texto distinto).
+        Chave None para texto vazio/None (predict devolve "").
+        """
+        # dict e não pd.factorize: None e NaN precisam continuar distintos (predict(None) == "")
+        indice = {}
+        codigos = np.fromiter((indice.setdefault(t, len(indice)) for t in texts), dtype=np.int64)
+        distintos = list(indice)
+        cheios = [i for i, t in enumerate(distintos) if t]
+        chaves: List[Optional[str]] = [None] * len(distintos)
+        for i, chave in zip(cheios, normalizar_lote([distintos[i] for i in cheios])):
+            chaves[i] = chave
+        return codigos, chaves
+
+    def _resolver_lexicon(self, chaves: List[Optional[str]], usar_lexicon: bool = True) -> Tuple[np.ndarray, List[int]]:
+        """(predições do lexicon, posições das chaves que precisam do modelo)."""
+        lexicon = self.lexicon if usar_lexicon else {}
+        preds = np.array([lexicon.get(k, "") if k is not None else "" for k in chaves], dtype=object)
+        faltantes = [i for i, k in enumerate(chaves) if k is not None and k not in lexicon]
+        return preds, faltantes
+
+    def _completar_com_modelo(self, preds: np.ndarray, chaves: List[Optional[str]], faltantes: List[int]):
+        if faltantes:
+            por_chave = self._predizer_modelo(list(dict.fromkeys(chaves[i] for i in faltantes)))
+            if por_chave is not None:
+                preds[faltantes] = [por_chave[chaves[i]] for i in faltantes]
+
+    def predict_batch(self, texts: Iterable[str]) -> List[str]:
+        """
+        Mesmo resultado de [predict(t) for t in texts], em lote:
+        1) cada texto distinto é normalizado uma única vez
+        2) acertos no lexicon resolvidos por dict (sem passar pelo modelo)
+        3) os que faltam (e não estão no cache, se houver) passam por uma única
+           inferência do modelo
+        """
+        codigos, chaves = self._chaves(texts)
+        if not len(codigos):
+            return []
+        preds, faltantes = self._resolver_lexicon(chaves)
+        self._completar_com_modelo(preds, chaves, faltantes)
+        return preds[codigos].tolist()
+
+    def _caminho_limiar(self) -> Path:
+        return PATH_MODELS / f"limiar_confianca_{self.modelo}.json"
+
+    def _tipo_modelo(self) -> Optional[str]:
+        preditor = self.preditor_compilado()
+        if preditor is not None:
+            return preditor.meta.get("tipo_modelo")
+        model = self.model
+        return type(model).__name__ if model is not None else None
+
+    def limiar_confianca(self) -> Optional[float]:
+        """
+        Limiar de roteamento da versão em uso:
+        - calibrado (calibrar_limiar) para os .joblib atuais -> valor gravado
+          (inf quando nenhum limiar atinge a precisão: o modelo nunca aceita sozinho)
+        - sem calibração, LogisticRegression -> LIMIAR_CONFIANCA
+        - sem calibração, demais (LinearSVC: softmax da decisão, não é probabilidade) -> None
+        """
+        path_vectorizer, path_model, _ = self._caminhos()
+        calibrado = self.registro.obter(self._caminho_limiar())
+        if (calibrado and calibrado.get("vectorizer") == self.registro.sha256(path_vectorizer)
+                and calibrado.get("classifier") == self.registro.sha256(path_model)):
+            return np.inf if calibrado["limiar"] is None else float(calibrado["limiar"])
+        if self._tipo_modelo() in MODELOS_COM_PROBABILIDADE:
+            return LIMIAR_CONFIANCA
+        return None
+
+    def calibrar_limiar(self, texts: Iterable[str], esperado: Iterable, precisao: float = PRECISAO_ALVO,
+                        gravar: bool = True) -> dict:
+        """
+        Menor limiar de CONFIANCA cujas predições aceitas (só modelo, sem lexicon)
+        acertam pelo menos `precisao` do código esperado (COD_FALHA) no conjunto de
+        validação. gravar=True salva em models/limiar_confianca_<versao>.json,
+        amarrado ao SHA256 do vetorizador e do modelo (retreino invalida).
+        """
+        topk = self.predict_topk(texts, k=1, limiar=0.0, usar_lexicon=False)
+        if topk.empty:
+            raise ValueError("conjunto de validação vazio")
+        esperado = np.asarray([str(e) for e in esperado], dtype=object)
+        modelo = (topk["ORIGEM"] == "MODELO").to_numpy()
+        limiar, cobertura = limiar_para_precisao(
+            topk["CONFIANCA"].to_numpy()[modelo], topk["CODIGO_1"].to_numpy()[modelo] == esperado[modelo], precisao)
+
+        path_vectorizer, path_model, _ = self._caminhos()
+        calibrado = {
+            "versao": self.modelo,
+            "limiar": None if np.isinf(limiar) else limiar,
+            "precisao_alvo": precisao,
+            "cobertura": cobertura,
+            "linhas": int(modelo.sum()),
+            "vectorizer": self.registro.sha256(path_vectorizer),
+            "classifier": self.registro.sha256(path_model),
+        }
+        if gravar:
+            destino = self._caminho_limiar()
+            tmp = destino.with_name(f".{destino.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(calibrado, ensure_ascii=False, indent=2), encoding="utf-8")
+            tmp.replace(destino)
+        return calibrado
+
+    def predict_topk(self, texts: Iterable[str], k: int = 3, limiar: Optional[float] = None,
+                     usar_lexicon: bool = True):
+        """
+        Top-k códigos com probabilidade, em lote, e rota por confiança.
+        Retorna DataFrame (uma linha por texto, na ordem de entrada):
+        CODIGO_1..k, PROB_1..k, CONFIANCA (= PROB_1), ORIGEM e ROTA.
+        - lexicon: CODIGO_1 do lexicon, confiança 1.0 (ORIGEM "LEXICON")
+        - demais: uma única matriz predict_proba para as chaves distintas; top-k
+          por argpartition (ORIGEM "MODELO")
+        - texto vazio ou sem modelo disponível: CODIGO_1 "" e confiança 0 (ORIGEM "VAZIO")
+        - ROTA "ACEITO" se CONFIANCA >= limiar, senão "REVISAO" (ver fila_revisao);
+          limiar=None usa limiar_confianca() e recusa (ValueError) modelos sem limiar
+          calibrado cuja confiança não é probabilidade
+        CODIGO_1 é sempre igual a predict_batch(texts) (com usar_lexicon=True).
+        O cache de predições não é usado aqui (guarda só o código, não as probabilidades).
+        """
+        import pandas as pd
+
+        if k < 1:
+            raise ValueError("k deve ser >= 1")
+        if limiar is None:
+            limiar = self.limiar_confianca()
+            if limiar is None:
+                raise ValueError(
+                    f"modelo {self.modelo} ({self._tipo_modelo()}) sem limiar calibrado: a confiança não é "
+                    "probabilidade. Rode calibrar_limiar ou informe `limiar`.")
+        cols_cod = [f"CODIGO_{i}" for i in range(1, k + 1)]
+        cols_prob = [f"PROB_{i}" for i in range(1, k + 1)]
+        colunas = cols_cod + cols_prob + ["CONFIANCA", "ORIGEM", "ROTA"]
+
+        codigos, chaves = self._chaves(texts)
+        if not len(codigos):
+            return pd.DataFrame(columns=colunas)
+        lexicon = self.lexicon if usar_lexicon else {}
+
+        n = len(chaves)
+        top_cod = np.full((n, k), None, dtype=object)
+        top_prob = np.full((n, k), np.nan)
+        top_cod[:, 0] = ""
+        top_prob[:, 0] = 0.0
+        origem = np.full(n, "VAZIO", dtype=object)
+
+        no_lexicon = [i for i, c in enumerate(chaves) if c is not None and c in lexicon]
+        top_cod[no_lexicon, 0] = [lexicon[chaves[i]] for i in no_lexicon]
+        top_prob[no_lexicon, 0] = 1.0
+        origem[no_lexicon] = "LEXICON"
+
+        faltantes = [i for i, c in enumerate(chaves) if c is not None and c not in lexicon]
+        decisao = self._decisao() if faltantes else None
+        if decisao is not None:
+            classes, decidir, ovr = decisao
+            distintas = list(dict.fromkeys(chaves[i] for i in faltantes))
+            linha = {c: j for j, c in enumerate(distintas)}
+            scores = np.asarray(decidir(distintas), dtype=np.float64)
+            # uma única matriz: probabilidades = predict_proba do LogisticRegression
+            # (softmax da decisão; para LinearSVC, confiança aproximada pelo mesmo softmax)
+            proba = probabilidades_de_decisao(scores, ovr=ovr)
+            if scores.ndim == 1 or scores.shape[1] == 1:  # binário: classe 1 se decisão > 0
+                scores = np.column_stack([np.zeros(len(scores)), scores.reshape(-1)])
+            # ordena pela decisão (monotônica com a probabilidade, sem perder empates
+            # no exp): prob. decrescente, empate pela ordem das classes (= predict)
+            kk = min(k, scores.shape[1])
+            if kk < scores.shape[1]:
+                topo = np.argpartition(-scores, kk - 1, axis=1)[:, :kk]
+            else:
+                topo = np.tile(np.arange(scores.shape[1]), (len(distintas), 1))
+            ordem = np.lexsort((topo, -np.take_along_axis(scores, topo, axis=1)), axis=1)
+            topo = np.take_along_axis(topo, ordem, axis=1)
+            p_topo = np.take_along_axis(proba, topo, axis=1)
+
+            linhas = [linha[chaves[i]] for i in faltantes]
+            top_cod[np.ix_(faltantes, range(kk))] = np.asarray(classes).astype(str).astype(object)[topo[linhas]]
+            top_prob[np.ix_(faltantes, range(kk))] = p_topo[linhas]
+            origem[faltantes] = "MODELO"
+
+        df = pd.DataFrame(top_cod[codigos], columns=cols_cod)
+        df[cols_prob] = top_prob[codigos]
+        df["CONFIANCA"] = df["PROB_1"]
+        df["ORIGEM"] = origem[codigos]
+        df["ROTA"] = np.where(df["CONFIANCA"] >= limiar, ROTA_ACEITO, ROTA_REVISAO)
+        return df
+
+
+def limiar_para_precisao(confianca: np.ndarray, acertos: np.ndarray, precisao: float) -> Tuple[float, float]:
+    """
+    (limiar, cobertura): menor limiar t em que as predições com confiança >= t
+    acertam pelo menos `precisao`; cobertura = fração aceita. Nenhum -> (inf, 0.0).
+    """
+    confianca = np.asarray(confianca, dtype=np.float64)
+    if not len(confianca):
+        return np.inf, 0.0
+    ordem = np.argsort(-confianca, kind="stable")
+    conf = confianca[ordem]
+    prec = np.cumsum(np.asarray(acertos, dtype=bool)[ordem]) / np.arange(1, len(conf) + 1)
+    # só cortes entre valores distintos (empates são aceitos ou recusados juntos)
+    corte = np.append(conf[1:] < conf[:-1], True)
+    validos = np.flatnonzero(corte & (prec >= precisao))
+    if not len(validos):
+        return np.inf, 0.0
+    i = validos[-1]
+    return float(conf[i]), round(float((i + 1) / len(conf)), 4)
+
+
+def fila_revisao(df, topk):
+    """
+    Fila de revisão manual: linhas de `df` cuja predição (topk = predict_topk
+    sobre as mesmas linhas) ficou abaixo do limiar, menos confiantes primeiro.
+    """
+    revisar = (topk["ROTA"] == ROTA_REVISAO).to_numpy()
+    fila = df.loc[revisar].copy()
+    for col in topk.columns:
+        fila[col] = topk.loc[revisar, col].to_numpy()
+    return fila.sort_values("CONFIANCA", kind="stable")
+
+
+class AvaliacaoSombra:
+    """
+    Avaliação sombra de várias versões (padrão v1 e v2) sobre o mesmo lote:
+    normalização e lexicon rodam uma única vez; cada versão só paga a inferência
+    das chaves distintas que faltaram no lexicon (usar_lexicon=False: de todas).
+    Os artefatos de cada versão ficam no registro do processo (carregados uma vez).
+    """
+
+    def __init__(self, versoes: Tuple[str, ...] = ("v1", "v2"), registro=REGISTRO, compilado: bool = True):
+        self.versoes = tuple(versoes)
+        self.servicos = {v: ClassifierService(registro, compilado=compilado, modelo=v) for v in self.versoes}
+
+    def predict_batch(self, texts: Iterable[str], usar_lexicon: bool = True):
+        """DataFrame (uma linha por texto): TEXTO_NORMALIZADO e CODIGO_<versao> de cada versão."""
+        import pandas as pd
+
+        base = self.servicos[self.versoes[0]]
+        codigos, chaves = base._chaves(texts)
+        preds, faltantes = base._resolver_lexicon(chaves, usar_lexicon)
+        df = pd.DataFrame({"TEXTO_NORMALIZADO": np.array(chaves, dtype=object)[codigos] if len(codigos) else []})
+        for versao, svc in self.servicos.items():
+            preds_versao = preds.copy()
+            svc._completar_com_modelo(preds_versao, chaves, faltantes)
+            df[f"CODIGO_{versao}"] = preds_versao[codigos] if len(codigos) else []
+        return df
+
+    def avaliar(self, texts: Iterable[str], esperado: Iterable, usar_lexicon: bool = True):
+        """
+        Compara cada versão com o código esperado (COD_FALHA). Retorna (resumo, discordancias):
+        - resumo: VERSAO, LINHAS, ACERTOS, ACURACIA (%)
+        - discordancias: textos em que as versões divergem, agrupados
+          (TEXTO_NORMALIZADO, ESPERADO, CODIGO_<versao>..., LINHAS), mais frequentes primeiro
+        """
+        import pandas as pd
+
+        df = self.predict_batch(texts, usar_lexicon)
+        df["ESPERADO"] = pd.Series(list(esperado), dtype=object).astype(str).to_numpy()
+        cols = [f"CODIGO_{v}" for v in self.versoes]
+
+        resumo = pd.DataFrame([
+            {"VERSAO": v, "LINHAS": len(df), "ACERTOS": int((df[c].astype(str) == df["ESPERADO"]).sum())}
+            for v, c in zip(self.versoes, cols)
+        ], columns=["VERSAO", "LINHAS", "ACERTOS"])
+        resumo["ACURACIA"] = (resumo["ACERTOS"] / resumo["LINHAS"].where(resumo["LINHAS"] > 0) * 100).round(2).fillna(0.0)
 
-        return ""
+        diverge = (df[cols].nunique(axis=1) > 1) if len(cols) > 1 else pd.Series(False, index=df.index)
+        discordancias = (
+            df[diverge]
+            .groupby(["TEXTO_NORMALIZADO", "ESPERADO", *cols], dropna=False).size()
+            .reset_index(name="LINHAS")
+            .sort_values(["LINHAS", "TEXTO_NORMALIZADO"], ascending=[False, True], kind="stable")
+            .reset_index(drop=True)
+        )
+        return resumo, discordancias
@@ -0,0 +1,266 @@
+# app/core/compiled_classifier.py
+"""
+Formato compilado de inferência (TF-IDF + classificador linear) — sem sklearn
+- exportar: vocabulário + IDF do TfidfVectorizer e coeficientes/intercepto do
+  LogisticRegression (ou LinearSVC) em arrays float32 .npy, abertos com mmap
+  (só o intercepto, n_classes valores, fica em float64: classes empatadas no
+  intercepto — textos sem termo conhecido — precisam do mesmo desempate do sklearn)
+- coeficientes guardados por termo (CSR: indptr/indices/data); poda opcional de
+  |coef| < limiar_poda
+- PreditorCompilado reproduz vectorizer.transform + model.predict só com numpy
+  (regex de tokens, n-gramas, tf * idf, norma L2, argmax da função de decisão)
+  e predict_proba (softmax da decisão; LinearSVC, que não tem probabilidade,
+  recebe o mesmo softmax como confiança aproximada)
+- meta.json guarda o SHA256 dos .joblib de origem: compilado desatualizado é ignorado
+
+Execução (gera models/compiled/classifier_v1):
+    python -m app.core.compiled_classifier --versao v1 [--poda 1e-4]
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from utils.checksum import generate_sha256
+
+PATH_MODELS = Path("models")
+PATH_COMPILADOS = PATH_MODELS / "compiled"
+FORMATO = 1
+_ARRAYS = ("idf", "coef_indptr", "coef_indices", "coef_data", "intercept")
+
+
+def caminho_compilado(versao: str) -> Path:
+    return PATH_COMPILADOS / f"classifier_{versao}"
+
+
+def probabilidades_de_decisao(scores: np.ndarray, ovr: bool = False) -> np.ndarray:
+    """
+    Função de decisão -> probabilidades por classe (linhas somam 1), como o
+    predict_proba do LogisticRegression: softmax (multinomial), sigmoides
+    normalizadas (ovr) ou sigmoide (binário, uma coluna de decisão).
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    if scores.ndim == 1 or scores.shape[1] == 1:
+        p = 1.0 / (1.0 + np.exp(-scores.reshape(-1)))
+        return np.column_stack([1.0 - p, p])
+    if ovr:
+        p = 1.0 / (1.0 + np.exp(-scores))
+        return p / p.sum(axis=1, keepdims=True)
+    p = np.exp(scores - scores.max(axis=1, keepdims=True))
+    return p / p.sum(axis=1, keepdims=True)
+
+
+def probabilidade_ovr(model) -> bool:
+    """LogisticRegression um-contra-todos (liblinear / multi_class="ovr")."""
+    params = model.get_params() if hasattr(model, "get_params") else {}
+    return type(model).__name__ == "LogisticRegression" and (
+        params.get("multi_class") == "ovr" or params.get("solver") == "liblinear")
+
+
+# -----------------------
+# Exportação (usa os objetos sklearn já treinados)
+# -----------------------
+def compilar_modelo(vectorizer, model, destino: Path, limiar_poda: float = 0.0,
+                    origem: Optional[dict] = None) -> dict:
+    """
+    Grava o formato compilado em `destino` (troca atômica do diretório).
+    Retorna o meta.json gravado.
+    """
+    params = vectorizer.get_params()
+    suportado = (params["analyzer"] == "word" and params["tokenizer"] is None and params["preprocessor"] is None
+                 and params["strip_accents"] is None and params["stop_words"] is None and not params["binary"]
+                 and not params["sublinear_tf"] and params["norm"] in ("l2", None))
+    if not suportado:
+        raise ValueError(f"Configuração do TfidfVectorizer não suportada pelo formato compilado: {params}")
+
+    termos = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+    idf = vectorizer.idf_ if params["use_idf"] else np.ones(len(termos))
+    coef = np.asarray(model.coef_, dtype=np.float64)        # classes (ou 1, se binário) x termos
+    intercept = np.broadcast_to(np.asarray(model.intercept_, dtype=np.float64), (coef.shape[0],))
+
+    por_termo = coef.T.copy()                                # termos x classes
+    manter = np.abs(por_termo) >= limiar_poda if limiar_poda > 0 else por_termo != 0
+    contagem = manter.sum(axis=1)
+    indptr = np.concatenate([[0], np.cumsum(contagem)]).astype(np.int32)
+    linhas, colunas = np.nonzero(manter)
+
+    tmp = destino.with_name(f".{destino.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    arrays = {
+        "idf": idf.astype(np.float32),
+        "coef_indptr": indptr,
+        "coef_indices": colunas.astype(np.int16 if coef.shape[0] <= np.iinfo(np.int16).max else np.int32),
+        "coef_data": por_termo[linhas, colunas].astype(np.float32),
+        "intercept": intercept.astype(np.float64),  # n_classes valores: float64 preserva desempates
+    }
+    for nome, arr in arrays.items():
+        np.save(tmp / f"{nome}.npy", np.ascontiguousarray(arr))
+    meta = {
+        "formato": FORMATO,
+        "tipo_modelo": type(model).__name__,
+        "classes": [str(c) for c in model.classes_],
+        "termos": termos,
+        "lowercase": bool(params["lowercase"]),
+        "token_pattern": params["token_pattern"],
+        "ngram_range": list(params["ngram_range"]),
+        "norm": params["norm"],
+        "probabilidade": "ovr" if probabilidade_ovr(model) else "softmax",
+        "limiar_poda": float(limiar_poda),
+        "coeficientes": int(coef.size),
+        "coeficientes_mantidos": int(len(linhas)),
+        "origem": origem or {},
+    }
+    (tmp / "meta.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    antigo = destino.with_name(f".{destino.name}.{os.getpid()}.old")
+    if destino.exists():
+        destino.rename(antigo)
+    tmp.rename(destino)
+    shutil.rmtree(antigo, ignore_errors=True)
+    return meta
+
+
+def compilar_versao(versao: str = "v1", limiar_poda: float = 0.0, path_models: Path = PATH_MODELS) -> Tuple[Path, dict]:
+    """Compila models/tfidf_vectorizer_<versao>.joblib + classifier_<versao>.joblib."""
+    import joblib  # só a exportação depende de sklearn/joblib
+
+    path_vec = path_models / f"tfidf_vectorizer_{versao}.joblib"
+    path_clf = path_models / f"classifier_{versao}.joblib"
+    origem = {"vectorizer": generate_sha256(path_vec), "classifier": generate_sha256(path_clf)}
+    destino = path_models / "compiled" / f"classifier_{versao}"
+    meta = compilar_modelo(joblib.load(path_vec), joblib.load(path_clf), destino, limiar_poda, origem)
+    return destino, meta
+
+
+# -----------------------
+# Predição (numpy puro, arrays em mmap)
+# -----------------------
+class PreditorCompilado:
+
+    def __init__(self, meta: dict, arrays: dict):
+        self.meta = meta
+        self.classes = np.asarray(meta["classes"], dtype=object)
+        self.vocabulario = {t: i for i, t in enumerate(meta["termos"])}
+        self.origem = meta.get("origem", {})
+        self._token = re.compile(meta["token_pattern"])
+        self._ngram_min, self._ngram_max = meta["ngram_range"]
+        self.idf = arrays["idf"]
+        self.indptr = arrays["coef_indptr"]
+        self.indices = arrays["coef_indices"]
+        self.data = arrays["coef_data"]
+        self.intercept = arrays["intercept"]
+
+    @classmethod
+    def carregar(cls, path: Path, mmap: bool = True) -> "PreditorCompilado":
+        """`path`: diretório compilado ou seu meta.json."""
+        path = Path(path)
+        pasta = path.parent if path.name == "meta.json" else path
+        meta = json.loads((pasta / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("formato") != FORMATO:
+            raise ValueError(f"Formato compilado {meta.get('formato')} não suportado em {pasta}")
+        arrays = {n: np.load(pasta / f"{n}.npy", mmap_mode="r" if mmap else None) for n in _ARRAYS}
+        return cls(meta, arrays)
+
+    def _ngramas(self, texto: str) -> List[str]:
+        tokens = self._token.findall(texto.lower() if self.meta["lowercase"] else texto)
+        if self._ngram_max == 1:
+            return tokens
+        saida = list(tokens) if self._ngram_min == 1 else []
+        for n in range(max(self._ngram_min, 2), self._ngram_max + 1):
+            saida.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return saida
+
+    def _tfidf(self, textos: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(linha, termo, peso) não nulos da matriz TF-IDF normalizada."""
+        linhas, termos, contagens = [], [], []
+        for i, texto in enumerate(textos):
+            conta = {}
+            for g in self._ngramas(texto):
+                j = self.vocabulario.get(g)
+                if j is not None:
+                    conta[j] = conta.get(j, 0) + 1
+            linhas.extend([i] * len(conta))
+            termos.extend(conta)
+            contagens.extend(conta.values())
+        linhas = np.asarray(linhas, dtype=np.int64)
+        termos = np.asarray(termos, dtype=np.int64)
+        pesos = np.asarray(contagens, dtype=np.float64) * self.idf[termos]
+        if self.meta["norm"] == "l2" and len(pesos):
+            norma = np.sqrt(np.bincount(linhas, weights=pesos * pesos, minlength=len(textos)))
+            pesos = pesos / norma[linhas]
+        return linhas, termos, pesos
+
+    def decision_function(self, textos: Iterable[str]) -> np.ndarray:
+        textos = list(textos)
+        linhas, termos, pesos = self._tfidf(textos)
+        n_classes = len(self.intercept)
+        # expande cada (linha, termo) nos coeficientes não nulos do termo
+        inicio, fim = self.indptr[termos], self.indptr[termos + 1]
+        tamanhos = (fim - inicio).astype(np.int64)
+        total = int(tamanhos.sum())
+        deslocamento = np.repeat(inicio - np.concatenate([[0], np.cumsum(tamanhos)[:-1]]), tamanhos)
+        pos = deslocamento + np.arange(total)
+        alvo = np.repeat(linhas, tamanhos) * n_classes + self.indices[pos]
+        soma = np.bincount(alvo, weights=np.repeat(pesos, tamanhos) * self.data[pos],
+                           minlength=len(textos) * n_classes)
+        return soma.reshape(len(textos), n_classes) + self.intercept
+
+    def predict(self, textos: Iterable[str]) -> np.ndarray:
+        scores = self.decision_function(textos)
+        if scores.shape[1] == 1:  # binário: uma coluna de decisão
+            return self.classes[(scores[:, 0] > 0).astype(int)]
+        return self.classes[scores.argmax(axis=1)]
+
+    def predict_proba(self, textos: Iterable[str]) -> np.ndarray:
+        """Probabilidades (textos x classes), na ordem de self.classes."""
+        return probabilidades_de_decisao(self.decision_function(textos),
+                                         ovr=self.meta.get("probabilidade") == "ovr")
+
+
+def divergencias(preditor: PreditorCompilado, vectorizer, model, textos: List[str]) -> int:
+    """Quantos textos o compilado classifica diferente do sklearn."""
+    esperado = np.asarray(model.predict(vectorizer.transform(textos))).astype(str)
+    return int((preditor.predict(textos).astype(str) != esperado).sum())
+
+
+def textos_regressao(path_models: Path = PATH_MODELS) -> List[str]:
+    """Conjunto de regressão: chaves do lexicon + textos da reference_table (quando existirem)."""
+    textos = []
+    lexicon = path_models / "lexicon.json"
+    if lexicon.exists():
+        textos.extend(json.loads(lexicon.read_text(encoding="utf-8")))
+    referencia = path_models / "reference_table.parquet"
+    if referencia.exists():
+        import pandas as pd
+
+        textos.extend(pd.read_parquet(referencia, columns=["TEXTO_NORMALIZADO"])["TEXTO_NORMALIZADO"].astype(str))
+    return list(dict.fromkeys(textos))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compila TF-IDF + classificador linear para inferência sem sklearn")
+    parser.add_argument("--versao", default="v1")
+    parser.add_argument("--poda", type=float, default=0.0, help="zera coeficientes com |coef| < poda")
+    args = parser.parse_args(argv)
+
+    import joblib
+
+    destino, meta = compilar_versao(args.versao, args.poda)
+    print(f"[Compilado] {destino} — {meta['coeficientes_mantidos']}/{meta['coeficientes']} coeficientes")
+    preditor = PreditorCompilado.carregar(destino)
+    textos = textos_regressao()
+    n = divergencias(preditor, joblib.load(PATH_MODELS / f"tfidf_vectorizer_{args.versao}.joblib"),
+                     joblib.load(PATH_MODELS / f"classifier_{args.versao}.joblib"), textos)
+    print(f"[Compilado] Conjunto de regressão: {len(textos)} textos, {n} divergência(s)")
+    return 1 if n else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
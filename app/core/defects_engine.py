@@ -2,14 +2,15 @@
 # RESUMO DOS DEFEITOS — para página Classificação Defeitos
 # ================================================================
 
-import pandas as pd
 from pathlib import Path
 
+from utils.ingestao import ler_excel
+
 PATH_RAW = Path("data/raw")
 
 def carregar_base_defeitos_simples():
     """Carrega a base de defeitos sem alterar nada, apenas padroniza nome de colunas."""
-    df = pd.read_excel(PATH_RAW / "base_de_dados_defeitos.xlsx")
+    df = ler_excel(PATH_RAW / "base_de_dados_defeitos.xlsx")
     df.columns = [c.strip().upper() for c in df.columns]
     return df
 
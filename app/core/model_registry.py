@@ -0,0 +1,195 @@
+# app/core/model_registry.py
+"""
+Registro de artefatos de modelo (um por processo, compartilhado entre sessões/threads)
+- cada artefato (lexicon, tfidf_vectorizer_v1/v2, classifier_v1/v2, reference_table)
+  é carregado no máximo uma vez enquanto o arquivo não muda
+- a cada acesso só é feito um stat(); tamanho/mtime diferentes -> SHA256 (utils.checksum)
+  conferido contra o .sha256 ao lado do arquivo e novo carregamento
+- o .sha256 do lexicon é do conteúdo (json.dumps ordenado), não dos bytes do arquivo
+- checksum divergente: aviso (ou ArtefatoCorrompido com estrito=True)
+- troca atômica: a versão nova só substitui a antiga depois de carregada por inteiro;
+  se a leitura falhar (ex.: retreino ainda gravando), a versão anterior continua servindo
+- joblib/pandas só são importados ao carregar um artefato que precisa deles
+  (o caminho compilado do ClassifierService não importa sklearn)
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple, Union
+
+from config.config import PATH_MODELS
+from utils.checksum import generate_sha256
+
+logger = logging.getLogger(__name__)
+
+ARTEFATOS = {
+    "lexicon": PATH_MODELS / "lexicon.json",
+    "tfidf_vectorizer_v1": PATH_MODELS / "tfidf_vectorizer_v1.joblib",
+    "tfidf_vectorizer_v2": PATH_MODELS / "tfidf_vectorizer_v2.joblib",
+    "classifier_v1": PATH_MODELS / "classifier_v1.joblib",
+    "classifier_v2": PATH_MODELS / "classifier_v2.joblib",
+    "reference_table": PATH_MODELS / "reference_table.parquet",
+}
+
+
+class ArtefatoCorrompido(ValueError):
+    """SHA256 do artefato não confere com o .sha256 gravado (modo estrito)."""
+
+
+class Artefato(NamedTuple):
+    path: Path
+    objeto: Any
+    assinatura: Tuple[int, int]   # (mtime_ns, tamanho)
+    sha256: str
+    verificado: Optional[bool]    # None = sem .sha256 para conferir
+
+
+# -----------------------
+# Leitura / checksum
+# -----------------------
+def _carregar(path: Path) -> Any:
+    sufixo = path.suffix.lower()
+    if sufixo == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    if sufixo == ".parquet":
+        import pandas as pd
+
+        return pd.read_parquet(path)
+    import joblib
+
+    return joblib.load(path)
+
+
+def _checksum_esperado(path: Path) -> Optional[str]:
+    for candidato in (path.with_name(path.name + ".sha256"), path.with_suffix(".sha256")):
+        if candidato.exists():
+            return candidato.read_text(encoding="utf-8").split()[0].strip().lower()
+    return None
+
+
+def _sha256_conteudo_json(objeto: Any) -> str:
+    return hashlib.sha256(json.dumps(objeto, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _verificar(path: Path, sha256: str, objeto: Any) -> Optional[bool]:
+    esperado = _checksum_esperado(path)
+    if esperado is None:
+        return None
+    if sha256 == esperado:
+        return True
+    # lexicon: generate_full_lexicon grava o hash do conteúdo (json ordenado)
+    return path.suffix.lower() == ".json" and _sha256_conteudo_json(objeto) == esperado
+
+
+# -----------------------
+# Registro
+# -----------------------
+class RegistroArtefatos:
+
+    def __init__(self, estrito: bool = False):
+        self.estrito = estrito
+        self._artefatos: Dict[Path, Artefato] = {}
+        self._travas: Dict[Path, threading.Lock] = {}
+        self._trava_global = threading.Lock()
+        self._caminhos: Dict[Union[str, Path], Path] = {}
+        self._hashes: Dict[Path, Tuple[Tuple[int, int], str]] = {}
+        self.carregamentos = 0
+
+    def _trava(self, path: Path) -> threading.Lock:
+        with self._trava_global:
+            return self._travas.setdefault(path, threading.Lock())
+
+    def _caminho(self, nome_ou_path: Union[str, Path]) -> Path:
+        path = self._caminhos.get(nome_ou_path)
+        if path is None:
+            path = self._caminhos[nome_ou_path] = Path(ARTEFATOS.get(nome_ou_path, nome_ou_path)).resolve()
+        return path
+
+    def sha256(self, nome_ou_path: Union[str, Path]) -> Optional[str]:
+        """SHA256 do arquivo sem carregá-lo (recalculado só quando tamanho/mtime mudam)."""
+        path = self._caminho(nome_ou_path)
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        assinatura = (st.st_mtime_ns, st.st_size)
+        atual = self._artefatos.get(path)
+        if atual is not None and atual.assinatura == assinatura:
+            return atual.sha256
+        conhecido = self._hashes.get(path)
+        if conhecido is None or conhecido[0] != assinatura:
+            conhecido = self._hashes[path] = (assinatura, generate_sha256(path))
+        return conhecido[1]
+
+    def obter_artefato(self, nome_ou_path: Union[str, Path],
+                       carregar: Optional[Callable[[Path], Any]] = None) -> Optional[Artefato]:
+        """
+        Artefato atual (objeto + metadados) ou None se o arquivo não existe.
+        carregar: leitor próprio (padrão: pelo sufixo — json, parquet ou joblib).
+        """
+        path = self._caminho(nome_ou_path)
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return self._artefatos.get(path)
+        assinatura = (st.st_mtime_ns, st.st_size)
+        atual = self._artefatos.get(path)
+        if atual is not None and atual.assinatura == assinatura:
+            return atual
+
+        with self._trava(path):
+            atual = self._artefatos.get(path)
+            if atual is not None and atual.assinatura == assinatura:
+                return atual  # outra thread já carregou esta versão
+            sha256 = generate_sha256(path)
+            if atual is not None and atual.sha256 == sha256:
+                # só o mtime mudou (ex.: cópia/touch): mesmo conteúdo, sem recarregar
+                atual = Artefato(path, atual.objeto, assinatura, sha256, atual.verificado)
+                self._artefatos[path] = atual
+                return atual
+            try:
+                objeto = (carregar or _carregar)(path)
+            except Exception as e:
+                if atual is None:
+                    raise
+                logger.warning(f"[Registro] Falha ao carregar {path.name} ({e}); mantendo a versão anterior")
+                return atual
+            verificado = _verificar(path, sha256, objeto)
+            if verificado is False:
+                if self.estrito:
+                    raise ArtefatoCorrompido(f"SHA256 de {path.name} não confere com o .sha256 gravado")
+                logger.warning(f"[Registro] SHA256 de {path.name} não confere com o .sha256 gravado")
+            novo = Artefato(path, objeto, assinatura, sha256, verificado)
+            self._artefatos[path] = novo  # troca atômica: leitores veem a versão antiga ou a nova inteira
+            self.carregamentos += 1
+            return novo
+
+    def obter(self, nome_ou_path: Union[str, Path], carregar: Optional[Callable[[Path], Any]] = None) -> Any:
+        """Objeto carregado (lexicon dict, vetorizador, modelo, DataFrame) ou None."""
+        artefato = self.obter_artefato(nome_ou_path, carregar)
+        return artefato.objeto if artefato is not None else None
+
+    def status(self):
+        """Artefatos em memória (DataFrame): arquivo, SHA256 e resultado da verificação."""
+        import pandas as pd
+
+        return pd.DataFrame([
+            {"ARQUIVO": a.path.name, "SHA256": a.sha256, "VERIFICADO": a.verificado}
+            for a in self._artefatos.values()
+        ], columns=["ARQUIVO", "SHA256", "VERIFICADO"])
+
+    def limpar(self):
+        with self._trava_global:
+            self._artefatos.clear()
+
+
+REGISTRO = RegistroArtefatos()
+
+
+def obter(nome_ou_path: Union[str, Path]) -> Any:
+    """Atalho para REGISTRO.obter (registro único do processo)."""
+    return REGISTRO.obter(nome_ou_path)
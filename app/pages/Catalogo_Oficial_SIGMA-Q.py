@@ -1,6 +1,8 @@
 # BLOCK 5 – Página 5 (Catálogo Oficial de Defeitos SIGMA-Q)
 import streamlit as st
-import pandas as pd
+
+from app.core.catalogo_engine import resumo_auditoria, status_auditoria
+from utils.ingestao import ler_excel
 
 st.set_page_config(page_title="Catálogo Oficial de Defeitos", layout="wide")
 st.title("📚 Catálogo Oficial SIGMA-Q — Defeitos, Responsabilidades, Causas e Modelos")
@@ -11,10 +13,10 @@ st.title("📚 Catálogo Oficial SIGMA-Q — Defeitos, Responsabilidades, Causas
 
 @st.cache_data
 def carregar_catalogo():
-    df_codes = pd.read_excel("data/raw/catalogo_codigos_defeitos.xlsx")
-    df_resp = pd.read_excel("data/raw/catalogo_responsabilidades.xlsx")
-    df_causa = pd.read_excel("data/raw/catalogo_causas.xlsx")
-    df_model = pd.read_excel("data/raw/catalogo_modelos.xlsx")
+    df_codes = ler_excel("data/raw/catalogo_codigos_defeitos.xlsx")
+    df_resp = ler_excel("data/raw/catalogo_responsabilidades.xlsx")
+    df_causa = ler_excel("data/raw/catalogo_causas.xlsx")
+    df_model = ler_excel("data/raw/catalogo_modelos.xlsx")
     return df_codes, df_resp, df_causa, df_model
 
 df_codes, df_resp, df_causa, df_model = carregar_catalogo()
@@ -34,4 +36,17 @@ st.dataframe(df_causa, use_container_width=True)
 st.header("📦 4. Catálogo de Modelos")
 st.dataframe(df_model, use_container_width=True)
 
+# =============================================================
+# Auditoria do catálogo de modelos sobre a base de defeitos
+# (tabela-resumo incremental: só recalcula quando a base ou o catálogo mudam)
+# =============================================================
+st.header("🔎 5. Auditoria do Catálogo de Modelos")
+auditoria = status_auditoria()
+c1, c2, c3 = st.columns(3)
+c1.metric("Modelos OK", auditoria["ok"], f"{auditoria['linhas_ok']} linhas de defeito", delta_color="off")
+c2.metric("Não contabilizados", auditoria["nao_contabilizados"],
+          f"{auditoria['linhas_nao_contabilizadas']} linhas de defeito", delta_color="off")
+c3.metric("UNKNOWN", auditoria["unknown"], f"{auditoria['linhas_unknown']} linhas de defeito", delta_color="off")
+st.dataframe(resumo_auditoria(), use_container_width=True)
+
 st.info("Esses catálogos são a base oficial de aprendizagem do SIGMA-Q IA.")
\ No newline at end of file
@@ -1,9 +1,10 @@
 import streamlit as st
-import pandas as pd
-from app.core.classifier_service import ClassifierService
-from services.text_normalizer import normalizar_texto
+from app.core.classifier_service import AvaliacaoSombra, ClassifierService, fila_revisao
+from services.text_normalizer import normalizar_serie
 from services.lexicon import load_lexicon
 from app.core.defects_engine import gerar_resumo_defeitos
+from app.core.catalogo_engine import status_auditoria, listar_nao_contabilizados
+from utils.ingestao import ler_excel
 
 st.set_page_config(
     page_title="Classificação Automática — SIGMA-Q",
@@ -17,7 +18,7 @@ st.title("🔍 Classificação Automática de Defeitos — SIGMA-Q IA (100% lexi
 # -----------------------------------------------------
 @st.cache_data(show_spinner=True)
 def carregar_base_oficial():
-    return pd.read_excel("data/raw/base_de_dados_defeitos.xlsx")
+    return ler_excel("data/raw/base_de_dados_defeitos.xlsx")
 
 df_raw = carregar_base_oficial()
 
@@ -40,13 +41,16 @@ if "DESC_FALHA" not in df_raw.columns:
 # 3) Normalizar texto da descrição
 # -----------------------------------------------------
 df = df_raw.copy()
-df["TEXTO_NORMALIZADO"] = df["DESC_FALHA"].astype(str).apply(normalizar_texto)
+df["TEXTO_NORMALIZADO"] = normalizar_serie(df["DESC_FALHA"].astype(str))
 
 # -----------------------------------------------------
 # 4) Aplicar classificação da IA (via lexicon + modelo)
 # -----------------------------------------------------
 svc = ClassifierService()
-df["CODIGO_IA"] = df["TEXTO_NORMALIZADO"].apply(svc.predict)
+limiar = svc.limiar_confianca()  # calibrado por versão (models/limiar_confianca_<versao>.json)
+topk = svc.predict_topk(df["TEXTO_NORMALIZADO"], k=3, limiar=limiar)
+df["CODIGO_IA"] = topk["CODIGO_1"].to_numpy()
+df["CONFIANCA_IA"] = topk["CONFIANCA"].to_numpy()
 
 # -----------------------------------------------------
 # 5) KPI e divergências
@@ -93,6 +97,36 @@ else:
         height=500
     )
 
+st.subheader("🧑‍🔧 Fila de revisão — confiança abaixo do limiar")
+fila = fila_revisao(df, topk)
+r1, r2 = st.columns(2)
+r1.metric("Aceitos automaticamente", int((topk["ROTA"] == "ACEITO").sum()))
+r2.metric("Para revisão manual", len(fila), f"confiança < {limiar:.1%}", delta_color="off")
+if len(fila):
+    st.dataframe(
+        fila[["ORDEM", "DESC_FALHA", "TEXTO_NORMALIZADO", "COD_FALHA",
+              "CODIGO_1", "PROB_1", "CODIGO_2", "PROB_2", "CODIGO_3", "PROB_3"]],
+        use_container_width=True,
+    )
+
+with st.expander("🧪 Avaliação sombra — classifier_v1 × classifier_v2"):
+    somente_modelo = st.checkbox("Ignorar o lexicon (avaliar só os modelos)", value=False)
+    resumo_sombra, discordancias = AvaliacaoSombra(("v1", "v2")).avaliar(
+        df["TEXTO_NORMALIZADO"], df["COD_FALHA"], usar_lexicon=not somente_modelo)
+    st.dataframe(resumo_sombra, use_container_width=True)
+    st.caption(f"{int(discordancias['LINHAS'].sum())} linhas em que v1 e v2 discordam")
+    st.dataframe(discordancias, use_container_width=True)
+
 st.subheader("📘 Validação - Quantidade de defeitos por modelo")
 df_resumo = gerar_resumo_defeitos()
-st.dataframe(df_resumo, use_container_width=True)
\ No newline at end of file
+st.dataframe(df_resumo, use_container_width=True)
+
+st.subheader("🧭 Auditoria do catálogo de modelos")
+auditoria = status_auditoria()
+c1, c2, c3 = st.columns(3)
+c1.metric("Linhas com modelo OK", auditoria["linhas_ok"], f"{auditoria['ok']} modelos", delta_color="off")
+c2.metric("Linhas não contabilizadas", auditoria["linhas_nao_contabilizadas"],
+          f"{auditoria['nao_contabilizados']} modelos", delta_color="off")
+c3.metric("Linhas com modelo UNKNOWN", auditoria["linhas_unknown"], f"{auditoria['unknown']} modelos", delta_color="off")
+if auditoria["nao_contabilizados"] or auditoria["unknown"]:
+    st.dataframe(listar_nao_contabilizados(), use_container_width=True)
@@ -0,0 +1,161 @@
+# benchmarks/bench_unificador.py
+"""
+Benchmarks de escala do unificador SIGMA-Q v2
+- etapas: extrair_modelo_id (linha a linha, amostra), extrair_modelo_id_batch,
+  unir_bases e aplicar_correcoes_manuais (store de correções em pasta temporária)
+- mede tempo (perf_counter) e pico de memória (tracemalloc, execução separada)
+- grava/compara com benchmarks/baseline.json; sai com código 1 se alguma etapa
+  piorar além do limite ou se não houver baseline para algum volume (use --salvar
+  na primeira execução em cada máquina)
+
+Uso:
+    python -m benchmarks.bench_unificador --salvar                 # 10k, 100k e 1M linhas
+    python -m benchmarks.bench_unificador --limite 0.25
+    python -m benchmarks.bench_unificador --linhas 10000 100000    # rodada rápida
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from benchmarks.gerador import gerar_bases, gerar_correcoes
+from utils import unificador
+from utils.correcoes import aplicar_correcoes, carregar_correcoes, upsert_correcoes
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+AMOSTRA_LINHA_A_LINHA = 2_000
+TOLERANCIA_TEMPO_S = 0.05  # abaixo disso a variação é ruído
+TOLERANCIA_MEMORIA_MB = 1.0
+
+
+# -----------------------
+# Medição
+# -----------------------
+def _limpar_caches():
+    """Cache de MODELO_ID em memória e em disco: cada execução mede a extração a frio."""
+    unificador._CACHE_MODELO_ID.clear()
+    unificador.CACHE_MODELO_ID.unlink(missing_ok=True)
+
+
+def medir(fn: Callable[[], object]) -> Dict[str, float]:
+    """Tempo de uma execução limpa + pico de memória de outra execução (com tracemalloc)."""
+    _limpar_caches()
+    ini = time.perf_counter()
+    fn()
+    tempo = time.perf_counter() - ini
+
+    _limpar_caches()
+    tracemalloc.start()
+    try:
+        fn()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"tempo_s": round(tempo, 4), "pico_mb": round(pico / 1e6, 2)}
+
+
+def rodar(n_linhas: int, seed: int = 42) -> Dict[str, Dict[str, float]]:
+    """Executa todas as etapas para uma base sintética de n_linhas defeitos."""
+    df_prod, df_def = gerar_bases(n_linhas, seed=seed)
+    modelos = unificador.IndiceModelos(unificador.construir_lista_modelos_producao(
+        unificador.normalizar_colunas(df_prod.copy())))
+    amostra = df_def["DESCRICAO"].astype(str).head(AMOSTRA_LINHA_A_LINHA)
+
+    cache_original = unificador.CACHE_MODELO_ID
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        # cache em disco numa pasta descartável: cada medição parte do zero
+        unificador.CACHE_MODELO_ID = tmp / "modelo_id.parquet"
+        try:
+            resultados = {
+                "extrair_modelo_id": medir(lambda: [unificador.extrair_modelo_id(t, modelos) for t in amostra]),
+                "extrair_modelo_id_batch": medir(
+                    lambda: unificador.extrair_modelo_id_batch(df_def["DESCRICAO"], modelos, usar_cache_disco=False)),
+                "unir_bases": medir(lambda: unificador.unir_bases(df_prod, df_def)),
+            }
+
+            merged = unificador.unir_bases(df_prod, df_def)
+            db = tmp / "correcoes.sqlite"
+            upsert_correcoes(gerar_correcoes(merged, seed=seed), path=db)
+            resultados["aplicar_correcoes_manuais"] = medir(
+                lambda: aplicar_correcoes(merged, carregar_correcoes(db)))
+        finally:
+            unificador.CACHE_MODELO_ID = cache_original
+    return resultados
+
+
+# -----------------------
+# Baseline
+# -----------------------
+def carregar_baseline(path: Path = BASELINE) -> dict:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def salvar_baseline(resultados: dict, path: Path = BASELINE):
+    base = carregar_baseline(path)
+    base.update(resultados)
+    path.write_text(json.dumps(base, ensure_ascii=False, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def volumes_sem_baseline(resultados: dict, baseline: dict) -> List[str]:
+    """Volumes medidos que não têm referência no baseline (nada a comparar)."""
+    return [volume for volume in resultados if volume not in baseline]
+
+
+def comparar(resultados: dict, baseline: dict, limite: float = 0.25) -> List[str]:
+    """Lista de regressões (etapa/volume que ficou mais de `limite` pior que o baseline)."""
+    regressoes = []
+    for volume, etapas in resultados.items():
+        for etapa, atual in etapas.items():
+            ref = baseline.get(volume, {}).get(etapa)
+            if ref is None:
+                continue
+            if atual["tempo_s"] > ref["tempo_s"] * (1 + limite) + TOLERANCIA_TEMPO_S:
+                regressoes.append(f"{volume}/{etapa}: tempo {ref['tempo_s']}s -> {atual['tempo_s']}s")
+            if atual["pico_mb"] > ref["pico_mb"] * (1 + limite) + TOLERANCIA_MEMORIA_MB:
+                regressoes.append(f"{volume}/{etapa}: memória {ref['pico_mb']}MB -> {atual['pico_mb']}MB")
+    return regressoes
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de escala do unificador")
+    parser.add_argument("--linhas", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--limite", type=float, default=0.25, help="piora relativa tolerada (0.25 = 25%%)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--salvar", action="store_true", help="grava os resultados como novo baseline")
+    args = parser.parse_args(argv)
+
+    resultados = {}
+    for n in args.linhas:
+        resultados[str(n)] = rodar(n, seed=args.seed)
+        for etapa, r in resultados[str(n)].items():
+            print(f"[Benchmark] {n:>9} linhas | {etapa:<26} {r['tempo_s']:>9.3f}s {r['pico_mb']:>9.1f}MB")
+
+    if args.salvar:
+        salvar_baseline(resultados, args.baseline)
+        print(f"Baseline salvo em: {args.baseline}")
+        return 0
+
+    baseline = carregar_baseline(args.baseline)
+    faltando = volumes_sem_baseline(resultados, baseline)
+    if faltando:
+        print(f"[Benchmark] ERRO sem baseline para {', '.join(faltando)} linhas em {args.baseline} "
+              "(rode com --salvar para criar)")
+        return 1
+
+    regressoes = comparar(resultados, baseline, args.limite)
+    for r in regressoes:
+        print(f"[Benchmark] REGRESSÃO {r}")
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
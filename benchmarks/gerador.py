@@ -0,0 +1,124 @@
+# benchmarks/gerador.py
+"""
+Gerador sintético (determinístico por seed) das planilhas brutas do SIGMA-Q v2
+- produção: Data (datetime), Qty_Geral, Processo, Turno, Modelo, Categoria
+- defeitos: mesmas colunas da base real, DATA em texto dd/mm/aaaa
+- modelos nos padrões reais (AWS-*, MO-*, CM-*) e descrições muito repetidas
+  (modelo completo, componente + modelo, textos sem modelo, ~5% com número de lote)
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+MESES_PT = ["JANEIRO", "FEVEREIRO", "MARÇO", "ABRIL", "MAIO", "JUNHO", "JULHO",
+            "AGOSTO", "SETEMBRO", "OUTUBRO", "NOVEMBRO", "DEZEMBRO"]
+TURNOS = ["COMERCIAL", "1° TURNO", "2° TURNO", "2° TURNO ESTENDIDO"]
+FALHAS = [("N1", "APARELHO NÃO LIGA"), ("PT1", "PRATO NÃO GIRA"), ("S2", "SEM SOM"),
+          ("R1", "RUÍDO"), ("I3", "IMAGEM DISTORCIDA"), ("C4", "COMPONENTE DANIFICADO")]
+MOTIVOS = [("P", "PROCESSO PA"), ("F", "CHINA"), ("M", "MATERIAL")]
+COMPONENTES = ["0402-59", 130203, "PL0217-0001-01", "X1", 4455, "RS-550"]
+TEXTOS_SEM_MODELO = ["PCI PRINCIPAL CONDENSADORA 9K/12K - IM", "ALTO FALANTE 10POL TW",
+                     "CABO FLAT 40 VIAS", "FONTE CHAVEADA 12V"]
+
+
+def gerar_modelos(n_modelos: int, rng: np.random.Generator) -> List[Tuple[str, str]]:
+    """(descrição de produção, categoria) nos padrões AWS-/MO-/CM- da base real."""
+    modelos = []
+    for i in range(n_modelos):
+        tipo = i % 5
+        sufixo = "ABCDE"[rng.integers(5)]
+        if tipo == 0:
+            modelos.append((f"BOOMBOX AWS-BBS-{i:02d}-{sufixo} BIVOLT", "BBS"))
+        elif tipo == 1:
+            pol = [32, 43, 50, 55][rng.integers(4)]
+            modelos.append((f"TV {pol} ANDROID BORD INF AWS-TV-{pol}-BL-{i:02d}-{sufixo}", "TV"))
+        elif tipo == 2:
+            tensao = ["127V/60HZ", "220V/60HZ"][rng.integers(2)]
+            modelos.append((f"MICRO-ONDAS MO-01-{i:02d}-{sufixo} {tensao}", "MWO"))
+        elif tipo == 3:
+            modelos.append((f"CAIXA AMPLIFICADA CM-{200 + i} BIVOLT", "CM"))
+        else:
+            modelos.append((f"TORRE DE SOM AWS-T2W-{i:02d} BIVOLT BLUETOOTH", "TW"))
+    return modelos
+
+
+def _datas(n: int, inicio: str, dias: int, rng: np.random.Generator) -> pd.DatetimeIndex:
+    return pd.Timestamp(inicio) + pd.to_timedelta(np.sort(rng.integers(0, dias, n)), unit="D")
+
+
+def gerar_bases(n_defeitos: int, seed: int = 42, n_modelos: int = None,
+                dias: int = 730) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Gera (df_prod_raw, df_def_raw) com n_defeitos linhas de defeitos.
+    A produção tem ~1 linha para cada 8 defeitos; o número de modelos cresce
+    devagar com o volume (padrão: 40 + n_defeitos / 5000).
+    """
+    rng = np.random.default_rng(seed)
+    n_modelos = n_modelos or 40 + n_defeitos // 5000
+    modelos = gerar_modelos(n_modelos, rng)
+    nomes = np.array([m for m, _ in modelos], dtype=object)
+    categorias = np.array([c for _, c in modelos], dtype=object)
+
+    # produção: poucos modelos concentram a maior parte (Zipf truncado)
+    pesos = 1.0 / np.arange(1, n_modelos + 1)
+    pesos /= pesos.sum()
+    n_prod = max(n_defeitos // 8, n_modelos)
+    idx_prod = rng.choice(n_modelos, n_prod, p=pesos)
+    df_prod = pd.DataFrame({
+        "Data": _datas(n_prod, "2024-01-01", dias, rng),
+        "Qty_Geral": rng.integers(10, 1000, n_prod),
+        "Processo": "PA",
+        "Turno": np.array(TURNOS, dtype=object)[rng.integers(len(TURNOS), size=n_prod)],
+        "Modelo": nomes[idx_prod],
+        "Categoria": categorias[idx_prod],
+    })
+
+    # defeitos: descrição = modelo (60%), componente + código do modelo (30%), sem modelo (10%)
+    datas = _datas(n_defeitos, "2024-01-01", dias, rng)
+    idx_def = rng.choice(n_modelos, n_defeitos, p=pesos)
+    codigos_modelo = np.array([next(t for t in m.split() if t.startswith(("AWS-", "MO-", "CM-")))
+                               for m in nomes], dtype=object)
+    componente = np.array([f"PCI PRINCIPAL {c} - IM" for c in codigos_modelo], dtype=object)
+    sorteio = rng.random(n_defeitos)
+    descricao = np.where(sorteio < 0.6, nomes[idx_def],
+                         np.where(sorteio < 0.9, componente[idx_def],
+                                  np.array(TEXTOS_SEM_MODELO, dtype=object)[rng.integers(len(TEXTOS_SEM_MODELO), size=n_defeitos)]))
+    # ~5% com lote no texto: a quantidade de descrições distintas cresce com o volume
+    lote = rng.random(n_defeitos) < 0.05
+    descricao[lote] = descricao[lote] + " LOTE " + rng.integers(1, max(n_defeitos // 100, 2), lote.sum()).astype(str).astype(object)
+
+    falha = rng.integers(len(FALHAS), size=n_defeitos)
+    motivo = rng.integers(len(MOTIVOS), size=n_defeitos)
+    df_def = pd.DataFrame({
+        "ORDEM": np.arange(1, n_defeitos + 1),
+        "DATA": datas.strftime("%d/%m/%Y"),
+        "MES": np.array(MESES_PT, dtype=object)[datas.month - 1],
+        "SEMANA": datas.isocalendar().week.to_numpy().astype(np.int64),
+        "TURNO": np.array(TURNOS, dtype=object)[rng.integers(len(TURNOS), size=n_defeitos)],
+        "CODIGO": np.char.add(rng.integers(1000, 9999, n_defeitos).astype(str), "-01").astype(object),
+        "DESCRICAO": descricao,
+        "CATEGORIA": categorias[idx_def],
+        "LINHA": np.array(["PA-MO002", "PA-AW004", "PA-TV001"], dtype=object)[rng.integers(3, size=n_defeitos)],
+        "REGISTRADO POR": "INSPETOR",
+        "COD_FALHA": np.array([c for c, _ in FALHAS], dtype=object)[falha],
+        "DESC. FALHA": np.array([d for _, d in FALHAS], dtype=object)[falha],
+        "COMPONENTE": np.array(COMPONENTES, dtype=object)[rng.integers(len(COMPONENTES), size=n_defeitos)],
+        "QTD": rng.integers(1, 4, n_defeitos),
+        "MOTIVO": np.array([c for c, _ in MOTIVOS], dtype=object)[motivo],
+        "DESC. MOTIVO": np.array([d for _, d in MOTIVOS], dtype=object)[motivo],
+    })
+    return df_prod, df_def
+
+
+def gerar_correcoes(df_unificada: pd.DataFrame, fracao: float = 0.01, seed: int = 42) -> pd.DataFrame:
+    """Correções manuais para uma fração das linhas sem produção (ou quaisquer, se não houver)."""
+    rng = np.random.default_rng(seed)
+    alvo = df_unificada[df_unificada["PROD_QTY_GERAL"].isna()]
+    if alvo.empty:
+        alvo = df_unificada
+    n = min(len(alvo), max(1, int(len(df_unificada) * fracao)))
+    df_corr = alvo.iloc[np.sort(rng.choice(len(alvo), n, replace=False))].copy()
+    df_corr["PROD_QTY_GERAL"] = rng.integers(10, 1000, n).astype(float)
+    return df_corr
@@ -10,7 +10,15 @@ BASE_DIR = Path(__file__).resolve().parents[1]
 # Diretórios
 DATA_RAW_DIR = BASE_DIR / "data" / "raw"
 DATA_PROCESSED_DIR = BASE_DIR / "data" / "processed"
-BASE_UNIFICADA = DATA_PROCESSED_DIR / "base_de_dados_unificada.xlsx"
+BASE_UNIFICADA_DIR = DATA_PROCESSED_DIR / "base_unificada"  # Parquet particionado por ANO/MES_NUM
+BASE_UNIFICADA = DATA_PROCESSED_DIR / "base_de_dados_unificada.xlsx"  # exportação opcional
+CORRECOES_XLSX = DATA_PROCESSED_DIR / "correcoes_manuais.xlsx"  # planilha de entrada (importada no store)
+CORRECOES_DB = DATA_PROCESSED_DIR / "correcoes_manuais.sqlite"  # correções indexadas por hash
+
+# Caches locais (regeneráveis, fora do versionamento)
+PATH_CACHE = DATA_PROCESSED_DIR / "cache"
+CACHE_MODELO_ID = PATH_CACHE / "modelo_id.parquet"
+PATH_ESTADO_UNIFICACAO = PATH_CACHE / "unificacao"
 
 # Nomes de arquivos de entrada esperados
 FILE_PRODUCAO = DATA_RAW_DIR / "base_de_dados_prod.xlsx"
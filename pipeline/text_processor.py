@@ -1,34 +1,69 @@
 # pipeline/text_processor.py
 # SIGMA-Q V2 — Fase 2 completa (compatível com seu text_vectorizer.py)
+#
+# Dicionário de textos: DESC_FALHA_CORR é codificada uma vez (TEXTO_COD por linha)
+# e limpeza, normalização, embeddings e TF-IDF rodam só sobre os textos distintos.
+# - texto_processado.parquet: linhas com TEXTO_COD (sem as colunas de texto derivadas)
+# - texto_processado_dicionario.parquet: TEXTO_COD, DESC_FALHA_CORR, TEXTO_LIMPO,
+#   TEXTO_NORMALIZADO, LINHAS
+# - embeddings.npy / tfidf_matrix.npz: uma linha por TEXTO_COD (expandir por código)
 
 import logging
 import pandas as pd
 import numpy as np
 import joblib
 
-from config.config import PATH_DATA_PROCESSED, PATH_SPACY_MODEL
-from services.text_cleaner import clean_text
-from services.text_normalizer import normalizar_texto
-from services.text_vectorizer import embed_batch, gerar_tfidf
+from config.config import BASE_UNIFICADA_DIR, PATH_DATA_PROCESSED, PATH_SPACY_MODEL
+from services.text_dictionary import (
+    COL_CODIGO, COL_LINHAS, carregar_dicionario, codificar_serie, decodificar, salvar_dicionario,
+)
+from services.text_normalizer import normalizar_lote
+from services.text_vectorizer import embed_batch, gerar_tfidf, salvar_matriz_tfidf
+from utils.base_unificada import ler_base_unificada, listar_particoes
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s — %(levelname)s — %(message)s")
 logger = logging.getLogger(__name__)
 
+TEXTO_PROCESSADO = PATH_DATA_PROCESSED / "texto_processado.parquet"
+BASE_FINAL_LEGADA = PATH_DATA_PROCESSED / "base_final.parquet"
+COLUNAS_TEXTO = ["TEXTO_LIMPO", "TEXTO_NORMALIZADO"]
+
+
+def carregar_base_unificada(path=BASE_UNIFICADA_DIR) -> pd.DataFrame:
+    """
+    Base unificada do dataset particionado (utils.base_unificada).
+    Instalações que ainda não rodaram criar_base_unificada leem o base_final.parquet antigo.
+    """
+    if listar_particoes(path=path):
+        return ler_base_unificada(path=path)
+    logger.warning(f"[Pipeline] Dataset particionado vazio; lendo {BASE_FINAL_LEGADA.name} "
+                   "(rode utils.unificador.criar_base_unificada para migrar)")
+    return pd.read_parquet(BASE_FINAL_LEGADA)
+
 
 def run():
     logger.info("[Pipeline] Carregando base unificada...")
-    df = pd.read_parquet(PATH_DATA_PROCESSED / "base_final.parquet")
+    df = carregar_base_unificada()
+
+    # ============================================================
+    #  DICIONÁRIO DE TEXTOS
+    # ============================================================
+    codigos, dicionario = codificar_serie(df["DESC_FALHA_CORR"].astype(str))
+    df[COL_CODIGO] = codigos
+    distintos = dicionario["DESC_FALHA_CORR"].tolist()
+    logger.info(f"[Pipeline] {len(df)} linhas, {len(distintos)} textos distintos")
 
     # ============================================================
     #  TEXT CLEANING
     # ============================================================
     logger.info("[Pipeline] Limpando texto (TEXTO_LIMPO)...")
-    df["TEXTO_LIMPO"] = df["DESC_FALHA_CORR"].astype(str).apply(clean_text)
+    # clean_text e normalizar_texto(clean_text) fundidos, uma vez por texto distinto
+    dicionario["TEXTO_LIMPO"] = normalizar_lote(distintos, "limpeza")
 
     logger.info("[Pipeline] Normalizando texto (TEXTO_NORMALIZADO)...")
-    df["TEXTO_NORMALIZADO"] = df["TEXTO_LIMPO"].apply(normalizar_texto)
+    dicionario["TEXTO_NORMALIZADO"] = normalizar_lote(distintos, "pipeline")
 
-    textos = df["TEXTO_NORMALIZADO"].astype(str).tolist()
+    textos = dicionario["TEXTO_NORMALIZADO"].tolist()
 
     # ============================================================
     #  EMBEDDINGS (spaCy)
@@ -37,31 +72,45 @@ def run():
     embeddings = embed_batch(textos)
     emb_path = PATH_SPACY_MODEL / "embeddings.npy"
     np.save(emb_path, embeddings)
-    logger.info(f"[OK] Embeddings salvos em: {emb_path}")
+    logger.info(f"[OK] Embeddings salvos em: {emb_path} (uma linha por {COL_CODIGO})")
 
     # ============================================================
     #  TF-IDF
     # ============================================================
     logger.info("[Pipeline] Gerando matriz TF-IDF...")
-    vectorizer, matriz_tfidf = gerar_tfidf(textos)
+    # ajuste sobre os distintos, IDF ponderado pelo nº de linhas de cada texto
+    vectorizer, matriz_tfidf = gerar_tfidf(textos, pesos=dicionario[COL_LINHAS].to_numpy())
 
     tfidf_vec_path = PATH_SPACY_MODEL / "tfidf_vectorizer.pkl"
-    tfidf_mat_path = PATH_SPACY_MODEL / "tfidf_matrix.npy"
+    tfidf_mat_path = PATH_SPACY_MODEL / "tfidf_matrix.npz"
 
     joblib.dump(vectorizer, tfidf_vec_path)
     logger.info(f"[OK] TF-IDF vectorizer salvo em: {tfidf_vec_path}")
 
-    np.save(tfidf_mat_path, matriz_tfidf)
-    logger.info(f"[OK] TF-IDF matrix salva em: {tfidf_mat_path}")
+    salvar_matriz_tfidf(matriz_tfidf, tfidf_mat_path)
+    logger.info(f"[OK] TF-IDF matrix (CSR, {matriz_tfidf.nnz} não-zeros) salva em: {tfidf_mat_path}")
 
     # ============================================================
     #  Salvar o resultado em parquet
     # ============================================================
-    out_path = PATH_DATA_PROCESSED / "texto_processado.parquet"
-    df.to_parquet(out_path, index=False)
+    out_path = TEXTO_PROCESSADO
+    df.drop(columns=[c for c in COLUNAS_TEXTO if c in df.columns]).to_parquet(out_path, index=False)
+    dic_path = salvar_dicionario(dicionario, out_path)
 
     logger.info("✔ Pipeline Fase 2 concluída com sucesso!")
     logger.info(f"✔ Arquivo final salvo em: {out_path}")
+    logger.info(f"✔ Dicionário de textos salvo em: {dic_path}")
+
+
+def carregar_texto_processado(com_textos: bool = True) -> pd.DataFrame:
+    """
+    Lê texto_processado.parquet; com_textos=True devolve também TEXTO_LIMPO e
+    TEXTO_NORMALIZADO expandidos do dicionário pelo TEXTO_COD de cada linha.
+    """
+    df = pd.read_parquet(TEXTO_PROCESSADO)
+    if com_textos and COL_CODIGO in df.columns:
+        df = decodificar(df, carregar_dicionario(TEXTO_PROCESSADO), COLUNAS_TEXTO)
+    return df
 
 
 if __name__ == "__main__":
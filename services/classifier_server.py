@@ -0,0 +1,348 @@
+"""
+services/classifier_server.py
+
+Responsabilidade:
+- Servidor HTTP local (asyncio, só stdlib) para classificar descrições de defeito
+  sem que cada ferramenta precise importar sklearn e carregar os modelos
+- Requisições concorrentes são agrupadas em micro-lotes (limite de tamanho e de
+  espera em ms) e cada lote passa uma única vez por ClassifierService.predict_batch
+- Estatísticas de latência e tamanho de lote em GET /stats
+
+Rotas:
+- POST /classificar   {"textos": [...]} ou {"texto": "..."} -> {"codigos": [...]}
+- GET  /stats         contadores, tamanho médio/máximo de lote, latência p50/p95/p99 (ms)
+- GET  /saude         {"status": "ok"}
+
+Execução:
+    python -m services.classifier_server --porta 8765 --max-lote 64 --espera-ms 5
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+import urllib.request
+from collections import deque
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+HOST_PADRAO = "127.0.0.1"
+PORTA_PADRAO = 8765
+MAX_CORPO = 8 * 1024 * 1024
+
+
+# ============================================================
+# 1) Micro-lotes
+# ============================================================
+
+class MicroLote:
+    """
+    Junta pedidos concorrentes em lotes de até `max_lote` textos, esperando no
+    máximo `espera_ms` depois do primeiro pedido, e processa cada lote com uma
+    única chamada a `processar(textos) -> rótulos` (fora do loop de eventos).
+    """
+
+    def __init__(self, processar: Callable[[List[str]], List[str]], max_lote: int = 64,
+                 espera_ms: float = 5.0, janela_stats: int = 10_000):
+        self.processar = processar
+        self.max_lote = max_lote
+        self.espera_s = espera_ms / 1000.0
+        self._fila: Optional[asyncio.Queue] = None
+        self._tarefa: Optional[asyncio.Task] = None
+        self.pedidos = 0
+        self.textos = 0
+        self.lotes = 0
+        self.erros = 0
+        self.tamanhos_lote = deque(maxlen=janela_stats)
+        self.latencias_ms = deque(maxlen=janela_stats)
+
+    def iniciar(self):
+        self._fila = asyncio.Queue()
+        self._tarefa = asyncio.get_running_loop().create_task(self._laco())
+
+    async def encerrar(self):
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+
+    async def classificar(self, textos: Sequence[str]) -> List[str]:
+        inicio = time.perf_counter()
+        futuro = asyncio.get_running_loop().create_future()
+        await self._fila.put((list(textos), futuro))
+        try:
+            return await futuro
+        finally:
+            self.latencias_ms.append((time.perf_counter() - inicio) * 1000.0)
+
+    async def _coletar(self) -> list:
+        pedidos = [await self._fila.get()]
+        n = len(pedidos[0][0])
+        limite = time.perf_counter() + self.espera_s
+        while n < self.max_lote:
+            restante = limite - time.perf_counter()
+            if restante <= 0:
+                break
+            try:
+                pedido = await asyncio.wait_for(self._fila.get(), restante)
+            except asyncio.TimeoutError:
+                break
+            pedidos.append(pedido)
+            n += len(pedido[0])
+        return pedidos
+
+    async def _laco(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pedidos = await self._coletar()
+            lote = [t for textos, _ in pedidos for t in textos]
+            self.pedidos += len(pedidos)
+            self.textos += len(lote)
+            self.lotes += 1
+            self.tamanhos_lote.append(len(lote))
+            try:
+                rotulos = await loop.run_in_executor(None, self.processar, lote)
+            except Exception:
+                # um pedido ruim não derruba o lote inteiro: refaz pedido a pedido
+                await self._processar_separados(pedidos)
+                continue
+            ini = 0
+            for textos, futuro in pedidos:
+                if not futuro.done():
+                    futuro.set_result(rotulos[ini:ini + len(textos)])
+                ini += len(textos)
+
+    async def _processar_separados(self, pedidos: list):
+        loop = asyncio.get_running_loop()
+        for textos, futuro in pedidos:
+            if futuro.done():
+                continue
+            try:
+                rotulos = await loop.run_in_executor(None, self.processar, textos)
+            except Exception as e:
+                self.erros += 1
+                futuro.set_exception(e)
+            else:
+                futuro.set_result(rotulos)
+
+    def stats(self) -> dict:
+        latencias = np.asarray(self.latencias_ms, dtype=float)
+        tamanhos = np.asarray(self.tamanhos_lote, dtype=float)
+        p50, p95, p99 = np.percentile(latencias, [50, 95, 99]) if len(latencias) else (0.0, 0.0, 0.0)
+        return {
+            "pedidos": self.pedidos,
+            "textos": self.textos,
+            "lotes": self.lotes,
+            "erros": self.erros,
+            "lote_medio": round(float(tamanhos.mean()), 2) if len(tamanhos) else 0.0,
+            "lote_max": int(tamanhos.max()) if len(tamanhos) else 0,
+            "latencia_ms_p50": round(float(p50), 3),
+            "latencia_ms_p95": round(float(p95), 3),
+            "latencia_ms_p99": round(float(p99), 3),
+            "max_lote": self.max_lote,
+            "espera_ms": self.espera_s * 1000.0,
+        }
+
+
+# ============================================================
+# 2) Servidor HTTP (HTTP/1.1 mínimo, com keep-alive)
+# ============================================================
+
+class ServidorClassificacao:
+
+    def __init__(self, servico=None, host: str = HOST_PADRAO, porta: int = PORTA_PADRAO,
+                 max_lote: int = 64, espera_ms: float = 5.0):
+        if servico is None:
+            from app.core.classifier_service import ClassifierService
+            servico = ClassifierService()
+        self.servico = servico
+        self.host = host
+        self.porta = porta
+        self.lote = MicroLote(servico.predict_batch, max_lote=max_lote, espera_ms=espera_ms)
+        self._servidor: Optional[asyncio.AbstractServer] = None
+
+    async def iniciar(self):
+        self.lote.iniciar()
+        self._servidor = await asyncio.start_server(self._atender, self.host, self.porta)
+        self.porta = self._servidor.sockets[0].getsockname()[1]  # porta 0 -> porta livre escolhida
+        print(f"[Servidor] Classificação em http://{self.host}:{self.porta}")
+
+    async def encerrar(self):
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+        await self.lote.encerrar()
+
+    async def servir(self):
+        await self.iniciar()
+        try:
+            await self._servidor.serve_forever()
+        finally:
+            await self.encerrar()
+
+    async def _atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    cabecalho = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.LimitOverrunError:
+                    await self._responder(writer, 413, {"erro": "cabeçalho grande demais"}, manter=False)
+                    break
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                linhas = cabecalho.decode("latin-1").split("\r\n")
+                metodo, rota, versao = (linhas[0].split(" ") + ["", "", ""])[:3]
+                headers = {}
+                for linha in linhas[1:]:
+                    if ":" in linha:
+                        k, v = linha.split(":", 1)
+                        headers[k.strip().lower()] = v.strip()
+                try:
+                    tamanho = int(headers.get("content-length", 0) or 0)
+                    if tamanho < 0:
+                        raise ValueError(tamanho)
+                except ValueError:
+                    await self._responder(writer, 400, {"erro": "Content-Length inválido"}, manter=False)
+                    break
+                if tamanho > MAX_CORPO:
+                    await self._responder(writer, 413, {"erro": "corpo grande demais"}, manter=False)
+                    break
+                try:
+                    corpo = await reader.readexactly(tamanho) if tamanho else b""
+                except asyncio.IncompleteReadError:
+                    await self._responder(writer, 400, {"erro": "corpo menor que o Content-Length"}, manter=False)
+                    break
+                except ConnectionError:
+                    break
+
+                status, resposta = await self._rotear(metodo, rota.split("?")[0], corpo)
+                manter = headers.get("connection", "").lower() != "close" and versao == "HTTP/1.1"
+                await self._responder(writer, status, resposta, manter)
+                if not manter:
+                    break
+        except ConnectionError:
+            pass  # cliente fechou a conexão antes da resposta
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _rotear(self, metodo: str, rota: str, corpo: bytes):
+        if metodo == "GET" and rota == "/saude":
+            return 200, {"status": "ok"}
+        if metodo == "GET" and rota == "/stats":
+            return 200, self.lote.stats()
+        if metodo == "POST" and rota == "/classificar":
+            try:
+                dados = json.loads(corpo or b"{}")
+                textos = dados["textos"] if "textos" in dados else [dados["texto"]]
+                if not isinstance(textos, list):
+                    raise ValueError("'textos' deve ser uma lista")
+                if not all(t is None or isinstance(t, str) for t in textos):
+                    raise ValueError("cada texto deve ser string ou null")
+            except (ValueError, KeyError, TypeError) as e:
+                return 400, {"erro": f"corpo inválido: {e}"}
+            try:
+                return 200, {"codigos": await self.lote.classificar(textos)}
+            except Exception as e:
+                return 500, {"erro": str(e)}
+        return 404, {"erro": f"rota não encontrada: {metodo} {rota}"}
+
+    @staticmethod
+    async def _responder(writer: asyncio.StreamWriter, status: int, resposta: dict, manter: bool):
+        corpo = json.dumps(resposta, ensure_ascii=False).encode("utf-8")
+        motivo = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+                  500: "Internal Server Error"}[status]
+        writer.write(
+            f"HTTP/1.1 {status} {motivo}\r\nContent-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(corpo)}\r\nConnection: {'keep-alive' if manter else 'close'}\r\n\r\n"
+            .encode("latin-1") + corpo)
+        await writer.drain()
+
+
+def iniciar_em_segundo_plano(servico=None, host: str = HOST_PADRAO, porta: int = 0,
+                             max_lote: int = 64, espera_ms: float = 5.0) -> ServidorClassificacao:
+    """
+    Sobe o servidor num thread próprio (loop de eventos dedicado) e retorna já escutando.
+    Para parar: servidor.parar(). Útil para embutir em outras ferramentas e nos testes.
+    """
+    servidor = ServidorClassificacao(servico, host, porta, max_lote, espera_ms)
+    loop = asyncio.new_event_loop()
+    pronto = threading.Event()
+    falha: List[BaseException] = []
+
+    def _rodar():
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(servidor.iniciar())
+        except BaseException as e:  # ex.: porta ocupada -> repassa a quem chamou
+            falha.append(e)
+            loop.run_until_complete(servidor.encerrar())
+            loop.close()
+            pronto.set()
+            return
+        pronto.set()
+        loop.run_forever()
+        loop.run_until_complete(servidor.encerrar())
+        loop.close()
+
+    thread = threading.Thread(target=_rodar, name="classifier-server", daemon=True)
+    thread.start()
+    pronto.wait()
+    if falha:
+        thread.join()
+        raise falha[0]
+
+    def parar():
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+    servidor.parar = parar
+    return servidor
+
+
+# ============================================================
+# 3) Cliente local
+# ============================================================
+
+def classificar_remoto(textos: List[str], host: str = HOST_PADRAO, porta: int = PORTA_PADRAO,
+                       timeout: float = 10.0) -> List[str]:
+    """Classifica via servidor local (urllib, sem sklearn no processo cliente)."""
+    req = urllib.request.Request(
+        f"http://{host}:{porta}/classificar",
+        data=json.dumps({"textos": list(textos)}, ensure_ascii=False).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return json.loads(resp.read())["codigos"]
+
+
+def stats_remoto(host: str = HOST_PADRAO, porta: int = PORTA_PADRAO, timeout: float = 10.0) -> dict:
+    with urllib.request.urlopen(f"http://{host}:{porta}/stats", timeout=timeout) as resp:
+        return json.loads(resp.read())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local de classificação de defeitos (micro-lotes)")
+    parser.add_argument("--host", default=HOST_PADRAO)
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO)
+    parser.add_argument("--max-lote", type=int, default=64)
+    parser.add_argument("--espera-ms", type=float, default=5.0)
+    args = parser.parse_args(argv)
+    servidor = ServidorClassificacao(host=args.host, porta=args.porta,
+                                     max_lote=args.max_lote, espera_ms=args.espera_ms)
+    try:
+        asyncio.run(servidor.servir())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,8 @@ import re
 import unicodedata
 import pandas as pd
 
+from services.text_normalizer import STOPWORDS_TECNICAS, normalizar
+
 
 def remover_acentos(texto: str) -> str:
     """Remove acentos preservando caracteres básicos."""
@@ -34,13 +36,6 @@ def limpeza_basica(texto: str) -> str:
     return texto
 
 
-# Palavras sem valor técnico
-STOPWORDS_TECNICAS = {
-    "DO", "DA", "DE", "UM", "UMA", "NO", "OS", "AS", 
-    "PARA", "COM", "QUE", "EM"
-}
-
-
 def remover_stopwords(texto: str) -> str:
     """Remove palavras comuns que não influenciam diagnóstico."""
     tokens = texto.split()
@@ -54,7 +49,7 @@ def clean_text(texto: str) -> str:
     1) remoção de acentos
     2) normalização
     3) remoção de stopwords
+    (fundido numa única passada: normalizar(texto, "limpeza"); para colunas,
+    services.text_normalizer.normalizar_serie)
     """
-    texto = limpeza_basica(texto)
-    texto = remover_stopwords(texto)
-    return texto
+    return normalizar(texto, "limpeza")
@@ -0,0 +1,106 @@
+"""
+services/text_dictionary.py
+
+Responsabilidade:
+- Codificação por dicionário das colunas de texto: cada linha guarda só um
+  código inteiro (int32) e os textos distintos ficam numa tabela única
+- As etapas de texto (limpeza, normalização, embeddings, TF-IDF, agrupamento)
+  rodam sobre a tabela de distintos e o resultado volta às linhas pelo código
+- Multiplicidade (nº de linhas de cada texto distinto) para as etapas que
+  dependem da frequência nas linhas (IDF do TF-IDF, densidade do DBSCAN)
+- Persistência da tabela ao lado do parquet das linhas
+  (texto_processado.parquet -> texto_processado_dicionario.parquet)
+
+Este módulo DEVE SER independente de UI.
+"""
+
+from pathlib import Path
+from typing import Iterable, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+COL_CODIGO = "TEXTO_COD"
+COL_LINHAS = "LINHAS"
+
+
+# ============================================================
+# 1) Codificação / expansão
+# ============================================================
+
+def codificar(valores: Iterable) -> Tuple[np.ndarray, List]:
+    """
+    (códigos int32 por linha, valores distintos na ordem da 1ª aparição).
+    dict e não pd.factorize: o factorize de strings trunca no "\\x00" e
+    junta valores distintos; nulos viram valores distintos como os demais.
+    """
+    indice = {}
+    codigos = np.fromiter((indice.setdefault(v, len(indice)) for v in valores), dtype=np.int32)
+    return codigos, list(indice)
+
+
+def multiplicidade(codigos: np.ndarray, n_distintos: int) -> np.ndarray:
+    """Quantas linhas usam cada código."""
+    return np.bincount(codigos, minlength=n_distintos).astype(np.int64)
+
+
+def expandir(valores_distintos, codigos: np.ndarray):
+    """
+    Resultado por texto distinto -> resultado por linha.
+    Matriz (numpy ou CSR): linhas indexadas pelo código; lista: mesmos objetos
+    compartilhados entre as linhas de um mesmo código (sem cópia por linha).
+    """
+    if sparse.issparse(valores_distintos):
+        return valores_distintos.tocsr()[codigos]
+    if isinstance(valores_distintos, np.ndarray):
+        return valores_distintos[codigos]
+    return [valores_distintos[c] for c in codigos]
+
+
+def codificar_serie(s: pd.Series) -> Tuple[np.ndarray, pd.DataFrame]:
+    """
+    (códigos por linha, dicionário): dicionário com TEXTO_COD, os valores
+    distintos (coluna com o nome da série) e LINHAS (multiplicidade).
+    """
+    codigos, distintos = codificar(s)
+    dicionario = pd.DataFrame({
+        COL_CODIGO: np.arange(len(distintos), dtype=np.int32),
+        s.name: pd.Series(distintos, dtype=object),
+        COL_LINHAS: multiplicidade(codigos, len(distintos)),
+    })
+    return codigos, dicionario
+
+
+# ============================================================
+# 2) Persistência (ao lado do parquet das linhas)
+# ============================================================
+
+def caminho_dicionario(path_linhas: Union[str, Path]) -> Path:
+    path_linhas = Path(path_linhas)
+    return path_linhas.with_name(f"{path_linhas.stem}_dicionario.parquet")
+
+
+def salvar_dicionario(dicionario: pd.DataFrame, path_linhas: Union[str, Path]) -> Path:
+    """Grava o dicionário de textos ao lado de `path_linhas` (troca atômica)."""
+    destino = caminho_dicionario(path_linhas)
+    tmp = destino.with_suffix(".tmp.parquet")
+    dicionario.to_parquet(tmp, index=False)
+    tmp.replace(destino)
+    return destino
+
+
+def carregar_dicionario(path_linhas: Union[str, Path]) -> pd.DataFrame:
+    destino = caminho_dicionario(path_linhas)
+    if not destino.exists():
+        raise FileNotFoundError(f"Dicionário de textos não encontrado: {destino}")
+    return pd.read_parquet(destino)
+
+
+def decodificar(df: pd.DataFrame, dicionario: pd.DataFrame, colunas: List[str],
+                col_codigo: str = COL_CODIGO) -> pd.DataFrame:
+    """Acrescenta a `df` as colunas do dicionário, expandidas pelo código de cada linha."""
+    codigos = df[col_codigo].to_numpy()
+    for col in colunas:
+        df[col] = dicionario[col].to_numpy()[codigos]
+    return df
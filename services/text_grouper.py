@@ -6,6 +6,9 @@ Responsabilidade:
 - Baseado nos embeddings gerados na Fase 2
 - Retorna labels de cluster
 - Salvamento opcional para auditoria
+- Textos repetidos: DBSCAN roda sobre os distintos com sample_weight = nº de
+  linhas (mesmos grupos que sobre as linhas); HDBSCAN não aceita pesos e
+  continua sobre as linhas
 
 Usado na Fase 2:
 ( 🔹 Etapa 4: Agrupamento de causas semelhantes )
@@ -16,6 +19,8 @@ import pandas as pd
 from typing import Optional
 from sklearn.cluster import DBSCAN
 
+from services.text_dictionary import COL_CODIGO, codificar, expandir, multiplicidade
+
 try:
     import hdbscan
     _HDBSCAN_AVAILABLE = True
@@ -27,14 +32,16 @@ except ImportError:
 # 1) Agrupador DBSCAN
 # ============================================================
 
-def cluster_dbscan(embeddings: np.ndarray, eps: float = 0.8, min_samples: int = 5):
+def cluster_dbscan(embeddings: np.ndarray, eps: float = 0.8, min_samples: int = 5,
+                   pesos: Optional[np.ndarray] = None):
     """
     Aplica DBSCAN sobre embeddings (spaCy ou TF-IDF).
+    pesos: nº de linhas de cada embedding distinto (sample_weight do DBSCAN).
     Retorna array de labels: [-1, 0, 1, ...]
     """
     print("[Grouper] Executando DBSCAN...")
     model = DBSCAN(eps=eps, min_samples=min_samples, metric="cosine")
-    labels = model.fit_predict(embeddings)
+    labels = model.fit_predict(embeddings, sample_weight=pesos)
     return labels
 
 
@@ -63,25 +70,26 @@ def cluster_hdbscan(embeddings: np.ndarray, min_cluster_size: int = 8):
 # 3) Função de alto nível — decide automaticamente
 # ============================================================
 
-def agrupar_textos(embeddings: np.ndarray, metodo: str = "auto"):
+def agrupar_textos(embeddings: np.ndarray, metodo: str = "auto", codigos: Optional[np.ndarray] = None):
     """
     método:
         "auto" → usa HDBSCAN se disponível, senão DBSCAN
         "hdbscan"
         "dbscan"
-    Retorna: labels (clusters)
+    codigos: código do texto distinto de cada linha (embeddings = uma linha por
+    texto distinto); sem codigos, embeddings é uma linha por defeito.
+    Retorna: labels (clusters) por linha
     """
+    if metodo == "auto":
+        metodo = "hdbscan" if _HDBSCAN_AVAILABLE else "dbscan"
+
     if metodo == "hdbscan":
-        return cluster_hdbscan(embeddings)
+        return cluster_hdbscan(embeddings if codigos is None else expandir(embeddings, codigos))
 
-    if metodo == "dbscan":
+    if codigos is None:
         return cluster_dbscan(embeddings)
-
-    # modo AUTO
-    if _HDBSCAN_AVAILABLE:
-        return cluster_hdbscan(embeddings)
-
-    return cluster_dbscan(embeddings)
+    labels = cluster_dbscan(embeddings, pesos=multiplicidade(codigos, len(embeddings)))
+    return expandir(labels, codigos)
 
 
 # ============================================================
@@ -89,16 +97,23 @@ def agrupar_textos(embeddings: np.ndarray, metodo: str = "auto"):
 # ============================================================
 
 def adicionar_grupo_no_dataframe(df: pd.DataFrame, embeddings_col: str = "EMBEDDING",
-                                 metodo: str = "auto"):
+                                 metodo: str = "auto", col_codigo: str = COL_CODIGO):
     """
     Cria coluna GRUPO_TEXTO contendo o cluster de cada defeito.
+    Com a coluna de código do dicionário de textos (TEXTO_COD), só um embedding
+    por texto distinto é empilhado e agrupado.
     """
     print("[Grouper] Agrupando textos...")
 
-    # converter lista de vetores → matrix numpy
-    vecs = np.vstack(df[embeddings_col].values)
-
-    labels = agrupar_textos(vecs, metodo=metodo)
+    if col_codigo in df.columns:
+        codigos, _ = codificar(df[col_codigo])  # códigos densos, na ordem da 1ª linha
+        primeira = np.unique(codigos, return_index=True)[1]
+        vecs = np.vstack(df[embeddings_col].values[primeira])
+        labels = agrupar_textos(vecs, metodo=metodo, codigos=codigos)
+    else:
+        # converter lista de vetores → matrix numpy
+        vecs = np.vstack(df[embeddings_col].values)
+        labels = agrupar_textos(vecs, metodo=metodo)
 
     df["GRUPO_TEXTO"] = labels.astype(int)
 
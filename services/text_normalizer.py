@@ -6,10 +6,30 @@
 # - Condensa espaços
 # - Troca espaços por underscore
 # - Retorna MAIÚSCULAS (compatível com pipeline atual)
+#
+# Normalizador unificado (normalizar / normalizar_lote / normalizar_serie):
+# uma única passada de str.translate por texto, com tabela por modo preenchida
+# sob demanda (__missing__) com a regra caractere a caractere de cada variante.
+# Modos (saída idêntica à variante original):
+# - "classificador": normalizar_texto (abaixo)
+# - "limpeza":       services.text_cleaner.clean_text
+# - "pipeline":      normalizar_texto(clean_text(t)) (pipeline/text_processor)
+# - "unificador":    utils.unificador.normalizar_texto
+# - "catalogo":      app.core.catalogo_engine._norm
 
 import re
 import unicodedata
-from typing import List, Optional
+from typing import Callable, Dict, Iterable, List, Optional
+
+MODOS = ("classificador", "limpeza", "pipeline", "unificador", "catalogo")
+
+# Palavras sem valor técnico (removidas nos modos "limpeza" e "pipeline")
+STOPWORDS_TECNICAS = {
+    "DO", "DA", "DE", "UM", "UMA", "NO", "OS", "AS",
+    "PARA", "COM", "QUE", "EM"
+}
+
+_SEP = "\x00"  # separador dos textos unidos em normalizar_lote
 
 def _remover_acentos(text: str) -> str:
     """Remove acentos mantendo caracteres base (á -> a)."""
@@ -18,14 +38,6 @@ def _remover_acentos(text: str) -> str:
     nfkd = unicodedata.normalize("NFKD", text)
     return "".join([c for c in nfkd if not unicodedata.combining(c)])
 
-def _limpar_pontuacao(text: str) -> str:
-    """
-    Substitui qualquer caracter que não seja letra, número ou underscore por espaço.
-    Mantemos números e palavras curtas — não removemos stopwords.
-    """
-    # \w equivale a [a-zA-Z0-9_], usamos re.UNICODE para segurança internacional
-    return re.sub(r"[^\w\s]", " ", text, flags=re.UNICODE)
-
 def normalizar_texto(text: Optional[str]) -> str:
     """
     Normaliza um único texto:
@@ -36,37 +48,184 @@ def normalizar_texto(text: Optional[str]) -> str:
     - substitui espaços por underscore
     - remove underscores duplicados
     - converte para MAIÚSCULAS
+    (mesmo resultado de normalizar(text, "classificador"), que é o caminho usado)
     """
-    if text is None:
-        return ""
+    return normalizar(text, "classificador")
+
+def normalizar_batch(texts: List[Optional[str]]) -> List[str]:
+    """Normaliza uma lista de textos (útil em pipelines)."""
+    return normalizar_lote(texts, "classificador")
+
+
+# -----------------------
+# Regras por caractere de cada modo (o que o caractere vira; espaço em branco -> " ")
+# -----------------------
+def _regra_classificador(ch: str) -> str:
+    # acentos fora (NFKD sem combinantes), [^\w\s] -> espaço, MAIÚSCULAS no fim
+    saida = []
+    for c in _remover_acentos(ch):
+        if c.isspace():
+            saida.append(" ")
+        elif c.isalnum() or c == "_":
+            saida.append(c.upper())
+        else:
+            saida.append(" ")
+    return "".join(saida)
+
+def _regra_limpeza(ch: str) -> str:
+    # acentos fora, MAIÚSCULAS, [^A-Z0-9\s] -> espaço
+    return "".join(" " if (c.isspace() or not ("A" <= c <= "Z" or "0" <= c <= "9")) else c
+                   for c in _remover_acentos(ch).upper())
+
+def _regra_unificador(ch: str) -> str:
+    # MAIÚSCULAS (sem tirar acentos), travessões -> "-", [^A-Z0-9\-\s/] -> espaço
+    saida = []
+    for c in ch.upper():
+        if c in "–—":
+            c = "-"
+        saida.append(c if "A" <= c <= "Z" or "0" <= c <= "9" or c in "-/" else " ")
+    return "".join(saida)
+
+def _regra_catalogo(ch: str) -> str:
+    # MAIÚSCULAS; mantém alfanuméricos e - / . % ; os demais caracteres somem
+    return "".join(" " if c.isspace() else c for c in ch.upper()
+                   if c.isalnum() or c.isspace() or c in "-/.%")
+
+_REGRAS: Dict[str, Callable[[str], str]] = {
+    "classificador": _regra_classificador,
+    "limpeza": _regra_limpeza,
+    "pipeline": _regra_limpeza,
+    "unificador": _regra_unificador,
+    "catalogo": _regra_catalogo,
+}
 
-    # garantir string
-    s = str(text)
 
-    # 1) strip externo
-    s = s.strip()
+class _TabelaTraducao(dict):
+    """Tabela de str.translate de um modo, preenchida sob demanda por caractere."""
 
-    # 2) remover acentos
-    s = _remover_acentos(s)
+    def __init__(self, regra: Callable[[str], str], separador: Optional[str] = None):
+        super().__init__()
+        self.regra = regra
+        self.separador = separador
 
-    # 3) substituir pontuação por espaço (mantém numeros e letras)
-    s = _limpar_pontuacao(s)
+    def __missing__(self, codigo: int) -> str:
+        ch = chr(codigo)
+        valor = ch if ch == self.separador else self.regra(ch)
+        self[codigo] = valor
+        return valor
 
-    # 4) normalizar espaços (multiespaços -> single space)
-    s = re.sub(r"\s+", " ", s).strip()
+_TABELAS = {modo: _TabelaTraducao(regra) for modo, regra in _REGRAS.items()}
+_TABELAS_LOTE = {modo: _TabelaTraducao(regra, _SEP) for modo, regra in _REGRAS.items()}
+_TABELAS_ASCII: Dict[str, tuple] = {}
 
-    if s == "":
+def _tabela_ascii(modo: str) -> tuple:
+    """(tabela, apagar) de bytes.translate para lotes só ASCII (todo ASCII vira 0 ou 1 caractere ASCII)."""
+    tabela = _TABELAS_ASCII.get(modo)
+    if tabela is None:
+        mapa, apagar = bytearray(range(256)), bytearray()
+        for i in range(128):
+            valor = _TABELAS_LOTE[modo][i]
+            if valor:
+                mapa[i] = ord(valor)
+            else:
+                apagar.append(i)
+        tabela = _TABELAS_ASCII[modo] = (bytes(mapa), bytes(apagar))
+    return tabela
+
+_ESPACOS = re.compile("  +")
+_UNDERSCORES = re.compile("__+")
+_ESPACO_OU_UNDERSCORE = re.compile("[ _]+")
+# stopword precedida de espaço e seguida de espaço (o lote é cercado de espaços)
+_STOPWORDS = re.compile(" (?:" + "|".join(sorted(STOPWORDS_TECNICAS)) + ")(?= )")
+
+
+# -----------------------
+# Normalizador unificado
+# -----------------------
+def _como_texto(x, modo: str) -> Optional[str]:
+    """Entrada -> str; None quando a variante devolve "" direto (nulos)."""
+    if isinstance(x, str):
+        return x
+    if x is None:
+        return None
+    if modo == "classificador":
+        return str(x)  # normalizar_texto só trata None (NaN vira "NAN")
+    import pandas as pd
+
+    return None if pd.isna(x) else str(x)
+
+def _finalizar(t: str, modo: str) -> str:
+    """Passos depois do translate (t só tem " " como espaço em branco)."""
+    if modo == "classificador":
+        return _ESPACO_OU_UNDERSCORE.sub("_", t.strip(" "))
+    if modo in ("limpeza", "pipeline"):
+        tokens = [tok for tok in t.split(" ") if tok and tok not in STOPWORDS_TECNICAS]
+        return ("_" if modo == "pipeline" else " ").join(tokens)
+    return _ESPACOS.sub(" ", t).strip(" ")
+
+def normalizar(texto, modo: str = "classificador") -> str:
+    """Normaliza um texto segundo `modo` (ver MODOS) numa única passada de translate."""
+    if modo not in _TABELAS:
+        raise ValueError(f"modo deve ser um de {MODOS}")
+    t = _como_texto(texto, modo)
+    if not t:
         return ""
+    return _finalizar(t.translate(_TABELAS[modo]), modo)
 
-    # 5) transformar espaços em underscore e remover underscores duplicados
-    s = s.replace(" ", "_")
-    s = re.sub(r"_+", "_", s)
+def _normalizar_unidos(textos: List[str], modo: str, so_ascii: bool) -> List[str]:
+    unido = _SEP.join(textos)
+    if unido.count(_SEP) != len(textos) - 1:
+        # algum texto contém o separador: caminho texto a texto
+        return [normalizar(t, modo) for t in textos]
 
-    # 6) tornar maiúsculo (consistência com pipeline existente)
-    return s.upper()
+    if so_ascii:
+        unido = unido.encode("ascii").translate(*_tabela_ascii(modo)).decode("ascii")
+    else:
+        unido = unido.translate(_TABELAS_LOTE[modo])
+    if modo in ("limpeza", "pipeline"):
+        unido = _STOPWORDS.sub("", f" {unido.replace(_SEP, f' {_SEP} ')} ")
+    unido = _ESPACOS.sub(" ", unido).replace(f" {_SEP}", _SEP).replace(f"{_SEP} ", _SEP).strip(" ")
+    if modo == "classificador":
+        unido = _UNDERSCORES.sub("_", unido.replace(" ", "_"))
+    elif modo == "pipeline":
+        unido = unido.replace(" ", "_")
+    return unido.split(_SEP)
 
-def normalizar_batch(texts: List[Optional[str]]) -> List[str]:
-    """Normaliza uma lista de textos (útil em pipelines)."""
-    return [normalizar_texto(t) for t in texts]
+def normalizar_lote(textos: Iterable, modo: str = "classificador") -> List[str]:
+    """
+    normalizar para uma lista de textos: unidos por um separador e passados por
+    um único translate (bytes.translate para os textos só ASCII, str.translate
+    para os demais); espaços, stopwords e underscores são tratados com regex
+    pré-compiladas sobre o texto unido.
+    """
+    if modo not in _TABELAS:
+        raise ValueError(f"modo deve ser um de {MODOS}")
+    textos = [_como_texto(x, modo) or "" for x in textos]
+    ascii_ = [t.isascii() for t in textos]
+    if all(ascii_) or not any(ascii_):
+        return _normalizar_unidos(textos, modo, bool(ascii_) and ascii_[0]) if textos else []
+
+    saida = [""] * len(textos)
+    for grupo in (True, False):
+        posicoes = [i for i, a in enumerate(ascii_) if a is grupo]
+        for i, valor in zip(posicoes, _normalizar_unidos([textos[i] for i in posicoes], modo, grupo)):
+            saida[i] = valor
+    return saida
+
+def normalizar_serie(s, modo: str = "classificador"):
+    """
+    normalizar para uma coluna (pd.Series, mesmo índice, dtype object): cada
+    valor distinto é normalizado uma única vez (normalizar_lote).
+    """
+    import numpy as np
+    import pandas as pd
+
+    s = s if isinstance(s, pd.Series) else pd.Series(list(s), dtype=object)
+    # dict e não pd.factorize: o factorize de strings trunca no "\x00" e junta valores distintos
+    indice = {}
+    codigos = np.fromiter((indice.setdefault(v, len(indice)) for v in s), dtype=np.int64, count=len(s))
+    valores = np.empty(len(indice), dtype=object)
+    valores[:] = normalizar_lote(list(indice), modo)
+    return pd.Series(valores[codigos], index=s.index, dtype=object)
 
 # Fim do BLOCK 1
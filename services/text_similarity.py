@@ -6,6 +6,8 @@ Responsabilidade:
 - Suporta TF-IDF e Embeddings (spaCy)
 - Base para insights, diagnóstico e recomendações (Fase 3/4)
 
+Aceita matrizes densas (numpy) ou esparsas (CSR do TF-IDF) sem densificar.
+
 Funções principais:
 - cosine_similarity_matrix
 - top_k_similares
@@ -14,6 +16,7 @@ Funções principais:
 
 import numpy as np
 import pandas as pd
+from scipy import sparse
 from typing import List, Tuple
 from sklearn.metrics.pairwise import cosine_similarity
 
@@ -26,8 +29,8 @@ def cosine_similarity_matrix(X: np.ndarray, Y: np.ndarray) -> np.ndarray:
 
     """
     Calcula similaridade coseno entre duas matrizes.
-    X: (n_samples, n_features)
-    Y: (m_samples, n_features)
+    X: (n_samples, n_features) — numpy ou CSR
+    Y: (m_samples, n_features) — numpy ou CSR
 
     Retorno: matriz (n x m)
     """
@@ -60,13 +63,14 @@ def top_k_similares(
 ) -> List[Tuple[int, float]]:
     """
     Retorna os K vetores mais semelhantes
-    embedding_query: vetor (1, n_features)
-    embeddings_base: matriz (N, n_features)
+    embedding_query: vetor (1, n_features) — numpy ou CSR
+    embeddings_base: matriz (N, n_features) — numpy ou CSR
 
     Retorno:
       lista de tuplas (index, similaridade)
     """
-    sim = cosine_similarity(embedding_query.reshape(1, -1), embeddings_base)[0]
+    consulta = embedding_query if sparse.issparse(embedding_query) else embedding_query.reshape(1, -1)
+    sim = cosine_similarity(consulta, embeddings_base)[0]
 
     # ordena do maior → menor
     idx_sorted = np.argsort(sim)[::-1]
@@ -89,8 +93,9 @@ def buscar_similares_no_dataframe(
     Retorna os K defeitos mais semelhantes ao texto fornecido.
     """
 
-    # empilha embeddings
-    base = np.vstack(df[coluna_embeddings].values)
+    # empilha embeddings (linhas CSR do TF-IDF continuam esparsas)
+    vetores = df[coluna_embeddings].values
+    base = sparse.vstack(vetores).tocsr() if len(vetores) and sparse.issparse(vetores[0]) else np.vstack(vetores)
 
     # pega top-k
     topk = top_k_similares(texto_embedding, base, k=k)
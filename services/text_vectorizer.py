@@ -3,18 +3,24 @@ services/text_vectorizer.py
 
 Responsabilidade:
 - Transformar textos limpos / normalizados em vetores
-- Suporte a TF-IDF
+- Suporte a TF-IDF (matrizes esparsas CSR; denso só com denso=True)
 - Suporte a embeddings spaCy
+- Persistência de matrizes TF-IDF em .npz (carregamento retorna CSR)
+- Textos repetidos são processados uma única vez (services/text_dictionary):
+  embeddings e TF-IDF sobre os distintos, IDF ponderado pela multiplicidade
 - Modular, funções pequenas, PT-BR
 
 Este módulo DEVE SER independente de UI.
 """
 
-import spacy
 import numpy as np
-from typing import List, Optional
+from pathlib import Path
+from typing import List, Optional, Union
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
 
+from services.text_dictionary import codificar, expandir, multiplicidade
+
 
 # ============================================================
 # 1) Carregamento do modelo spaCy
@@ -27,6 +33,8 @@ def load_spacy_model(model_name: str = "pt_core_news_md"):
     global _spacy_model
 
     if _spacy_model is None:
+        import spacy  # só os embeddings dependem do spaCy; TF-IDF funciona sem ele
+
         print(f"[spaCy] Carregando modelo {model_name}...")
         _spacy_model = spacy.load(model_name)
 
@@ -54,40 +62,84 @@ def embed_text(text: str, model=None) -> np.ndarray:
 def embed_batch(texts: List[str], model=None) -> np.ndarray:
     """
     Processa uma lista de textos e retorna matriz (N x D).
+    Cada texto distinto passa uma única vez pelo spaCy.
     """
     if model is None:
         model = load_spacy_model()
 
+    codigos, distintos = codificar(texts)
     vectors = []
-    for t in texts:
+    for t in distintos:
         vectors.append(embed_text(t, model=model))
-    return np.vstack(vectors)
+    return np.vstack(vectors)[codigos]
 
 
 # ============================================================
 # 3) TF-IDF (estatístico)
 # ============================================================
 
-def gerar_tfidf(texts: List[str]) -> tuple[TfidfVectorizer, np.ndarray]:
+def _idf_ponderado(vectorizer: TfidfVectorizer, X: sparse.csr_matrix, pesos: np.ndarray) -> np.ndarray:
+    """IDF como se cada texto aparecesse `pesos[i]` vezes (mesma fórmula do TfidfTransformer)."""
+    presenca = X.copy()
+    presenca.data[:] = 1.0
+    df = presenca.T @ pesos
+    n = pesos.sum()
+    if vectorizer.smooth_idf:
+        df, n = df + 1.0, n + 1.0
+    return np.log(n / df) + 1.0
+
+
+def gerar_tfidf(texts: List[str], denso: bool = False,
+                pesos: Optional[np.ndarray] = None) -> tuple[TfidfVectorizer, Union[sparse.csr_matrix, np.ndarray]]:
     """
     Gera matriz TF-IDF para uma lista de textos normalizados.
+    pesos: multiplicidade de cada texto (ex.: LINHAS do dicionário de textos);
+    o IDF fica igual ao de um ajuste sobre as linhas repetidas, com custo
+    proporcional aos textos distintos.
 
     Retorna:
     - vetorizador treinado (para transformar novos textos)
-    - matriz TF-IDF (numpy)
+    - matriz TF-IDF (CSR esparsa; numpy denso apenas com denso=True)
     """
     vectorizer = TfidfVectorizer(
         lowercase=True,
         ngram_range=(1, 2),   # unigrama + bigrama (melhor para defeitos)
     min_df=1,             # evita ruído raro demais
     )
-    X = vectorizer.fit_transform(texts)
-    return vectorizer, X.toarray()
+    X = vectorizer.fit_transform(texts).tocsr()
+    if pesos is not None:
+        vectorizer.idf_ = _idf_ponderado(vectorizer, X, np.asarray(pesos, dtype=np.float64))
+        X = vectorizer.transform(texts).tocsr()
+    return vectorizer, X.toarray() if denso else X
+
 
+def tfidf_transform(vectorizer: TfidfVectorizer, texts: List[str], denso: bool = False) -> Union[sparse.csr_matrix, np.ndarray]:
+    """Transforma novos textos usando o TF-IDF treinado (CSR; denso só com denso=True)."""
+    X = vectorizer.transform(texts).tocsr()
+    return X.toarray() if denso else X
 
-def tfidf_transform(vectorizer: TfidfVectorizer, texts: List[str]) -> np.ndarray:
-    """Transforma novos textos usando o TF-IDF treinado."""
-    return vectorizer.transform(texts).toarray()
+
+def salvar_matriz_tfidf(X, path: Union[str, Path]) -> Path:
+    """Salva a matriz TF-IDF em .npz esparso (memória/disco proporcionais aos não-zeros)."""
+    path = Path(path).with_suffix(".npz")
+    sparse.save_npz(path, sparse.csr_matrix(X))
+    return path
+
+
+def carregar_matriz_tfidf(path: Union[str, Path], denso: bool = False) -> Union[sparse.csr_matrix, np.ndarray]:
+    """
+    Carrega a matriz TF-IDF como CSR (.npz; um .npy denso antigo também é aceito).
+    Conversão para numpy denso só com denso=True.
+    """
+    path = Path(path)
+    npz = path.with_suffix(".npz")
+    if npz.exists():
+        X = sparse.load_npz(npz).tocsr()
+    elif path.with_suffix(".npy").exists():
+        X = sparse.csr_matrix(np.load(path.with_suffix(".npy")))
+    else:
+        raise FileNotFoundError(f"Matriz TF-IDF não encontrada: {npz}")
+    return X.toarray() if denso else X
 
 
 # ============================================================
@@ -98,23 +150,23 @@ def vetorizar_dataframe(df, col_texto_normalizado: str):
     """
     Adiciona ao DataFrame:
     - 'EMBEDDING' (spaCy)
-    - 'TFIDF_VETOR' (lista)
+    - 'TFIDF_VETOR' (uma linha CSR 1 x vocabulário por texto)
     - 'TFIDF_OBJ'  (objeto vetorizador)
 
     Retorna:
     df_modificado, vectorizer_tfidf
     """
-    textos = df[col_texto_normalizado].astype(str).tolist()
+    codigos, textos = codificar(df[col_texto_normalizado].astype(str))
 
-    # Embeddings spaCy
+    # Embeddings spaCy (um por texto distinto; as linhas compartilham o vetor)
     print("[Vectorizer] Gerando embeddings spaCy...")
     model = load_spacy_model()
     embeddings = embed_batch(textos, model=model)
-    df["EMBEDDING"] = list(embeddings)
+    df["EMBEDDING"] = expandir(list(embeddings), codigos)
 
-    # TF-IDF
+    # TF-IDF (ajustado nos distintos, IDF ponderado pelo nº de linhas)
     print("[Vectorizer] Gerando TF-IDF...")
-    vectorizer, X_tfidf = gerar_tfidf(textos)
-    df["TFIDF_VETOR"] = list(X_tfidf)
+    vectorizer, X_tfidf = gerar_tfidf(textos, pesos=multiplicidade(codigos, len(textos)))
+    df["TFIDF_VETOR"] = expandir([X_tfidf[i] for i in range(X_tfidf.shape[0])], codigos)
 
     return df, vectorizer
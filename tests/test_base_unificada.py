@@ -0,0 +1,63 @@
+import pandas as pd
+
+from utils.base_unificada import EscritorBaseUnificada, ler_base_unificada, ler_manifesto, salvar_base_unificada
+
+
+def _base():
+    return pd.DataFrame({
+        "ORDEM": [1, 2, 3, 4],
+        "COMPONENTE": ["0402-59", 130203, "X1", float("nan")],
+        "MODELO_ID": ["CM-250", "AWS-BBS-01-B", "CM-250", "MO-01-21-E"],
+        "ANO": [2025, 2025, 2025, 2026],
+        "MES_NUM": [10, 11, 11, 1],
+        "PROD_QTY_GERAL": [10.0, None, 5.0, 1.0],
+    })
+
+
+def test_salvar_e_ler_com_poda(tmp_path):
+    df = _base()
+    gravadas = salvar_base_unificada(df, path=tmp_path)
+    assert gravadas == ["ANO=2025/MES_NUM=10", "ANO=2025/MES_NUM=11", "ANO=2026/MES_NUM=1"]
+
+    pd.testing.assert_frame_equal(ler_base_unificada(path=tmp_path), df)
+    assert ler_base_unificada(anos=[2025], meses=[11], path=tmp_path)["ORDEM"].tolist() == [2, 3]
+    assert ler_base_unificada(modelos=["CM-250"], colunas=["ORDEM"], path=tmp_path).columns.tolist() == ["ORDEM"]
+    assert ler_base_unificada(modelos=["CM-250"], path=tmp_path)["ORDEM"].tolist() == [1, 3]
+
+
+def test_salvar_regrava_apenas_particoes_alteradas(tmp_path):
+    df = _base()
+    salvar_base_unificada(df, path=tmp_path)
+
+    df2 = df[df["ANO"] == 2025].copy()
+    df2.loc[df2["ORDEM"] == 3, "PROD_QTY_GERAL"] = 7.0
+    assert salvar_base_unificada(df2, path=tmp_path) == ["ANO=2025/MES_NUM=11"]
+    assert sorted(ler_manifesto(tmp_path)["particoes"]) == ["ANO=2025/MES_NUM=10", "ANO=2025/MES_NUM=11"]
+    assert not (tmp_path / "ANO=2026").joinpath("MES_NUM=1").exists()
+
+
+def test_escritor_em_blocos_equivale_a_salvar(tmp_path):
+    df = _base()
+    with EscritorBaseUnificada(tmp_path / "blocos") as escritor:
+        escritor.anexar(df.iloc[:2])
+        escritor.anexar(df.iloc[2:])
+
+    assert ler_manifesto(tmp_path / "blocos")["particoes"]["ANO=2025/MES_NUM=11"]["arquivos"] == [
+        "part-00000.parquet", "part-00001.parquet"]
+    pd.testing.assert_frame_equal(ler_base_unificada(path=tmp_path / "blocos"), df)
+    assert not list(tmp_path.glob(".blocos.*"))
+
+
+def test_pipeline_le_base_do_dataset_particionado(tmp_path, monkeypatch):
+    from pipeline import text_processor
+
+    df = _base()
+    salvar_base_unificada(df, path=tmp_path / "base")
+    pd.testing.assert_frame_equal(text_processor.carregar_base_unificada(tmp_path / "base"),
+                                  ler_base_unificada(path=tmp_path / "base"))
+
+    # dataset ainda não criado: lê o base_final.parquet legado
+    legado = df.drop(columns=["COMPONENTE"])
+    legado.to_parquet(tmp_path / "base_final.parquet", index=False)
+    monkeypatch.setattr(text_processor, "BASE_FINAL_LEGADA", tmp_path / "base_final.parquet")
+    pd.testing.assert_frame_equal(text_processor.carregar_base_unificada(tmp_path / "vazio"), legado)
@@ -0,0 +1,36 @@
+import pandas as pd
+
+from benchmarks.bench_unificador import comparar, main
+from benchmarks.gerador import gerar_bases
+
+
+def test_gerador_deterministico_e_no_formato_das_planilhas():
+    df_prod, df_def = gerar_bases(2_000, seed=7)
+    df_prod2, df_def2 = gerar_bases(2_000, seed=7)
+    pd.testing.assert_frame_equal(df_def, df_def2)
+    pd.testing.assert_frame_equal(df_prod, df_prod2)
+
+    assert len(df_def) == 2_000
+    assert {"Data", "Qty_Geral", "Modelo"} <= set(df_prod.columns)
+    assert {"ORDEM", "DATA", "CODIGO", "DESCRICAO", "DESC. FALHA"} <= set(df_def.columns)
+    assert pd.to_datetime(df_def["DATA"], format="%d/%m/%Y").notna().all()
+    assert df_prod["Modelo"].str.contains(r"AWS-|MO-|CM-").all()
+    assert df_def["DESCRICAO"].nunique() < len(df_def) // 4
+
+
+def test_comparar_acusa_apenas_regressoes_acima_do_limite():
+    baseline = {"10000": {"unir_bases": {"tempo_s": 1.0, "pico_mb": 100.0}}}
+    ok = {"10000": {"unir_bases": {"tempo_s": 1.2, "pico_mb": 110.0}, "nova_etapa": {"tempo_s": 9, "pico_mb": 9}}}
+    pior = {"10000": {"unir_bases": {"tempo_s": 2.0, "pico_mb": 200.0}}}
+
+    assert comparar(ok, baseline, limite=0.25) == []
+    assert len(comparar(pior, baseline, limite=0.25)) == 2
+
+
+def test_cli_falha_sem_baseline_e_passa_depois_de_salvar(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    args = ["--linhas", "300", "--baseline", str(baseline), "--limite", "100"]
+
+    assert main(args) == 1
+    assert main(args + ["--salvar"]) == 0 and baseline.exists()
+    assert main(args) == 0
@@ -0,0 +1,165 @@
+import os
+
+import pandas as pd
+import pytest
+
+from app.core import catalogo_engine
+
+
+@pytest.fixture
+def catalogo_tmp(tmp_path, monkeypatch):
+    oficial = tmp_path / "catalogo_modelos.csv"
+    pd.DataFrame({
+        "MODELOS DEFEITOS": ["PCI DISPLAY CM-250", "BOOMBOX AWS-BBS-01-B", "CONTROLE REMOTO TV"],
+        "SE TRATA DE": ["PLACA", "PRODUTO", "ACESSORIO"],
+        "CORRESPONDE A": ["CAIXA AMPLIFICADA CM-250", "", ""],
+        "MODELOS PRODUCAO": ["CAIXA AMPLIFICADA CM-250 BIVOLT", "BOOMBOX AWS-BBS-01-B BIVOLT", ""],
+    }).to_csv(oficial, index=False)
+    monkeypatch.setattr(catalogo_engine, "CANDIDATE_FILES", [oficial])
+    monkeypatch.setattr(catalogo_engine, "LOOKUP_PATH", tmp_path / "catalogo_lookup.parquet")
+    catalogo_engine.invalidar_resolver()
+    yield tmp_path
+    catalogo_engine.invalidar_resolver()
+
+
+def test_resolver_batch_igual_resolver_individual(catalogo_tmp):
+    modelos = pd.Series(["pci  display cm-250", "BOOMBOX AWS-BBS-01-B BIVOLT", "controle remoto tv",
+                         "MODELO QUE NAO EXISTE", "PCI DISPLAY CM-250"], index=[10, 11, 12, 13, 14])
+    lote = catalogo_engine.resolver_modelos_batch(modelos)
+
+    assert lote.index.tolist() == modelos.index.tolist()
+    assert list(lote.itertuples(index=False, name=None)) == [
+        catalogo_engine.resolver_modelo_defeito(m) for m in modelos]
+    assert lote["STATUS"].tolist() == ["OK", "OK", "NAO_CONTABILIZADO", "UNKNOWN", "OK"]
+    assert lote.loc[13, "MODELO_FINAL"] == "MODELO QUE NAO EXISTE"
+
+
+def test_resolver_recompila_apos_atualizar_catalogo(catalogo_tmp):
+    assert catalogo_engine.resolver_modelo_defeito("CONTROLE REMOTO TV")[1] == "NAO_CONTABILIZADO"
+    catalogo_engine.atualizar_catalogo(pd.DataFrame({
+        "MODELO_DEFEITO": ["CONTROLE REMOTO TV"], "SE_TRATA_DE": ["ACESSORIO"],
+        "CORRESPONDE_A": ["BOOMBOX AWS-BBS-01-B"], "MODELO_PRODUCAO": ["BOOMBOX AWS-BBS-01-B BIVOLT"],
+    }))
+    assert catalogo_engine.resolver_modelo_defeito("CONTROLE REMOTO TV") == ("BOOMBOX AWS-BBS-01-B", "OK")
+
+
+def test_norm_vetorizado_igual_norm():
+    valores = ["  pci_display  cm-250 (im)", "ÁGUA\tFRIA 9K/12K", "ALTO FALANTE 8\" 3 OHMS", "",
+               "a\nb", "²½ ﬁ·x%", None, float("nan"), 12, 1.5]
+    esperado = [catalogo_engine._norm(v) for v in valores]
+    assert catalogo_engine._norm_series(pd.Series(valores, dtype=object)).tolist() == esperado
+    sem_quebra = [v for v in valores if v != "a\nb"]
+    assert catalogo_engine._norm_series(pd.Series(sem_quebra, dtype=object)).tolist() == [
+        catalogo_engine._norm(v) for v in sem_quebra]
+
+
+def test_build_lookup_persistido_so_sobrescreve_campos_preenchidos(catalogo_tmp):
+    pd.DataFrame({
+        "MODELO_DEFEITO": ["pci display cm-250"], "SE_TRATA_DE": ["PLACA PRINCIPAL"],
+        "CORRESPONDE_A": ["  "], "MODELO_PRODUCAO": [None],
+    }).to_parquet(catalogo_engine.LOOKUP_PATH, index=False)
+
+    lookup = catalogo_engine.build_lookup()
+    assert lookup["MODELO_DEFEITO"].tolist() == ["pci display cm-250", "BOOMBOX AWS-BBS-01-B", "CONTROLE REMOTO TV"]
+    assert lookup["SE_TRATA_DE"].tolist() == ["PLACA PRINCIPAL", "PRODUTO", "ACESSORIO"]
+    assert lookup.loc[0, "CORRESPONDE_A"] == "CAIXA AMPLIFICADA CM-250"
+    assert lookup["STATUS"].tolist() == ["OK", "OK", "NAO_CONTABILIZADO"]
+
+
+def test_atualizar_catalogo_deltas_concorrentes_e_compactacao(catalogo_tmp):
+    from concurrent.futures import ThreadPoolExecutor
+
+    def aprender(i):
+        for j in range(5):
+            catalogo_engine.atualizar_catalogo(pd.DataFrame({
+                "MODELO_DEFEITO": [f"modelo {i}-{j}", "CONTROLE REMOTO TV"], "SE_TRATA_DE": ["PLACA", "ACESSORIO"],
+                "CORRESPONDE_A": ["", "BOOMBOX AWS-BBS-01-B"], "MODELO_PRODUCAO": ["", "BOOMBOX AWS-BBS-01-B BIVOLT"],
+            }))
+
+    with ThreadPoolExecutor(4) as ex:
+        list(ex.map(aprender, range(4)))
+
+    assert not catalogo_engine.LOOKUP_PATH.exists()
+    assert len(catalogo_engine._listar_deltas()) == 20
+    persistido = catalogo_engine._load_persisted_lookup()
+    assert len(persistido) == 21  # nenhuma gravação perdida; chave repetida aparece uma vez
+    assert catalogo_engine.resolver_modelo_defeito("CONTROLE REMOTO TV") == ("BOOMBOX AWS-BBS-01-B", "OK")
+
+    assert catalogo_engine.compactar_lookup() == 20
+    assert catalogo_engine._listar_deltas() == []
+    pd.testing.assert_frame_equal(pd.read_parquet(catalogo_engine.LOOKUP_PATH), persistido)
+    assert catalogo_engine.resolver_modelo_defeito("controle remoto tv") == ("BOOMBOX AWS-BBS-01-B", "OK")
+    assert catalogo_engine.compactar_lookup() == 0
+
+
+def test_leitura_sem_trava_nao_perde_deltas_com_compactacao_concorrente(catalogo_tmp, monkeypatch):
+    def aprender(nome):
+        catalogo_engine.atualizar_catalogo(pd.DataFrame({
+            "MODELO_DEFEITO": [nome], "SE_TRATA_DE": ["PLACA"], "CORRESPONDE_A": [""], "MODELO_PRODUCAO": [""],
+        }))
+
+    aprender("modelo antigo")
+    catalogo_engine.compactar_lookup()
+    aprender("modelo novo")
+
+    # compactação de outro processo entre a leitura da assinatura da base e a listagem dos deltas
+    original = catalogo_engine._assinatura_base
+    pendente = [True]
+
+    def assinatura_com_compactacao():
+        assinatura = original()
+        if pendente:
+            pendente.clear()
+            catalogo_engine.compactar_lookup()
+        return assinatura
+
+    monkeypatch.setattr(catalogo_engine, "_assinatura_base", assinatura_com_compactacao)
+    persistido = catalogo_engine._load_persisted_lookup()
+    assert not pendente
+    assert set(persistido["MODELO_DEFEITO"]) == {"modelo antigo", "modelo novo"}
+
+
+def test_auditoria_incremental_sobre_base_de_defeitos(catalogo_tmp, monkeypatch):
+    from utils import ingestao
+
+    monkeypatch.setattr(ingestao, "PATH_CACHE_EXCEL", catalogo_tmp / "cache")
+    monkeypatch.setattr(catalogo_engine, "AUDITORIA_PATH", catalogo_tmp / "auditoria")
+    monkeypatch.setattr(catalogo_engine, "_AUDITORIA", None)
+    base = catalogo_tmp / "base_de_dados_defeitos.xlsx"
+    contados = []
+    contar = catalogo_engine._contar_modelos
+    monkeypatch.setattr(catalogo_engine, "_contar_modelos", lambda s: contados.append(len(s)) or contar(s))
+
+    def gravar(descricoes, segundos):
+        pd.DataFrame({"ORDEM": range(1, len(descricoes) + 1), "DESCRICAO": descricoes}).to_excel(base, index=False)
+        os.utime(base, ns=(segundos * 10**9, segundos * 10**9))
+
+    gravar(["PCI DISPLAY CM-250", "pci display cm-250", "CONTROLE REMOTO TV", "MODELO NOVO X"], 1_000)
+    assert catalogo_engine.status_auditoria(base) == {
+        "total": 3, "ok": 1, "nao_contabilizados": 1, "unknown": 1,
+        "linhas_total": 4, "linhas_ok": 2, "linhas_nao_contabilizadas": 1, "linhas_unknown": 1,
+    }
+
+    # linhas novas no fim: só elas são contadas
+    gravar(["PCI DISPLAY CM-250", "pci display cm-250", "CONTROLE REMOTO TV", "MODELO NOVO X",
+            "BOOMBOX AWS-BBS-01-B", "MODELO NOVO X"], 2_000)
+    resumo = catalogo_engine.resumo_auditoria(base)
+    assert contados == [4, 2]
+    assert resumo.iloc[0].tolist() == ["PCI DISPLAY CM-250", "CAIXA AMPLIFICADA CM-250", "OK", 2]
+    assert resumo.set_index("MODELO")["LINHAS"].to_dict()["MODELO NOVO X"] == 2
+
+    # lookup mudou: modelos re-resolvidos sem recontar linhas
+    catalogo_engine.atualizar_catalogo(pd.DataFrame({
+        "MODELO_DEFEITO": ["CONTROLE REMOTO TV"], "SE_TRATA_DE": ["ACESSORIO"],
+        "CORRESPONDE_A": ["BOOMBOX AWS-BBS-01-B"], "MODELO_PRODUCAO": ["BOOMBOX AWS-BBS-01-B BIVOLT"],
+    }))
+    status = catalogo_engine.status_auditoria(base)
+    assert contados == [4, 2]
+    assert (status["ok"], status["linhas_ok"], status["nao_contabilizados"]) == (3, 4, 0)
+    assert catalogo_engine.listar_nao_contabilizados(base)["MODELO"].tolist() == ["MODELO NOVO X"]
+
+    # base reescrita (histórico mudou) e resumo recarregado do disco: recontagem completa
+    monkeypatch.setattr(catalogo_engine, "_AUDITORIA", None)
+    gravar(["MODELO NOVO X", "BOOMBOX AWS-BBS-01-B"], 3_000)
+    assert catalogo_engine.status_auditoria(base)["linhas_total"] == 2
+    assert contados == [4, 2, 2]
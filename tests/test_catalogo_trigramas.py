@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+from app.core import catalogo_engine, catalogo_trigramas
+
+
+@pytest.fixture
+def catalogo_tmp(tmp_path, monkeypatch):
+    oficial = tmp_path / "catalogo_modelos.csv"
+    pd.DataFrame({
+        "MODELOS DEFEITOS": ["PCI DISPLAY CM-250 - IM", "PCI FONTE CM-400 - IM", "MICRO-ONDAS MO-01-21-B 127V/60HZ"],
+        "SE TRATA DE": ["SEMI ACABADO", "SEMI ACABADO", "PRODUTO ACABADO"],
+        "CORRESPONDE A": ["CAIXA AMPLIFICADA CM-250 BIVOLT", "CAIXA AMPLIFICADA CM-400 BIVOLT", ""],
+        "MODELOS PRODUCAO": ["CAIXA AMPLIFICADA CM-250 BIVOLT", "", "MICRO-ONDAS MO-01-21-B 127V/60HZ"],
+    }).to_csv(oficial, index=False)
+    monkeypatch.setattr(catalogo_engine, "CANDIDATE_FILES", [oficial])
+    monkeypatch.setattr(catalogo_engine, "LOOKUP_PATH", tmp_path / "catalogo_lookup.parquet")
+    monkeypatch.setattr(catalogo_trigramas, "INDEX_PATH", tmp_path / "trigramas")
+    monkeypatch.setattr(catalogo_trigramas, "_INDICE", None)
+    catalogo_engine.invalidar_resolver()
+    yield tmp_path
+    catalogo_engine.invalidar_resolver()
+
+
+def test_buscar_ranqueia_candidatos_e_lote_igual_individual(catalogo_tmp):
+    indice = catalogo_trigramas.obter_indice(catalogo_tmp / "trigramas")
+
+    candidatos = indice.buscar("pci fonte cm-250 - im", k=2)
+    assert [c["CANDIDATO"] for c in candidatos] == ["PCI FONTE CM-400 - IM", "PCI DISPLAY CM-250 - IM"]
+    assert candidatos[0]["SCORE"] > candidatos[1]["SCORE"]
+    assert candidatos[0]["MODELO_FINAL"] == "CAIXA AMPLIFICADA CM-400 BIVOLT"
+    assert indice.buscar("XYZ") == []
+
+    consultas = pd.Series(["pci fonte cm-250 - im", "MICRO-ONDAS MO-01-21-E 127V/60HZ", None])
+    lote = indice.buscar_lote(consultas, k=2)
+    for consulta in consultas.dropna():
+        esperado = indice.buscar(consulta, k=2)
+        obtido = lote[lote["CONSULTA"] == consulta].drop(columns=["CONSULTA", "RANK"]).to_dict("records")
+        assert obtido == esperado
+
+
+def test_indice_persistido_e_reconstruido_quando_catalogo_muda(catalogo_tmp):
+    indice = catalogo_trigramas.obter_indice(catalogo_tmp / "trigramas")
+    carregado = catalogo_trigramas.IndiceTrigramas.carregar(catalogo_tmp / "trigramas")
+    assert carregado.textos == indice.textos
+    assert carregado.buscar("PCI FONTE CM-250") == indice.buscar("PCI FONTE CM-250")
+
+    catalogo_engine.atualizar_catalogo(pd.DataFrame({
+        "MODELO_DEFEITO": ["PCI FONTE CM-400 - IM"], "SE_TRATA_DE": ["SEMI ACABADO"],
+        "CORRESPONDE_A": ["CAIXA AMPLIFICADA CM-550 BIVOLT"], "MODELO_PRODUCAO": ["CAIXA AMPLIFICADA CM-550 BIVOLT"],
+    }))
+    novo = catalogo_trigramas.obter_indice(catalogo_tmp / "trigramas")
+    assert "CAIXA AMPLIFICADA CM-550 BIVOLT" in novo.textos
+
+
+def test_sugerir_mapeamentos_apenas_para_unknowns(catalogo_tmp):
+    sugestoes = catalogo_trigramas.sugerir_mapeamentos(
+        pd.Series(["PCI DISPLAY CM-250 - IM", "PCI FONTE CM-250 - IM", "PCI FONTE CM-250 - IM"]), k=1)
+    assert sugestoes["CONSULTA"].tolist() == ["PCI FONTE CM-250 - IM"]
+    assert (catalogo_tmp / "trigramas" / "meta.json").exists()
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import socket
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.classifier_service import ClassifierService
+from services.classifier_server import MicroLote, classificar_remoto, iniciar_em_segundo_plano, stats_remoto
+
+
+@pytest.fixture
+def servidor():
+    servidor = iniciar_em_segundo_plano(ClassifierService(), porta=0, max_lote=16, espera_ms=20)
+    yield servidor
+    servidor.parar()
+
+
+def test_servidor_agrupa_pedidos_concorrentes_em_micro_lotes(servidor):
+    svc = servidor.servico
+    chaves = list(svc.lexicon)[:20]
+    pedidos = [[chaves[i % len(chaves)], f"texto desconhecido {i}"] for i in range(40)]
+
+    with ThreadPoolExecutor(20) as ex:
+        respostas = list(ex.map(lambda textos: classificar_remoto(textos, porta=servidor.porta), pedidos))
+
+    assert respostas == [svc.predict_batch(textos) for textos in pedidos]
+    stats = stats_remoto(porta=servidor.porta)
+    assert stats["pedidos"] == 40 and stats["textos"] == 80
+    assert stats["lotes"] < 40
+    assert 2 <= stats["lote_max"] <= 16 + 2
+    assert stats["latencia_ms_p95"] > 0
+
+
+def test_servidor_rotas_invalidas(servidor):
+    base = f"http://127.0.0.1:{servidor.porta}"
+    with urllib.request.urlopen(f"{base}/saude") as resp:
+        assert json.loads(resp.read()) == {"status": "ok"}
+    with pytest.raises(urllib.error.HTTPError) as erro:
+        urllib.request.urlopen(urllib.request.Request(f"{base}/classificar", data=b"{}", method="POST"))
+    assert erro.value.code == 400
+    with pytest.raises(urllib.error.HTTPError) as erro:
+        urllib.request.urlopen(f"{base}/nada")
+    assert erro.value.code == 404
+
+
+def test_servidor_rejeita_itens_invalidos_e_content_length_malformado(servidor):
+    base = f"http://127.0.0.1:{servidor.porta}"
+    for corpo in ({"textos": [["x"]]}, {"textos": [{}]}, {"textos": ["ok", 3]}):
+        with pytest.raises(urllib.error.HTTPError) as erro:
+            urllib.request.urlopen(urllib.request.Request(
+                f"{base}/classificar", data=json.dumps(corpo).encode(), method="POST"))
+        assert erro.value.code == 400
+
+    with socket.create_connection(("127.0.0.1", servidor.porta), timeout=5) as sock:
+        sock.sendall(b"POST /classificar HTTP/1.1\r\nContent-Length: abc\r\n\r\n")
+        assert sock.recv(1024).startswith(b"HTTP/1.1 400")
+
+
+def test_servidor_responde_cabecalho_grande_e_corpo_truncado(servidor):
+    with socket.create_connection(("127.0.0.1", servidor.porta), timeout=5) as sock:
+        sock.sendall(b"GET /saude HTTP/1.1\r\nX-Longo: " + b"a" * (128 * 1024) + b"\r\n\r\n")
+        assert sock.recv(1024).startswith(b"HTTP/1.1 413")
+
+    with socket.create_connection(("127.0.0.1", servidor.porta), timeout=5) as sock:
+        sock.sendall(b"POST /classificar HTTP/1.1\r\nContent-Length: 100\r\n\r\n{\"textos\": []}")
+        sock.shutdown(socket.SHUT_WR)
+        assert sock.recv(1024).startswith(b"HTTP/1.1 400")
+
+    with urllib.request.urlopen(f"http://127.0.0.1:{servidor.porta}/saude") as resp:
+        assert resp.status == 200
+
+
+def test_micro_lote_isola_pedido_que_falha():
+    def processar(textos):
+        if "ruim" in textos:
+            raise ValueError("texto ruim")
+        return [t.upper() for t in textos]
+
+    async def rodar():
+        lote = MicroLote(processar, max_lote=16, espera_ms=50)
+        lote.iniciar()
+        try:
+            return await asyncio.gather(lote.classificar(["a"]), lote.classificar(["ruim"]),
+                                        lote.classificar(["b", "c"]), return_exceptions=True)
+        finally:
+            await lote.encerrar()
+
+    a, ruim, bc = asyncio.run(rodar())
+    assert a == ["A"] and bc == ["B", "C"]
+    assert isinstance(ruim, ValueError)
+
+
+def test_iniciar_em_segundo_plano_repassa_falha_ao_subir(servidor):
+    with pytest.raises(OSError):
+        iniciar_em_segundo_plano(servidor.servico, porta=servidor.porta)
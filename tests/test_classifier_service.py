@@ -0,0 +1,167 @@
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.classifier_service import (
+    LIMIAR_CONFIANCA, CachePredicoes, ClassifierService, fila_revisao, limiar_para_precisao,
+)
+from services.text_normalizer import normalizar_texto
+
+
+def test_predict_batch_igual_predict():
+    svc = ClassifierService()
+    chave_lexicon = next(iter(svc.lexicon))
+    textos = [chave_lexicon, chave_lexicon.lower().replace("_", " "), "", None, float("nan"), 0,
+              "ruido estranho na tampa lateral", "RUIDO ESTRANHO NA TAMPA LATERAL", chave_lexicon]
+
+    assert svc.predict_batch(textos) == [svc.predict(t) for t in textos]
+    assert svc.predict_batch([]) == []
+
+
+def test_predict_batch_um_unico_predict_para_os_faltantes(monkeypatch):
+    svc = ClassifierService(compilado=False)
+    chamadas = []
+    predict = svc.model.predict
+    monkeypatch.setattr(svc.model, "predict", lambda x: chamadas.append(x.shape[0]) or predict(x), raising=False)
+
+    svc.predict_batch(["texto novo um", "texto novo dois", "TEXTO NOVO UM", next(iter(svc.lexicon))] * 50)
+    assert chamadas == [2]
+
+
+def test_cache_predicoes_politicas_e_contadores():
+    lru, fifo = CachePredicoes(tamanho=2, politica="lru"), CachePredicoes(tamanho=2, politica="fifo")
+    for cache in (lru, fifo):
+        cache.guardar("A", "1", "v1")
+        cache.guardar("B", "2", "v1")
+        assert cache.obter("A", "v1") == "1"
+        cache.guardar("C", "3", "v1")
+    assert lru.obter("B", "v1") is None and lru.obter("A", "v1") == "1"   # LRU: A foi renovado, sai B
+    assert fifo.obter("A", "v1") is None and fifo.obter("B", "v1") == "2"  # FIFO: sai o mais antigo
+    assert lru.stats()["descartes"] == 1 and lru.stats()["acertos"] == 2 and lru.stats()["faltas"] == 1
+
+    assert lru.obter("A", "v2") is None  # versão nova esvazia
+    assert lru.stats()["invalidacoes"] == 1 and len(lru) == 0
+    with pytest.raises(ValueError):
+        CachePredicoes(politica="lfu")
+
+
+def test_cache_evita_modelo_e_invalida_com_artefato_novo(tmp_path, monkeypatch):
+    from app.core import classifier_service
+    from app.core.model_registry import RegistroArtefatos
+
+    for nome in ("lexicon.json", "classifier_v1.joblib", "tfidf_vectorizer_v1.joblib"):
+        shutil.copy(Path("models") / nome, tmp_path / nome)
+    monkeypatch.setattr(classifier_service, "PATH_LEXICON", tmp_path / "lexicon.json")
+    monkeypatch.setattr(classifier_service, "PATH_MODEL", tmp_path / "classifier_v1.joblib")
+    monkeypatch.setattr(classifier_service, "PATH_VECTORIZER", tmp_path / "tfidf_vectorizer_v1.joblib")
+
+    svc = ClassifierService(registro=RegistroArtefatos(), cache=CachePredicoes(tamanho=100), compilado=False)
+    sem_cache = ClassifierService(registro=svc.registro)
+    chamadas = []
+    predict = svc.model.predict
+    monkeypatch.setattr(svc.model, "predict", lambda x: chamadas.append(x.shape[0]) or predict(x), raising=False)
+
+    textos = ["texto novo um", "texto novo dois"] * 3
+    esperado = [sem_cache.predict(t) for t in textos + ["texto novo tres"]]
+    chamadas.clear()
+    assert [svc.predict(t) for t in textos] == esperado[:-1]
+    assert svc.predict_batch(textos + ["texto novo tres"]) == esperado
+    assert chamadas == [1, 1, 1]  # predict: só as 2 faltas; lote: só o texto inédito
+    assert svc.cache.stats()["acertos"] == 6
+
+    lexicon = json.loads((tmp_path / "lexicon.json").read_text(encoding="utf-8"))
+    lexicon["TEXTO_NOVO_UM"] = "XX"
+    (tmp_path / "lexicon.json").write_text(json.dumps(lexicon), encoding="utf-8")
+    assert svc.predict("texto novo um") == "XX"
+    assert svc.predict("texto novo dois") == esperado[1]
+    assert svc.cache.stats()["invalidacoes"] == 1
+
+
+def test_predict_topk_confere_com_predict_proba_e_roteia():
+    svc = ClassifierService(compilado=False)
+    chave_lexicon = next(iter(svc.lexicon))
+    textos = [chave_lexicon, "ruido estranho na tampa lateral", "", None, "porta nao fecha", "ruido estranho na tampa lateral"]
+
+    topk = svc.predict_topk(textos, k=3, limiar=0.5)
+    assert topk["CODIGO_1"].tolist() == svc.predict_batch(textos)
+    assert topk["ORIGEM"].tolist() == ["LEXICON", "MODELO", "VAZIO", "VAZIO", "MODELO", "MODELO"]
+    assert topk.loc[0, "CONFIANCA"] == 1.0 and topk.loc[0, "ROTA"] == "ACEITO"
+    assert (topk.loc[2:3, "ROTA"] == "REVISAO").all()
+
+    # probabilidades do modelo: as 3 maiores de predict_proba, em ordem decrescente
+    chave = normalizar_texto("porta nao fecha")
+    proba = svc.model.predict_proba(svc.vectorizer.transform([chave]))[0]
+    np.testing.assert_allclose(topk.loc[4, ["PROB_1", "PROB_2", "PROB_3"]].to_numpy(float), np.sort(proba)[::-1][:3])
+    assert topk.loc[4, "ROTA"] == ("ACEITO" if proba.max() >= 0.5 else "REVISAO")
+
+    # compilado (numpy) devolve o mesmo top-k
+    compilado = ClassifierService().predict_topk(textos, k=3, limiar=0.5)
+    assert compilado[["CODIGO_1", "CODIGO_2", "CODIGO_3", "ROTA"]].equals(topk[["CODIGO_1", "CODIGO_2", "CODIGO_3", "ROTA"]])
+
+    df = pd.DataFrame({"ORDEM": range(len(textos)), "TEXTO": textos})
+    fila = fila_revisao(df, topk)
+    assert set(fila["ORDEM"]) == set(np.flatnonzero(topk["ROTA"] == "REVISAO"))
+    assert fila["CONFIANCA"].is_monotonic_increasing
+    assert svc.predict_topk([]).empty
+
+
+def test_limiar_para_precisao_aceita_o_maior_prefixo_preciso():
+    confianca = np.array([0.9, 0.8, 0.8, 0.7, 0.6, 0.5])
+    acertos = np.array([True, True, False, True, False, False])
+    assert limiar_para_precisao(confianca, acertos, 1.0) == (0.9, round(1 / 6, 4))
+    assert limiar_para_precisao(confianca, acertos, 0.75) == (0.7, round(4 / 6, 4))  # empate em 0.8 vai junto
+    assert limiar_para_precisao(confianca, np.zeros(6, dtype=bool), 0.5) == (np.inf, 0.0)
+
+
+def test_limiar_por_versao_calibrado_e_recusa_sem_probabilidade(tmp_path, monkeypatch):
+    monkeypatch.setattr(ClassifierService, "_caminho_limiar", lambda self: tmp_path / f"limiar_{self.modelo}.json")
+    v1, v2 = ClassifierService(modelo="v1"), ClassifierService(modelo="v2")
+    textos = ["porta nao fecha", "ruido estranho na tampa lateral", "display nao acende"]
+
+    # sem calibração: LogisticRegression usa o padrão; LinearSVC não tem probabilidade
+    assert v1.limiar_confianca() == LIMIAR_CONFIANCA
+    assert v2.limiar_confianca() is None
+    with pytest.raises(ValueError, match="sem limiar calibrado"):
+        v2.predict_topk(textos)
+
+    esperado = v2.predict_topk(textos, limiar=0.0, usar_lexicon=False)["CODIGO_1"]
+    calibrado = v2.calibrar_limiar(textos, esperado, precisao=1.0)
+    assert calibrado["cobertura"] == 1.0
+    topk = v2.predict_topk(textos, usar_lexicon=False)
+    assert v2.limiar_confianca() == calibrado["limiar"] == topk["CONFIANCA"].min()
+    assert (topk["ROTA"] == "ACEITO").all()
+
+    # calibração de outro modelo (SHA256 diferente) é ignorada
+    dados = json.loads((tmp_path / "limiar_v2.json").read_text(encoding="utf-8"))
+    (tmp_path / "limiar_v2.json").write_text(json.dumps({**dados, "classifier": "0" * 64}), encoding="utf-8")
+    assert v2.limiar_confianca() is None
+
+
+def test_avaliacao_sombra_igual_a_cada_versao_isolada():
+    from app.core.classifier_service import AvaliacaoSombra
+
+    chave_lexicon = next(iter(ClassifierService().lexicon))
+    textos = [chave_lexicon, "ruido estranho na tampa lateral", "", None, "led nao acende", "led nao acende"]
+    esperado = [ClassifierService().lexicon[chave_lexicon], "X", "", "", "LD1", "LD1"]
+    sombra = AvaliacaoSombra(("v1", "v2"))
+
+    df = sombra.predict_batch(textos)
+    for versao in ("v1", "v2"):
+        assert df[f"CODIGO_{versao}"].tolist() == ClassifierService(modelo=versao).predict_batch(textos)
+        assert df[f"CODIGO_{versao}"].tolist() == ClassifierService(modelo=versao, compilado=False).predict_batch(textos)
+
+    resumo, discordancias = sombra.avaliar(textos, esperado)
+    for versao, acertos in zip(("v1", "v2"), resumo["ACERTOS"]):
+        assert acertos == sum(p == e for p, e in zip(df[f"CODIGO_{versao}"], esperado))
+    diverge = df["CODIGO_v1"] != df["CODIGO_v2"]
+    assert discordancias["LINHAS"].sum() == diverge.sum()
+    assert set(discordancias["TEXTO_NORMALIZADO"]) == set(df.loc[diverge, "TEXTO_NORMALIZADO"])
+
+    # sem lexicon: a chave do lexicon também passa pelos modelos
+    sem_lexicon = sombra.predict_batch([chave_lexicon], usar_lexicon=False)
+    modelo_v2 = ClassifierService(modelo="v2", compilado=False)
+    assert sem_lexicon.loc[0, "CODIGO_v2"] == str(modelo_v2.model.predict(modelo_v2.vectorizer.transform([chave_lexicon]))[0])
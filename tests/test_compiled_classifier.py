@@ -0,0 +1,61 @@
+import shutil
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from app.core import classifier_service
+from app.core.classifier_service import ClassifierService
+from app.core.compiled_classifier import PreditorCompilado, compilar_versao, divergencias, textos_regressao
+from app.core.model_registry import RegistroArtefatos
+
+TEXTOS_EXTRA = ["", "ruido na tampa lateral", "PRATO NAO GIRA", "prato prato nao nao gira", "ÁGUA NA PLACA"]
+
+
+def _copiar_modelos(destino: Path):
+    for nome in ("lexicon.json", "reference_table.parquet", "tfidf_vectorizer_v1.joblib", "classifier_v1.joblib",
+                 "tfidf_vectorizer_v2.joblib", "classifier_v2.joblib"):
+        shutil.copy(Path("models") / nome, destino / nome)
+
+
+def test_compilado_reproduz_predict_do_sklearn(tmp_path):
+    _copiar_modelos(tmp_path)
+    textos = textos_regressao(tmp_path) + TEXTOS_EXTRA
+    for versao in ("v1", "v2"):  # LogisticRegression e LinearSVC
+        vectorizer = joblib.load(tmp_path / f"tfidf_vectorizer_{versao}.joblib")
+        model = joblib.load(tmp_path / f"classifier_{versao}.joblib")
+        destino, meta = compilar_versao(versao, path_models=tmp_path)
+        preditor = PreditorCompilado.carregar(destino)
+
+        assert isinstance(preditor.data, np.memmap) and preditor.data.dtype == np.float32
+        assert divergencias(preditor, vectorizer, model, textos) == 0
+        np.testing.assert_allclose(preditor.decision_function(textos),
+                                   model.decision_function(vectorizer.transform(textos)), atol=1e-5)
+
+        limiar = float(np.median(np.abs(model.coef_)))
+        _, podado = compilar_versao(versao, limiar_poda=limiar, path_models=tmp_path)
+        assert podado["coeficientes_mantidos"] < meta["coeficientes_mantidos"]
+
+
+def test_classifier_service_usa_compilado_so_quando_em_dia(tmp_path, monkeypatch):
+    _copiar_modelos(tmp_path)
+    compilar_versao("v1", path_models=tmp_path)
+    monkeypatch.setattr(classifier_service, "PATH_LEXICON", tmp_path / "lexicon.json")
+    monkeypatch.setattr(classifier_service, "PATH_MODEL", tmp_path / "classifier_v1.joblib")
+    monkeypatch.setattr(classifier_service, "PATH_VECTORIZER", tmp_path / "tfidf_vectorizer_v1.joblib")
+    monkeypatch.setattr(classifier_service, "PATH_COMPILADO", tmp_path / "compiled" / "classifier_v1")
+
+    registro = RegistroArtefatos()
+    svc = ClassifierService(registro=registro)
+    textos = textos_regressao(tmp_path) + TEXTOS_EXTRA
+    resultado = svc.predict_batch(textos)
+    assert svc.preditor_compilado() is not None
+    assert registro.carregamentos == 2  # lexicon + compilado: nenhum .joblib desserializado
+
+    assert resultado == ClassifierService(registro=registro, compilado=False).predict_batch(textos)
+    assert [svc.predict(t) for t in TEXTOS_EXTRA] == resultado[-len(TEXTOS_EXTRA):]
+
+    # .joblib regravado sem nova exportação: compilado desatualizado é ignorado
+    joblib.dump(joblib.load(tmp_path / "classifier_v1.joblib"), tmp_path / "classifier_v1.joblib", compress=3)
+    assert svc.preditor_compilado() is None
+    assert svc.predict_batch(textos) == resultado
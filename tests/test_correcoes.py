@@ -0,0 +1,46 @@
+import pandas as pd
+
+from utils.correcoes import aplicar_correcoes, carregar_correcoes, upsert_correcao, upsert_correcoes
+
+
+def _base():
+    return pd.DataFrame({
+        "DATA": pd.to_datetime(["2025-10-01", "2025-10-02", "2025-10-03"]),
+        "CODIGO": [101, 102, 103],
+        "DESCRICAO": ["PLACA", "TAMPA", "PLACA"],
+        "MODELO_ID": ["CM-250", "NA", "NA"],
+        "PROD_QTY_GERAL": [10.0, None, None],
+    })
+
+
+def test_upsert_substitui_por_chave(tmp_path):
+    db = tmp_path / "correcoes.sqlite"
+    upsert_correcoes(pd.DataFrame({
+        "DATA": ["2025-10-02", "2025-10-03"], "CODIGO": [102, 103], "DESCRICAO": ["TAMPA", "PLACA"],
+        "MODELO_ID": ["MO-01", None], "PROD_QTY_GERAL": [50.0, 30.0],
+    }), path=db)
+    upsert_correcao({"DATA": "2025-10-02", "CODIGO": "102", "DESCRICAO": "TAMPA",
+                     "MODELO_ID": "MO-02", "PROD_QTY_GERAL": 60.0, "OBS": "revisado"}, path=db)
+
+    df_corr = carregar_correcoes(db)
+    assert len(df_corr) == 2
+    assert "OBS" in df_corr.columns
+
+    out = aplicar_correcoes(_base(), df_corr)
+    assert out["MODELO_ID"].tolist() == ["CM-250", "MO-02", "NA"]
+    assert out["PROD_QTY_GERAL"].tolist() == [10.0, 60.0, 30.0]
+    assert out["OBS"].isna().tolist() == [True, False, True]
+    assert out["DESCRICAO_CORR"].tolist()[1:] == ["TAMPA", "PLACA"]
+
+
+def test_aplicar_correcoes_sem_linhas_corrigidas_preserva_a_base(tmp_path):
+    db = tmp_path / "correcoes.sqlite"
+    upsert_correcoes(pd.DataFrame({
+        "DATA": ["2030-01-01"], "CODIGO": [999], "DESCRICAO": ["OUTRA"],
+        "MODELO_ID": ["MO-01"], "PROD_QTY_GERAL": [1.0], "OBS": ["x"],
+    }), path=db)
+
+    base = _base()
+    out = aplicar_correcoes(base, carregar_correcoes(db))
+    pd.testing.assert_frame_equal(out[base.columns], base)
+    assert out["OBS"].isna().all() and out["DESCRICAO_CORR"].isna().all()
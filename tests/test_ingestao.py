@@ -0,0 +1,82 @@
+import os
+
+import pandas as pd
+import pytest
+
+from utils import ingestao
+
+
+@pytest.fixture
+def cache_tmp(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingestao, "PATH_CACHE_EXCEL", tmp_path / "cache")
+    return tmp_path
+
+
+def test_ler_excel_cache_quente_igual_read_excel(cache_tmp, monkeypatch):
+    path = cache_tmp / "defeitos.xlsx"
+    df = pd.DataFrame({
+        "ORDEM": [1, 2, 3],
+        "DATA": ["01/10/2025", "02/10/2025", None],
+        "COMPONENTE": ["0402-59", 130203, None],
+        "QTD": [1.5, 2.0, 3.0],
+    })
+    df.to_excel(path, index=False)
+    esperado = pd.read_excel(path)
+
+    pd.testing.assert_frame_equal(ingestao.ler_excel(path), esperado)
+
+    # leitura quente não toca o openpyxl
+    def _falha(*args, **kwargs):
+        raise AssertionError("read_excel não deveria ser chamado com cache válido")
+
+    monkeypatch.setattr(ingestao.pd, "read_excel", _falha)
+    quente = ingestao.ler_excel(path)
+    pd.testing.assert_frame_equal(quente, esperado)
+    assert quente["COMPONENTE"].map(type).tolist() == esperado["COMPONENTE"].map(type).tolist()
+
+
+def test_ler_excel_recache_quando_planilha_muda(cache_tmp):
+    path = cache_tmp / "prod.xlsx"
+    pd.DataFrame({"MODELO": ["A"], "QTY": [1]}).to_excel(path, index=False)
+    assert ingestao.ler_excel(path)["QTY"].tolist() == [1]
+
+    pd.DataFrame({"MODELO": ["A", "B"], "QTY": [1, 2]}).to_excel(path, index=False)
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert ingestao.ler_excel(path)["QTY"].tolist() == [1, 2]
+
+
+def test_ler_excel_em_blocos_igual_read_excel(cache_tmp):
+    path = cache_tmp / "defeitos.xlsx"
+    pd.DataFrame({
+        "ORDEM": range(1, 8),
+        "COMPONENTE": ["0402-59", 130203, None, "X1", 7, "Y", None],
+        "QTD": [1.5, 2.0, 3.0, 4.0, 5.0, 6.0, 7.5],
+    }).to_excel(path, index=False)
+    esperado = pd.read_excel(path)
+
+    # sem cache: openpyxl read_only; com cache: lotes do Parquet
+    for _ in range(2):
+        blocos = list(ingestao.ler_excel_em_blocos(path, tamanho_bloco=3))
+        assert [len(b) for b in blocos] == [3, 3, 1]
+        pd.testing.assert_frame_equal(pd.concat(blocos, ignore_index=True), esperado)
+        ingestao.ler_excel(path)
+
+
+def test_gravar_aba_so_cai_para_pickle_em_erro_de_tipo_do_arrow(cache_tmp, monkeypatch):
+    import pyarrow as pa
+
+    df = pd.DataFrame({"A": [1, 2]})
+
+    def _tipo_invalido(*args, **kwargs):
+        raise pa.ArrowTypeError("tipo não suportado")
+
+    monkeypatch.setattr(ingestao, "gravar_parquet", _tipo_invalido)
+    assert ingestao._gravar_aba(df, "aba")["formato"] == "pickle"
+
+    def _disco_cheio(*args, **kwargs):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(ingestao, "gravar_parquet", _disco_cheio)
+    with pytest.raises(OSError):
+        ingestao._gravar_aba(df, "aba")
@@ -0,0 +1,63 @@
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import pytest
+
+from app.core.model_registry import ArtefatoCorrompido, RegistroArtefatos
+from utils.checksum import generate_sha256
+
+
+def _avancar_mtime(path, segundos=10):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + segundos * 10**9))
+
+
+def test_registro_carrega_uma_vez_e_troca_versao(tmp_path):
+    path = tmp_path / "classifier_v9.joblib"
+    joblib.dump({"versao": 1}, path)
+    (tmp_path / "classifier_v9.joblib.sha256").write_text(generate_sha256(path))
+    registro = RegistroArtefatos()
+
+    with ThreadPoolExecutor(8) as ex:
+        objetos = list(ex.map(lambda _: registro.obter(path), range(32)))
+    assert registro.carregamentos == 1
+    assert all(o is objetos[0] for o in objetos)
+    assert registro.obter_artefato(path).verificado is True
+
+    # só o mtime mudou: confere o hash, não recarrega
+    _avancar_mtime(path)
+    assert registro.obter(path) is objetos[0] and registro.carregamentos == 1
+
+    # retreino grava versão nova: troca no próximo acesso (sem .sha256 atualizado -> não verificado)
+    joblib.dump({"versao": 2}, path)
+    _avancar_mtime(path, 20)
+    assert registro.obter(path) == {"versao": 2}
+    assert registro.obter_artefato(path).verificado is False
+
+    # arquivo truncado (gravação em andamento): a versão anterior continua servindo
+    path.write_bytes(b"\x80")
+    _avancar_mtime(path, 30)
+    assert registro.obter(path) == {"versao": 2}
+
+    assert registro.obter(tmp_path / "nao_existe.joblib") is None
+
+
+def test_registro_checksum_de_conteudo_do_lexicon_e_modo_estrito(tmp_path, caplog, capsys):
+    lexicon = {"SEM_SOM": "S2", "PRATO_NAO_GIRA": "PT1"}
+    path = tmp_path / "lexicon.json"
+    path.write_text(json.dumps(lexicon, indent=4, ensure_ascii=False), encoding="utf-8")
+    (tmp_path / "lexicon.sha256").write_text(
+        hashlib.sha256(json.dumps(lexicon, sort_keys=True).encode("utf-8")).hexdigest())
+    assert RegistroArtefatos().obter_artefato(path).verificado is True
+
+    (tmp_path / "lexicon.sha256").write_text("0" * 64)
+    with caplog.at_level(logging.WARNING, logger="app.core.model_registry"):
+        assert RegistroArtefatos().obter_artefato(path).verificado is False
+    assert "não confere" in caplog.text
+    assert capsys.readouterr().out == ""
+    with pytest.raises(ArtefatoCorrompido):
+        RegistroArtefatos(estrito=True).obter(path)
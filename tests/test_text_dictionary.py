@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.text_dictionary import (
+    COL_CODIGO, COL_LINHAS, carregar_dicionario, codificar, codificar_serie, decodificar, expandir,
+    salvar_dicionario,
+)
+from services.text_grouper import adicionar_grupo_no_dataframe, agrupar_textos, cluster_dbscan
+from services.text_vectorizer import gerar_tfidf
+
+LINHAS = [
+    "PRATO_NAO_GIRA", "SEM_SOM", "PRATO_NAO_GIRA", "", "\x00A", "RUIDO_NO_PRATO",
+    "SEM_SOM", "PRATO_NAO_GIRA", "PRATO_GIRA_RUIDO", "", "RUIDO_NO_PRATO",
+]
+
+
+def test_codificar_e_expandir_ida_e_volta():
+    codigos, distintos = codificar(LINHAS)
+    assert codigos.dtype == np.int32
+    # "" e "\x00A" continuam distintos (o pd.factorize os juntaria)
+    assert distintos == ["PRATO_NAO_GIRA", "SEM_SOM", "", "\x00A", "RUIDO_NO_PRATO", "PRATO_GIRA_RUIDO"]
+    assert expandir(distintos, codigos) == LINHAS
+
+    codigos, dicionario = codificar_serie(pd.Series(LINHAS, name="DESC_FALHA_CORR"))
+    assert dicionario[COL_CODIGO].tolist() == list(range(6))
+    assert dicionario[COL_LINHAS].tolist() == [3, 2, 2, 1, 2, 1]
+    assert dicionario[COL_LINHAS].sum() == len(LINHAS)
+
+
+def test_salvar_carregar_decodificar(tmp_path):
+    codigos, dicionario = codificar_serie(pd.Series(LINHAS, name="DESC_FALHA_CORR"))
+    dicionario["TEXTO_NORMALIZADO"] = dicionario["DESC_FALHA_CORR"].str.lower()
+    path_linhas = tmp_path / "texto_processado.parquet"
+
+    destino = salvar_dicionario(dicionario, path_linhas)
+    assert destino.name == "texto_processado_dicionario.parquet"
+    df = decodificar(pd.DataFrame({COL_CODIGO: codigos}), carregar_dicionario(path_linhas), ["TEXTO_NORMALIZADO"])
+    assert df["TEXTO_NORMALIZADO"].tolist() == [t.lower() for t in LINHAS]
+
+    with pytest.raises(FileNotFoundError):
+        carregar_dicionario(tmp_path / "outro.parquet")
+
+
+def test_tfidf_dos_distintos_igual_ao_das_linhas():
+    textos = LINHAS[:3] + LINHAS[5:9] + LINHAS[10:]
+    vec_linhas, X_linhas = gerar_tfidf(textos)
+
+    codigos, distintos = codificar(textos)
+    pesos = np.bincount(codigos)
+    vec, X = gerar_tfidf(distintos, pesos=pesos)
+    assert vec.vocabulary_ == vec_linhas.vocabulary_
+    np.testing.assert_allclose(vec.idf_, vec_linhas.idf_)
+    np.testing.assert_allclose(expandir(X, codigos).toarray(), X_linhas.toarray())
+
+
+def test_dbscan_ponderado_igual_ao_das_linhas():
+    rng = np.random.default_rng(0)
+    centros = rng.normal(size=(6, 4))
+    codigos = rng.integers(0, 6, size=60).astype(np.int32)
+    codigos, _ = codificar(codigos)  # códigos densos, na ordem da 1ª linha
+    distintos = centros[np.unique(codigos)] + rng.normal(scale=0.01, size=(6, 4))
+
+    esperado = cluster_dbscan(expandir(distintos, codigos))
+    labels = agrupar_textos(distintos, metodo="dbscan", codigos=codigos)
+    np.testing.assert_array_equal(labels, esperado)
+
+    df = pd.DataFrame({COL_CODIGO: codigos, "EMBEDDING": list(expandir(distintos, codigos))})
+    df = adicionar_grupo_no_dataframe(df, metodo="dbscan")
+    np.testing.assert_array_equal(df["GRUPO_TEXTO"].to_numpy(), esperado)
@@ -0,0 +1,100 @@
+import random
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.text_normalizer import MODOS, normalizar, normalizar_lote, normalizar_serie
+
+
+# -----------------------
+# Variantes originais (referência, copiadas antes da fusão)
+# -----------------------
+def _remover_acentos(texto):
+    nfkd = unicodedata.normalize("NFKD", texto)
+    return "".join([c for c in nfkd if not unicodedata.combining(c)])
+
+
+def ref_classificador(text):
+    if text is None:
+        return ""
+    s = _remover_acentos(str(text).strip())
+    s = re.sub(r"[^\w\s]", " ", s, flags=re.UNICODE)
+    s = re.sub(r"\s+", " ", s).strip()
+    if s == "":
+        return ""
+    s = re.sub(r"_+", "_", s.replace(" ", "_"))
+    return s.upper()
+
+
+def ref_limpeza(texto):
+    if pd.isna(texto):
+        return ""
+    texto = _remover_acentos(texto).upper()
+    texto = re.sub(r"[^A-Z0-9\s]", " ", texto)
+    texto = re.sub(r"\s+", " ", texto).strip()
+    stop = {"DO", "DA", "DE", "UM", "UMA", "NO", "OS", "AS", "PARA", "COM", "QUE", "EM"}
+    return " ".join(t for t in texto.split() if t not in stop)
+
+
+def ref_unificador(s):
+    if pd.isna(s):
+        return ""
+    t = str(s).upper().replace("–", "-").replace("—", "-")
+    t = re.sub(r"[^A-Z0-9\-\s/]", " ", t)
+    return re.sub(r"\s+", " ", t).strip()
+
+
+def ref_catalogo(s):
+    s = "" if pd.isna(s) else str(s).strip()
+    s = " ".join(s.upper().split())
+    s = "".join(ch for ch in s if (ch.isalnum() or ch.isspace() or ch in ["-", "/", ".", "%"]))
+    return " ".join(s.split())
+
+
+REFERENCIAS = {
+    "classificador": ref_classificador,
+    "limpeza": ref_limpeza,
+    "pipeline": lambda t: ref_classificador(ref_limpeza(t)),
+    "unificador": ref_unificador,
+    "catalogo": ref_catalogo,
+}
+
+ALFABETO = (list("aAbzZ09 _-/.%,;:!?()\t\n\r\x0b\x0c\x1c\x85\xa0　\x00")
+            + list("áéíóúãõçÁÉÍÓÚÃÕÇñüßøŁæœ–—´¨ªº²½ﬁℕ①ǰŉΐΣς") + ["do", "DE", " em ", "para", "uma", "UM"])
+
+
+def _textos(n=3000, seed=0):
+    rng = random.Random(seed)
+    textos = ["".join(rng.choice(ALFABETO) for _ in range(rng.randrange(0, 20))) for _ in range(n)]
+    textos += ["", " ", "_", " _ ", "_a_", "a _ b", "Placa   DE vídeo  queimada", "DO DA DE"]
+    textos += [chr(c) for c in range(0, 0x3000, 7)]  # um pouco de tudo no BMP inicial
+    return textos
+
+
+def test_cada_modo_reproduz_a_variante_original():
+    assert set(MODOS) == set(REFERENCIAS)
+    textos = _textos()
+    sem_separador = [t for t in textos if "\x00" not in t]
+    so_ascii = [t for t in sem_separador if t.isascii()]
+    for modo, ref in REFERENCIAS.items():
+        for lote in (textos, sem_separador, so_ascii):  # caminho texto a texto, str.translate e bytes.translate
+            esperado = [ref(t) for t in lote]
+            assert [normalizar(t, modo) for t in lote] == esperado, modo
+            assert normalizar_lote(lote, modo) == esperado, modo
+            assert normalizar_serie(pd.Series(lote, dtype=object), modo).tolist() == esperado, modo
+
+
+def test_nulos_e_nao_textos_como_nas_variantes():
+    valores = [None, np.nan, pd.NA, 5, 3.5, "x"]
+    for modo in ("classificador", "unificador", "catalogo"):
+        esperado = [REFERENCIAS[modo](v) for v in valores]
+        assert normalizar_serie(pd.Series(valores, dtype=object, index=list("abcdef")), modo).tolist() == esperado
+        assert normalizar_lote(valores, modo) == esperado
+    assert normalizar(np.nan, "classificador") == "NAN"  # normalizar_texto só trata None
+    assert normalizar(np.nan, "limpeza") == "" and normalizar(None, "pipeline") == ""
+    assert normalizar_lote([], "catalogo") == []
+    with pytest.raises(ValueError):
+        normalizar("x", "outro")
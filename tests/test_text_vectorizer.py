@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from services.text_similarity import buscar_similares_no_dataframe, top_k_similares
+from services.text_vectorizer import carregar_matriz_tfidf, gerar_tfidf, salvar_matriz_tfidf, tfidf_transform
+
+TEXTOS = ["PRATO_NAO_GIRA", "APARELHO_NAO_LIGA", "SEM_SOM", "PRATO NAO GIRA RUIDO", "RUIDO NO PRATO"]
+
+
+def test_tfidf_esparso_com_denso_opcional(tmp_path):
+    vectorizer, X = gerar_tfidf(TEXTOS)
+    assert sparse.isspmatrix_csr(X)
+    _, X_denso = gerar_tfidf(TEXTOS, denso=True)
+    np.testing.assert_allclose(X.toarray(), X_denso)
+    assert sparse.isspmatrix_csr(tfidf_transform(vectorizer, ["PRATO GIRA"]))
+
+    destino = salvar_matriz_tfidf(X, tmp_path / "tfidf_matrix")
+    assert destino.suffix == ".npz"
+    carregada = carregar_matriz_tfidf(destino)
+    assert sparse.isspmatrix_csr(carregada) and (carregada != X).nnz == 0
+    np.testing.assert_allclose(carregar_matriz_tfidf(destino, denso=True), X_denso)
+
+    # matriz densa antiga (.npy) também volta como CSR
+    np.save(tmp_path / "antiga.npy", X_denso)
+    assert sparse.isspmatrix_csr(carregar_matriz_tfidf(tmp_path / "antiga.npy"))
+
+
+def test_similaridade_esparsa_igual_densa():
+    vectorizer, X = gerar_tfidf(TEXTOS)
+    consulta = tfidf_transform(vectorizer, ["PRATO NAO GIRA"])
+    esparso = top_k_similares(consulta, X, k=3)
+    denso = top_k_similares(consulta.toarray()[0], X.toarray(), k=3)
+    assert [i for i, _ in esparso] == [i for i, _ in denso]
+    np.testing.assert_allclose([s for _, s in esparso], [s for _, s in denso])
+
+    df = pd.DataFrame({"TEXTO_PROCESSADO": TEXTOS, "TFIDF_VETOR": [X[i] for i in range(X.shape[0])]})
+    res = buscar_similares_no_dataframe(df, consulta, coluna_embeddings="TFIDF_VETOR", k=2)
+    assert res["texto_processado"].tolist() == [TEXTOS[i] for i, _ in esparso[:2]]
@@ -20,3 +20,146 @@ def test_unir_bases_minimal():
     assert not merged.empty
     # coluna padronizada existe
     assert "DESC_FALHA" in merged.columns or "DESC_FALHA" in merged.columns
+
+
+def test_extrair_modelo_id_batch_igual_linha_a_linha(tmp_path, monkeypatch):
+    from utils import unificador
+
+    monkeypatch.setattr(unificador, "CACHE_MODELO_ID", tmp_path / "modelo_id.parquet")
+    monkeypatch.setattr(unificador, "_CACHE_MODELO_ID", {})
+
+    modelos = ["BOOMBOX AWS-BBS-01-B BIVOLT", "CAIXA AMPLIFICADA CM-250 BIVOLT"]
+    textos = pd.Series([
+        "MICRO-ONDAS MO-01-21-E 127V/60HZ",
+        "ALTO FALANTE 10POL TW",
+        "PCI FONTE GENERICA",
+        None,
+        "MICRO-ONDAS MO-01-21-E 127V/60HZ",
+    ] * 3)
+
+    esperado = [None if pd.isna(s) else unificador.extrair_modelo_id(str(s), modelos) for s in textos]
+    obtido = unificador.extrair_modelo_id_batch(textos, modelos)
+    assert obtido.tolist() == esperado
+
+    # segunda execução (novo processo simulado) usa o cache persistido em disco
+    assert (tmp_path / "modelo_id.parquet").exists()
+    monkeypatch.setattr(unificador, "_CACHE_MODELO_ID", {})
+    assert unificador.extrair_modelo_id_batch(textos, modelos).tolist() == esperado
+
+
+def test_indice_modelos_mesmo_desempate_da_busca_linear():
+    import random
+    from utils.unificador import IndiceModelos, escolher_por_similaridade
+
+    rnd = random.Random(7)
+    vocab = ["AWS", "BBS", "01", "B", "TV", "32", "CM", "250", "BIVOLT", "MO", ""]
+    modelos = [
+        "-".join(rnd.sample(vocab, rnd.randint(1, 4))) + " " + rnd.choice(vocab)
+        for _ in range(200)
+    ]
+    indice = IndiceModelos(modelos)
+    for _ in range(300):
+        texto = " ".join(rnd.sample(vocab, rnd.randint(1, 5))) + rnd.choice(["", "/", "-"])
+        assert indice.melhor(texto) == escolher_por_similaridade(texto, modelos)
+    assert indice.melhor("SEM TOKEN EM COMUM") == modelos[0]
+    assert IndiceModelos([]).melhor("AWS") is None
+
+
+def _bases_sinteticas():
+    df_prod = pd.DataFrame({
+        "Data": pd.to_datetime(["2025-10-01", "2025-10-02", "2025-11-03", "2025-11-04"]),
+        "Qty_Geral": [100, 50, 70, 30],
+        "Modelo": ["BOOMBOX AWS-BBS-01-B BIVOLT", "CAIXA AMPLIFICADA CM-250 BIVOLT"] * 2,
+    })
+    df_def = pd.DataFrame({
+        "ORDEM": [1, 2, 3, 4],
+        "DATA": ["01/10/2025", "02/10/2025", "03/11/2025", "04/11/2025"],
+        "CODIGO": ["A", "B", "C", "D"],
+        "DESCRICAO": ["BOOMBOX AWS-BBS-01-B BIVOLT", "PCI DISPLAY CM-250 - IM",
+                      "CAIXA AMPLIFICADA", "BOOMBOX AWS-BBS-01-B BIVOLT"],
+    })
+    return df_prod, df_def
+
+
+def test_unir_bases_incremental_igual_rebuild(tmp_path, monkeypatch):
+    from utils import unificador
+
+    monkeypatch.setattr(unificador, "PATH_ESTADO_UNIFICACAO", tmp_path / "estado")
+    monkeypatch.setattr(unificador, "CACHE_MODELO_ID", tmp_path / "modelo_id.parquet")
+    monkeypatch.setattr(unificador, "_CACHE_MODELO_ID", {})
+
+    df_prod, df_def = _bases_sinteticas()
+    pd.testing.assert_frame_equal(
+        unificador.unir_bases_incremental(df_prod, df_def), unificador.unir_bases(df_prod, df_def)
+    )
+
+    # novos defeitos após o watermark, uma linha antiga alterada e produção extra em novembro
+    df_def2 = pd.concat([df_def, pd.DataFrame({
+        "ORDEM": [5], "DATA": ["05/11/2025"], "CODIGO": ["E"], "DESCRICAO": ["CAIXA AMPLIFICADA CM-250"],
+    })], ignore_index=True)
+    df_def2.loc[1, "DESCRICAO"] = "BOOMBOX AWS-BBS-01-B"
+    df_prod2 = pd.concat([df_prod, df_prod.tail(1).assign(Qty_Geral=5)], ignore_index=True)
+
+    pd.testing.assert_frame_equal(
+        unificador.unir_bases_incremental(df_prod2, df_def2), unificador.unir_bases(df_prod2, df_def2)
+    )
+
+
+def test_unir_bases_paralelo_igual_serial(tmp_path, monkeypatch):
+    from utils import unificador
+
+    monkeypatch.setattr(unificador, "CACHE_MODELO_ID", tmp_path / "modelo_id.parquet")
+    monkeypatch.setattr(unificador, "_CACHE_MODELO_ID", {})
+
+    df_prod, df_def = _bases_sinteticas()
+    # linhas fora de ordem cronológica e um mês sem produção
+    df_def = pd.concat([df_def, pd.DataFrame({
+        "ORDEM": [5], "DATA": ["15/01/2026"], "CODIGO": ["E"], "DESCRICAO": ["CAIXA AMPLIFICADA CM-250"],
+    })], ignore_index=True).iloc[[2, 0, 4, 3, 1]].reset_index(drop=True)
+
+    esperado = unificador.unir_bases(df_prod, df_def)
+    pd.testing.assert_frame_equal(unificador.unir_bases_paralelo(df_prod, df_def, workers=2), esperado)
+    pd.testing.assert_frame_equal(unificador.unir_bases_paralelo(df_prod, df_def, workers=1), esperado)
+    assert (tmp_path / "modelo_id.parquet").exists()
+    # o modo serial não inicializa estado de worker no processo pai
+    assert unificador._MODELOS_WORKER is None
+
+
+def test_chave_tipada_equivale_a_chave_textual():
+    from utils.unificador import codificar_modelo_id, materializar_chave_mes
+
+    a, b = codificar_modelo_id(pd.Series([None, "CM-250 ", "NA"]), pd.Series(["CM-250", "NA", None]))
+    assert a.dtype == "int32"
+    assert a.tolist() == [0, 1, 0] and b.tolist() == [1, 0, 0]
+
+    chave = materializar_chave_mes(pd.Series([202510, 202601]), pd.Series(["CM-250 ", None]))
+    assert chave.tolist() == ["2025-10-CM-250", "2026-01-NA"]
+
+
+def test_planilha_de_correcoes_em_blocos_igual_a_inteira(tmp_path, monkeypatch):
+    from utils import unificador
+    from utils.ingestao import gravar_parquet
+
+    monkeypatch.setattr(unificador, "CACHE_MODELO_ID", tmp_path / "modelo_id.parquet")
+    monkeypatch.setattr(unificador, "_CACHE_MODELO_ID", {})
+
+    df_prod, df_def = _bases_sinteticas()
+    df_def = pd.concat([df_def, pd.DataFrame({
+        "ORDEM": [5, 6], "DATA": ["15/01/2026", "16/01/2026"], "CODIGO": ["E", "F"],
+        "DESCRICAO": ["CAIXA AMPLIFICADA CM-250", "FORNO"],
+    })], ignore_index=True)
+    merged = unificador.unir_bases(df_prod, df_def)
+    faltando = merged[merged["PROD_QTY_GERAL"].isna()]
+    assert len(faltando) >= 2
+
+    monkeypatch.setattr(unificador, "CORRECOES_FILE", tmp_path / "inteira.xlsx")
+    unificador.gerar_arquivo_correcoes(merged)
+
+    partes = []
+    for i, parte in enumerate([faltando.iloc[:1], faltando.iloc[1:]]):
+        partes.append(tmp_path / f"part-{i}.parquet")
+        gravar_parquet(parte, partes[-1])
+    monkeypatch.setattr(unificador, "CORRECOES_FILE", tmp_path / "blocos.xlsx")
+    unificador.gerar_arquivo_correcoes_em_blocos(partes, list(merged.columns))
+
+    pd.testing.assert_frame_equal(pd.read_excel(tmp_path / "blocos.xlsx"), pd.read_excel(tmp_path / "inteira.xlsx"))
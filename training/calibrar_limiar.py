@@ -0,0 +1,37 @@
+# training/calibrar_limiar.py
+"""
+Calibra o limiar de confiança do roteamento (ClassifierService.predict_topk) de
+versões já treinadas, sobre uma base rotulada (DESC_FALHA -> COD_FALHA).
+Grava models/limiar_confianca_<versao>.json (amarrado ao SHA256 dos .joblib).
+
+Execução:
+    python -m training.calibrar_limiar --versoes v1 v2 --precisao 0.9
+"""
+import argparse
+import logging
+from pathlib import Path
+
+from app.core.classifier_service import PRECISAO_ALVO, ClassifierService
+from training.train_classifier import BASE_DIR, carregar_base_oficial, preparar_dataset
+
+LOG = logging.getLogger("calibrar")
+logging.basicConfig(level=logging.INFO)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calibra o limiar de confiança por versão do modelo")
+    parser.add_argument("--versoes", nargs="+", default=["v1", "v2"])
+    parser.add_argument("--precisao", type=float, default=PRECISAO_ALVO)
+    parser.add_argument("--base", type=Path, default=BASE_DIR / "data" / "raw" / "base_de_dados_defeitos.xlsx")
+    args = parser.parse_args(argv)
+
+    df = preparar_dataset(carregar_base_oficial(args.base))
+    for versao in args.versoes:
+        calibrado = ClassifierService(modelo=versao).calibrar_limiar(df["DESC_FALHA"], df["COD_FALHA"], args.precisao)
+        LOG.info(f"[CALIBRAR] {versao}: limiar {calibrado['limiar']} "
+                 f"(precisão {calibrado['precisao_alvo']:.0%}, cobertura {calibrado['cobertura']:.1%}, "
+                 f"{calibrado['linhas']} linhas)")
+
+
+if __name__ == "__main__":
+    main()
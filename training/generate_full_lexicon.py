@@ -7,9 +7,9 @@ Execução:
 """
 
 import json
-import pandas as pd
 import hashlib
-from services.text_normalizer import normalizar_texto
+from services.text_normalizer import normalizar_serie
+from utils.ingestao import ler_excel
 from pathlib import Path
 
 BASE_PATH = Path("data/raw/base_de_dados_defeitos.xlsx")
@@ -25,7 +25,7 @@ def gerar_checksum(conteudo: dict) -> str:
 
 def gerar_lexicon_completo():
     print("📌 Carregando catálogo oficial...")
-    df = pd.read_excel(BASE_PATH)
+    df = ler_excel(BASE_PATH)
 
     if "DESC. FALHA" in df.columns:
         df = df.rename(columns={"DESC. FALHA": "DESC_FALHA"})
@@ -35,7 +35,7 @@ def gerar_lexicon_completo():
     print(f"✔ Base carregada: {len(df)} linhas")
 
     # NORMALIZAR TEXTO
-    df["TEXTO_NORMALIZADO"] = df["DESC_FALHA"].astype(str).apply(normalizar_texto)
+    df["TEXTO_NORMALIZADO"] = normalizar_serie(df["DESC_FALHA"].astype(str))
 
     # REMOVER DUPLICATAS — pois diferentes ORDEM podem ter mesma descrição
     df_clean = df[["TEXTO_NORMALIZADO", "COD_FALHA"]].drop_duplicates()
@@ -2,16 +2,16 @@
 # Semeadura total do lexicon a partir da base oficial de defeitos.
 
 import json
-import pandas as pd
 from pathlib import Path
 from services.text_normalizer import normalizar_texto
+from utils.ingestao import ler_excel
 
 PATH_DATA = Path("data/raw/base_de_dados_defeitos.xlsx")
 PATH_LEXICON = Path("models/lexicon.json")
 
 def seed_lexicon():
     print("📌 Carregando base oficial...")
-    df = pd.read_excel(PATH_DATA)
+    df = ler_excel(PATH_DATA)
 
     # renomeações necessárias
     df = df.rename(columns={
@@ -1,15 +1,15 @@
 # BLOCK 6 – Seed Lexicon MASTER (aprendizado 100% oficial)
 import json
-import pandas as pd
 from pathlib import Path
 from services.text_normalizer import normalizar_texto
+from utils.ingestao import ler_excel
 
 PATH_CODES = Path("data/raw/catalogo_codigos_defeitos.xlsx")
 PATH_LEXICON = Path("models/lexicon.json")
 
 def seed_master_lexicon():
     print("📘 Carregando Catálogo Oficial de Códigos…")
-    df = pd.read_excel(PATH_CODES)
+    df = ler_excel(PATH_CODES)
 
     df = df.rename(columns={
         "DESCRIÇÃO DO MATERIAL": "DESC_FALHA",
@@ -7,6 +7,7 @@ Regras:
 - Treinador gera:
     - models/tfidf_vectorizer_v1.joblib
     - models/classifier_v1.joblib
+    - models/limiar_confianca_v1.json (limiar de roteamento calibrado no conjunto de teste)
 - Usa LogisticRegression (leve, determinístico)
 """
 import logging
@@ -20,7 +21,10 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import f1_score, accuracy_score
 
-from services.text_normalizer import normalizar_texto
+from app.core.classifier_service import ClassifierService
+from app.core.compiled_classifier import compilar_versao
+from services.text_normalizer import normalizar_serie
+from utils.ingestao import ler_excel
 
 LOG = logging.getLogger("train")
 logging.basicConfig(level=logging.INFO)
@@ -35,7 +39,7 @@ CLASSIFIER_PATH = MODELS_DIR / "classifier_v1.joblib"
 
 def carregar_base_oficial(path: Path):
     LOG.info(f"Carregando base oficial: {path}")
-    df = pd.read_excel(path)
+    df = ler_excel(path)
     return df
 
 
@@ -52,7 +56,7 @@ def preparar_dataset(df: pd.DataFrame, texto_col: str = "DESC_FALHA", label_col:
     # remover linhas sem label
     df = df.dropna(subset=[label_col, texto_col])
     # criar coluna de texto normalizado
-    df["TEXTO_NORMALIZADO"] = df[texto_col].astype(str).apply(normalizar_texto)
+    df["TEXTO_NORMALIZADO"] = normalizar_serie(df[texto_col].astype(str))
 
     # contar classes
     cnt = Counter(df[label_col].astype(str).tolist())
@@ -81,7 +85,8 @@ def train_and_persist(path_raw: Path, texto_col: str = "DESC_FALHA", label_col:
     X = vectorizer.fit_transform(X_text)
 
     # Split (estratificado)
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.20, stratify=y, random_state=42)
+    X_train, X_test, y_train, y_test, _, textos_test = train_test_split(
+        X, y, df[texto_col].astype(str).tolist(), test_size=0.20, stratify=y, random_state=42)
 
     # Modelo simples e efetivo
     clf = LogisticRegression(max_iter=2000, class_weight="balanced", solver="lbfgs")
@@ -99,6 +104,15 @@ def train_and_persist(path_raw: Path, texto_col: str = "DESC_FALHA", label_col:
     joblib.dump(clf, CLASSIFIER_PATH)
     LOG.info(f"[TRAIN] Modelos salvos em: {TFIDF_PATH} e {CLASSIFIER_PATH}")
 
+    # Formato compilado (inferência sem sklearn no ClassifierService)
+    destino, _ = compilar_versao("v1", path_models=MODELS_DIR)
+    LOG.info(f"[TRAIN] Formato compilado salvo em: {destino}")
+
+    # Limiar de confiança do roteamento (predict_topk), calibrado no conjunto de teste
+    calibrado = ClassifierService(modelo="v1").calibrar_limiar(textos_test, y_test)
+    LOG.info(f"[TRAIN] Limiar de confiança: {calibrado['limiar']} "
+             f"(precisão {calibrado['precisao_alvo']:.0%}, cobertura {calibrado['cobertura']:.1%})")
+
     return {
         "f1_macro": float(f1),
         "accuracy": float(acc),
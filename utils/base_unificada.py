@@ -0,0 +1,222 @@
+# utils/base_unificada.py
+"""
+Armazenamento da base unificada SIGMA-Q v2 — dataset Parquet particionado
+- uma pasta por mês: ANO=2025/MES_NUM=10/part-00000.parquet
+- manifesto.json com colunas, linhas, hash de conteúdo e MODELO_IDs de cada partição
+- salvar reescreve apenas as partições cujo conteúdo mudou (upsert por mês)
+- leitura com poda de partições por ano, mês e modelo
+- EscritorBaseUnificada grava bloco a bloco (vários part-NNNNN.parquet por mês)
+- Excel passa a ser apenas uma exportação opcional
+"""
+
+import hashlib
+import json
+import shutil
+import uuid
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import pandas as pd
+
+from config.config import BASE_UNIFICADA, BASE_UNIFICADA_DIR
+from utils.ingestao import gravar_parquet, ler_parquet
+
+COLUNAS_PARTICAO = ["ANO", "MES_NUM"]
+NULO = "__NULO__"
+
+
+# -----------------------
+# Manifesto
+# -----------------------
+def ler_manifesto(path: Path = BASE_UNIFICADA_DIR) -> dict:
+    """Manifesto do dataset (vazio se ainda não existir)."""
+    p = Path(path) / "manifesto.json"
+    if not p.exists():
+        return {"colunas": [], "particoes": {}}
+    return json.loads(p.read_text(encoding="utf-8"))
+
+
+def _salvar_manifesto(path: Path, manifesto: dict):
+    tmp = path / "manifesto.tmp.json"
+    tmp.write_text(json.dumps(manifesto, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp.replace(path / "manifesto.json")
+
+
+def _valor_particao(v) -> str:
+    return NULO if pd.isna(v) else str(int(v))
+
+
+def nome_particao(ano, mes) -> str:
+    return f"ANO={_valor_particao(ano)}/MES_NUM={_valor_particao(mes)}"
+
+
+def _hash_conteudo(df: pd.DataFrame) -> str:
+    h = hashlib.sha256()
+    h.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+def _modelos(df: pd.DataFrame) -> List[str]:
+    if "MODELO_ID" not in df.columns:
+        return []
+    return sorted(df["MODELO_ID"].dropna().astype(str).unique().tolist())
+
+
+# -----------------------
+# Escrita
+# -----------------------
+def salvar_base_unificada(df: pd.DataFrame, path: Path = BASE_UNIFICADA_DIR) -> List[str]:
+    """
+    Persiste a base unificada particionada por ANO/MES_NUM.
+    Partições com o mesmo conteúdo não são regravadas; partições que deixaram
+    de existir são removidas. Retorna a lista de partições gravadas.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    antigo = ler_manifesto(path)["particoes"]
+    novo = {}
+    gravadas = []
+
+    for (ano, mes), parte in df.groupby(COLUNAS_PARTICAO, dropna=False, sort=True):
+        nome = nome_particao(ano, mes)
+        parte = parte.reset_index(drop=True)
+        h = _hash_conteudo(parte)
+        if antigo.get(nome, {}).get("hash") == h and all((path / nome / a).exists() for a in antigo[nome]["arquivos"]):
+            novo[nome] = antigo[nome]
+            continue
+
+        pasta = path / nome
+        if pasta.exists():
+            shutil.rmtree(pasta)
+        pasta.mkdir(parents=True)
+        gravar_parquet(parte, pasta / "part-00000.parquet")
+        novo[nome] = {"arquivos": ["part-00000.parquet"], "linhas": len(parte), "hash": h, "modelos": _modelos(parte)}
+        gravadas.append(nome)
+
+    for nome in set(antigo) - set(novo):
+        shutil.rmtree(path / nome, ignore_errors=True)
+
+    _salvar_manifesto(path, {"colunas": [str(c) for c in df.columns], "particoes": novo})
+    return gravadas
+
+
+class EscritorBaseUnificada:
+    """
+    Grava a base unificada em blocos (ingestão em streaming).
+    Cada bloco vira um part-NNNNN.parquet novo em cada mês que ele toca; tudo é
+    escrito numa pasta temporária e só substitui o dataset em concluir()
+    (usado como context manager: exceção descarta a gravação).
+    """
+
+    def __init__(self, path: Path = BASE_UNIFICADA_DIR):
+        self.path = Path(path)
+        self.staging = self.path.with_name(f".{self.path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        self.staging.mkdir(parents=True)
+        self.colunas: Optional[List[str]] = None
+        self.particoes: dict = {}
+        self._hashes: dict = {}
+
+    def anexar(self, df: pd.DataFrame):
+        if self.colunas is None:
+            self.colunas = [str(c) for c in df.columns]
+        for (ano, mes), parte in df.groupby(COLUNAS_PARTICAO, dropna=False, sort=True):
+            nome = nome_particao(ano, mes)
+            parte = parte.reset_index(drop=True)
+            info = self.particoes.setdefault(nome, {"arquivos": [], "linhas": 0, "hash": "", "modelos": []})
+            arquivo = f"part-{len(info['arquivos']):05d}.parquet"
+            (self.staging / nome).mkdir(parents=True, exist_ok=True)
+            gravar_parquet(parte, self.staging / nome / arquivo)
+            info["arquivos"].append(arquivo)
+            info["linhas"] += len(parte)
+            info["modelos"] = sorted(set(info["modelos"]).union(_modelos(parte)))
+            self._hashes.setdefault(nome, []).append(_hash_conteudo(parte))
+
+    def concluir(self):
+        for nome, hashes in self._hashes.items():
+            # uma parte só: mesmo hash de salvar_base_unificada (permite pular a regravação depois)
+            self.particoes[nome]["hash"] = hashes[0] if len(hashes) == 1 \
+                else hashlib.sha256("".join(hashes).encode("utf-8")).hexdigest()[:16]
+        _salvar_manifesto(self.staging, {"colunas": self.colunas or [], "particoes": self.particoes})
+
+        antigo = self.path.with_name(f".{self.path.name}.{uuid.uuid4().hex[:8]}.old")
+        if self.path.exists():
+            self.path.rename(antigo)
+        self.staging.rename(self.path)
+        shutil.rmtree(antigo, ignore_errors=True)
+
+    def descartar(self):
+        shutil.rmtree(self.staging, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, tb):
+        if tipo is None:
+            self.concluir()
+        else:
+            self.descartar()
+        return False
+
+
+def exportar_base_unificada_excel(df: pd.DataFrame, path: Path = BASE_UNIFICADA):
+    """Exportação opcional em Excel (limite de ~1M linhas por aba)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_excel(path, index=False)
+
+
+# -----------------------
+# Leitura com poda de partições
+# -----------------------
+def _como_conjunto(valores) -> Optional[set]:
+    if valores is None:
+        return None
+    if isinstance(valores, (str, int)):
+        valores = [valores]
+    return {str(v) for v in valores}
+
+
+def listar_particoes(anos: Optional[Iterable[int]] = None, meses: Optional[Iterable[int]] = None,
+                     modelos: Optional[Iterable[str]] = None, path: Path = BASE_UNIFICADA_DIR) -> List[str]:
+    """Partições (em ordem) que podem conter linhas dos filtros informados."""
+    anos, meses, modelos = _como_conjunto(anos), _como_conjunto(meses), _como_conjunto(modelos)
+    selecionadas = []
+    for nome, info in sorted(ler_manifesto(path)["particoes"].items()):
+        ano, mes = (p.split("=", 1)[1] for p in nome.split("/"))
+        if anos is not None and ano not in anos:
+            continue
+        if meses is not None and mes not in meses:
+            continue
+        if modelos is not None and not modelos.intersection(info["modelos"]):
+            continue
+        selecionadas.append(nome)
+    return selecionadas
+
+
+def ler_base_unificada(anos: Optional[Iterable[int]] = None, meses: Optional[Iterable[int]] = None,
+                       modelos: Optional[Iterable[str]] = None, colunas: Optional[List[str]] = None,
+                       path: Path = BASE_UNIFICADA_DIR) -> pd.DataFrame:
+    """
+    Lê a base unificada tocando apenas as partições necessárias.
+    As linhas vêm agrupadas por mês (ordem original preservada dentro de cada mês).
+    """
+    path = Path(path)
+    manifesto = ler_manifesto(path)
+    alvo = colunas
+    if colunas is not None and modelos is not None and "MODELO_ID" not in colunas:
+        alvo = list(colunas) + ["MODELO_ID"]
+
+    partes = []
+    for nome in listar_particoes(anos, meses, modelos, path):
+        for arquivo in manifesto["particoes"][nome]["arquivos"]:
+            partes.append(ler_parquet(path / nome / arquivo, columns=alvo))
+
+    if not partes:
+        return pd.DataFrame(columns=colunas if colunas is not None else manifesto["colunas"])
+
+    df = pd.concat(partes, ignore_index=True)
+    if modelos is not None:
+        df = df[df["MODELO_ID"].astype(str).isin(_como_conjunto(modelos))].reset_index(drop=True)
+    if alvo is not colunas:
+        df = df[colunas]
+    return df
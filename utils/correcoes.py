@@ -0,0 +1,204 @@
+# utils/correcoes.py
+"""
+Correções manuais SIGMA-Q v2 — armazenamento indexado (SQLite)
+- uma linha por chave DATA + CODIGO + DESCRICAO, identificada por um hash de 64 bits
+- upsert de correções individuais ou em lote, sem regenerar a planilha
+- correcoes_manuais.xlsx continua aceito como canal de entrada: é importado
+  (upsert, primeira ocorrência de cada chave) sempre que o arquivo muda
+- aplicar_correcoes faz o join pelo hash inteiro, sem montar chaves texto
+"""
+
+import json
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from config.config import CORRECOES_DB, CORRECOES_XLSX
+from utils.ingestao import ler_excel
+
+COLUNAS_CHAVE = ["DATA", "CODIGO", "DESCRICAO"]
+
+# Campos que podem ser sobrescritos
+CAMPOS_CORRIGIVEIS = [
+    "MODELO_ID", "ANO", "MES_NUM", "CHAVE_MES",
+    "ANO_PROD", "MES_NUM_PROD", "MODELO_ID_PROD",
+    "PROD_QTY_GERAL"
+]
+
+
+# -----------------------
+# Chave 64 bits
+# -----------------------
+def chave_correcao(df: pd.DataFrame) -> np.ndarray:
+    """
+    Hash int64 de DATA + CODIGO + DESCRICAO (mesma equivalência da antiga chave texto:
+    DATA comparada como data, CODIGO/DESCRICAO comparados como texto).
+    """
+    data = pd.to_datetime(df["DATA"], errors="coerce").astype("datetime64[ns]")
+    partes = pd.DataFrame({"DATA": data.to_numpy()})
+    for c in COLUNAS_CHAVE[1:]:
+        col = df[c]
+        partes[c] = (col if col.dtype == object else col.astype(str)).to_numpy()
+    return pd.util.hash_pandas_object(partes, index=False).to_numpy().view(np.int64)
+
+
+# -----------------------
+# SQLite
+# -----------------------
+def _conectar(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(path)
+    con.execute("CREATE TABLE IF NOT EXISTS meta (nome TEXT PRIMARY KEY, valor TEXT)")
+    return con
+
+
+def _colunas_tabela(con: sqlite3.Connection) -> List[str]:
+    return [r[1] for r in con.execute("PRAGMA table_info(correcoes)")]
+
+
+def _garantir_colunas(con: sqlite3.Connection, colunas: List[str]):
+    existentes = _colunas_tabela(con)
+    if not existentes:
+        defs = ", ".join(f'"{c}"' for c in colunas)
+        con.execute(f'CREATE TABLE correcoes ("CHAVE" INTEGER PRIMARY KEY, {defs})')
+        return
+    for c in colunas:
+        if c not in existentes:
+            con.execute(f'ALTER TABLE correcoes ADD COLUMN "{c}"')
+
+
+def _valor_sql(v):
+    if v is None or (not isinstance(v, str) and pd.isna(v)):
+        return None
+    if isinstance(v, pd.Timestamp):
+        return v.isoformat()
+    if isinstance(v, np.generic):
+        return v.item()
+    return v
+
+
+def upsert_correcoes(df_corr: pd.DataFrame, path: Path = CORRECOES_DB) -> int:
+    """
+    Insere ou substitui correções (uma por chave DATA + CODIGO + DESCRICAO).
+    Dentro do próprio lote, vale a última linha de cada chave.
+    Retorna o número de chaves gravadas.
+    """
+    faltando = [c for c in COLUNAS_CHAVE if c not in df_corr.columns]
+    if faltando:
+        raise ValueError(f"Correções precisam das colunas {faltando}")
+
+    df_corr = df_corr.copy()
+    df_corr["DATA"] = pd.to_datetime(df_corr["DATA"], errors="coerce")
+    df_corr.insert(0, "CHAVE", chave_correcao(df_corr))
+    df_corr = df_corr.drop_duplicates("CHAVE", keep="last")
+
+    colunas = [str(c) for c in df_corr.columns[1:]]
+    linhas = [tuple(_valor_sql(v) for v in row) for row in df_corr.itertuples(index=False, name=None)]
+
+    nomes = ", ".join(f'"{c}"' for c in ["CHAVE"] + colunas)
+    marcas = ", ".join("?" for _ in range(len(colunas) + 1))
+    atualiza = ", ".join(f'"{c}" = excluded."{c}"' for c in colunas)
+    with closing(_conectar(path)) as con, con:
+        _garantir_colunas(con, colunas)
+        con.executemany(
+            f"INSERT INTO correcoes ({nomes}) VALUES ({marcas}) ON CONFLICT(CHAVE) DO UPDATE SET {atualiza}",
+            linhas,
+        )
+    return len(linhas)
+
+
+def upsert_correcao(registro: dict, path: Path = CORRECOES_DB) -> int:
+    """Grava uma única correção (dict com DATA, CODIGO, DESCRICAO e os campos corrigidos)."""
+    return upsert_correcoes(pd.DataFrame([registro]), path=path)
+
+
+def sincronizar_planilha(xlsx: Path = CORRECOES_XLSX, path: Path = CORRECOES_DB) -> bool:
+    """
+    Importa correcoes_manuais.xlsx para o SQLite quando a planilha mudou
+    (tamanho/mtime diferentes da última importação). Retorna True se importou.
+    """
+    if not xlsx.exists():
+        return False
+    st = xlsx.stat()
+    assinatura = json.dumps([str(xlsx.resolve()), st.st_size, st.st_mtime_ns])
+    with closing(_conectar(path)) as con:
+        row = con.execute("SELECT valor FROM meta WHERE nome = 'planilha'").fetchone()
+    if row and row[0] == assinatura:
+        return False
+
+    df_corr = ler_excel(xlsx)
+    df_corr["DATA"] = pd.to_datetime(df_corr["DATA"], errors="coerce")
+    # a planilha sempre valeu pela primeira ocorrência de cada chave
+    df_corr = df_corr[~pd.Series(chave_correcao(df_corr)).duplicated(keep="first").to_numpy()]
+    upsert_correcoes(df_corr, path=path)
+
+    with closing(_conectar(path)) as con, con:
+        con.execute("INSERT OR REPLACE INTO meta (nome, valor) VALUES ('planilha', ?)", (assinatura,))
+    return True
+
+
+def carregar_correcoes(path: Path = CORRECOES_DB) -> pd.DataFrame:
+    """Todas as correções (coluna CHAVE int64 + colunas da planilha/upserts)."""
+    if not path.exists():
+        return pd.DataFrame()
+    with closing(_conectar(path)) as con:
+        if not _colunas_tabela(con):
+            return pd.DataFrame()
+        df_corr = pd.read_sql_query("SELECT * FROM correcoes", con)
+    df_corr["DATA"] = pd.to_datetime(df_corr["DATA"], errors="coerce")
+    return df_corr
+
+
+# -----------------------
+# Aplicação
+# -----------------------
+def _dtype_com_nulos(col: pd.Series):
+    """dtype que a coluna teria depois de um reindex com linhas ausentes (int -> float, ...)."""
+    return col.iloc[:0].reindex([0]).dtype
+
+
+def _com_dtype_comum(original: pd.Series, dtype) -> pd.Series:
+    """Converte a coluna para o dtype que o combine_first com a correção produziria."""
+    alvo = pd.concat([original.iloc[:0], pd.Series(dtype=dtype)]).dtype
+    return original if original.dtype == alvo else original.astype(alvo)
+
+
+def aplicar_correcoes(df: pd.DataFrame, df_corr: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aplica correções SEMPRE sobrescrevendo os campos corrigíveis (valores nulos da
+    correção preservam o original). Demais colunas da correção são anexadas com
+    sufixo _CORR quando já existem na base (mesmo layout do merge anterior).
+    """
+    df = df.copy()
+    df["DATA"] = pd.to_datetime(df["DATA"], errors="coerce")
+
+    # join pelo hash int64 só nas linhas que têm correção; as demais ficam nulas (como no merge left)
+    chaves = chave_correcao(df)
+    mask = np.isin(chaves, df_corr["CHAVE"].to_numpy())
+    alinhado = df_corr.set_index("CHAVE").reindex(chaves[mask])
+    linhas = np.flatnonzero(mask)  # posições (o índice do df pode ter rótulos repetidos)
+    com_ausentes = not mask.all()
+
+    for c in alinhado.columns:
+        valores = alinhado[c]
+        dtype = _dtype_com_nulos(valores) if com_ausentes else valores.dtype
+        if c in CAMPOS_CORRIGIVEIS and c in df.columns:
+            if len(df) and not mask.any():
+                continue  # bloco sem nenhuma correção: mantém o dtype de sempre
+            df[c] = _com_dtype_comum(df[c], dtype)
+            preenchido = valores.notna().to_numpy()
+            if preenchido.any():
+                df.iloc[linhas[preenchido], df.columns.get_loc(c)] = valores.to_numpy()[preenchido]
+        else:
+            nome = f"{c}_CORR" if c in df.columns else c
+            if not com_ausentes:
+                df[nome] = valores.set_axis(df.index)
+                continue
+            df[nome] = pd.Series(index=df.index, dtype=dtype)
+            if mask.any():
+                df.iloc[linhas, df.columns.get_loc(nome)] = valores.to_numpy()
+    return df
@@ -0,0 +1,296 @@
+# utils/ingestao.py
+"""
+Ingestão SIGMA-Q v2 — cache colunar das planilhas brutas
+- cada (planilha, aba) é convertida uma única vez para Parquet em data/processed/cache/excel
+- chave do cache: tamanho + mtime + SHA256 do arquivo
+- tamanho/mtime diferentes com o mesmo conteúdo (hash) apenas atualizam a chave
+- conteúdo diferente invalida todas as abas daquela planilha (re-cache automático)
+- colunas texto com números misturados são gravadas como texto + etiqueta de tipo
+- abas que ainda assim não cabem no Parquet caem para pickle
+- ler_excel_em_blocos entrega a aba em blocos de tamanho fixo (memória limitada
+  pelo tamanho do bloco, não pelo tamanho da planilha)
+"""
+
+import json
+import os
+import uuid
+import hashlib
+from pathlib import Path
+from typing import Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import load_workbook
+
+from config.config import PATH_CACHE
+from utils.checksum import generate_sha256
+
+PATH_CACHE_EXCEL = PATH_CACHE / "excel"
+
+
+# -----------------------
+# Manifesto por planilha
+# -----------------------
+def _prefixo_cache(path: Path) -> str:
+    """Nome base dos arquivos de cache (nome da planilha + hash do caminho absoluto)."""
+    h = hashlib.sha256(str(path.resolve()).encode("utf-8")).hexdigest()[:10]
+    return f"{path.stem}-{h}"
+
+
+def _caminho_manifesto(path: Path) -> Path:
+    return PATH_CACHE_EXCEL / f"{_prefixo_cache(path)}.json"
+
+
+def _ler_manifesto(path: Path) -> Optional[dict]:
+    p = _caminho_manifesto(path)
+    if not p.exists():
+        return None
+    try:
+        return json.loads(p.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _gravar_atomico(destino: Path, escrever):
+    """Grava em arquivo temporário exclusivo e troca de forma atômica."""
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    tmp = destino.with_name(f".{destino.name}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        escrever(tmp)
+        tmp.replace(destino)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def _salvar_manifesto(path: Path, manifesto: dict):
+    conteudo = json.dumps(manifesto, ensure_ascii=False, indent=2)
+    _gravar_atomico(_caminho_manifesto(path), lambda tmp: tmp.write_text(conteudo, encoding="utf-8"))
+
+
+def _remover_abas(manifesto: dict):
+    for info in manifesto.get("abas", {}).values():
+        (PATH_CACHE_EXCEL / info["arquivo"]).unlink(missing_ok=True)
+
+
+def manifesto_atual(path: Union[str, Path]) -> dict:
+    """
+    Retorna o manifesto válido da planilha (tamanho, mtime, sha256, abas em cache).
+    O SHA256 só é recalculado quando tamanho ou mtime mudam.
+    """
+    path = Path(path)
+    st = path.stat()
+    manifesto = _ler_manifesto(path)
+
+    if manifesto and (manifesto["size"], manifesto["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+        return manifesto
+
+    sha = generate_sha256(path)
+    if manifesto and manifesto["sha256"] == sha:
+        # arquivo "tocado" sem mudança de conteúdo: reaproveita as abas
+        manifesto.update(size=st.st_size, mtime_ns=st.st_mtime_ns)
+    else:
+        if manifesto:
+            _remover_abas(manifesto)
+        manifesto = {
+            "origem": str(path.resolve()),
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": sha,
+            "abas": {},
+        }
+    _salvar_manifesto(path, manifesto)
+    return manifesto
+
+
+# -----------------------
+# Conversão aba <-> cache
+# -----------------------
+# colunas texto com números soltos (ex.: COMPONENTE) viram texto + etiqueta de tipo
+_TIPOS_ESCALARES = {str: "s", int: "i", float: "f", bool: "b"}
+_RESTAURAR = {"i": int, "f": float, "b": lambda v: v == "True"}
+_PREFIXO_TIPO = "__tipo__"
+_META_MISTAS = b"sigmaq.colunas_mistas"
+
+
+def _codificar_colunas_mistas(df: pd.DataFrame):
+    """Converte colunas object com tipos escalares misturados em (texto, etiqueta)."""
+    mistas = []
+    out = df
+    for c in df.columns[df.dtypes == object]:
+        if not isinstance(c, str):
+            continue
+        nao_nulos = df[c].dropna()
+        tipos = set(nao_nulos.map(type))
+        if len(tipos) <= 1 or not tipos <= set(_TIPOS_ESCALARES):
+            continue
+        if out is df:
+            out = df.copy()
+        out[_PREFIXO_TIPO + c] = nao_nulos.map(lambda v: _TIPOS_ESCALARES[type(v)]).reindex(df.index)
+        out[c] = nao_nulos.map(lambda v: v if isinstance(v, str) else repr(v)).reindex(df.index)
+        mistas.append(c)
+    return out, mistas
+
+
+def _restaurar_colunas_mistas(df: pd.DataFrame, mistas) -> pd.DataFrame:
+    for c in mistas:
+        tag = df.pop(_PREFIXO_TIPO + c)
+        col = df[c].astype(object)
+        for t, conv in _RESTAURAR.items():
+            m = tag == t
+            if m.any():
+                col[m] = [conv(v) for v in col[m]]
+        df[c] = col
+    return df
+
+
+def gravar_parquet(df: pd.DataFrame, destino: Path):
+    """
+    Grava um DataFrame em Parquet (escrita atômica).
+    Colunas com tipos escalares misturados são codificadas e listadas nos metadados
+    do arquivo, para que ler_parquet devolva exatamente os mesmos valores.
+    """
+    df_arrow, mistas = _codificar_colunas_mistas(df)
+    tabela = pa.Table.from_pandas(df_arrow, preserve_index=False)
+    meta = dict(tabela.schema.metadata or {})
+    meta[_META_MISTAS] = json.dumps(mistas).encode("utf-8")
+    tabela = tabela.replace_schema_metadata(meta)
+    _gravar_atomico(Path(destino), lambda tmp: pq.write_table(tabela, tmp))
+
+
+def ler_parquet(origem: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Lê um Parquet gravado por gravar_parquet (nulos de colunas texto voltam como NaN)."""
+    arquivo = pq.ParquetFile(origem)
+    meta = arquivo.schema_arrow.metadata or {}
+    mistas = json.loads(meta.get(_META_MISTAS, b"[]"))
+    if columns is not None:
+        mistas = [c for c in mistas if c in columns]
+        columns = list(columns) + [_PREFIXO_TIPO + c for c in mistas]
+
+    tabela = arquivo.read(columns=columns)
+    com_nulos = [nome for nome, col in zip(tabela.column_names, tabela.columns) if col.null_count]
+    df = tabela.to_pandas()
+    # read_excel representa células vazias de colunas texto como NaN (o Arrow devolve None)
+    for c in com_nulos:
+        if df[c].dtype == object:
+            df[c] = df[c].where(df[c].notna(), np.nan)
+    return _restaurar_colunas_mistas(df, mistas)
+
+
+def _gravar_aba(df: pd.DataFrame, base: str) -> dict:
+    """
+    Grava a aba em Parquet; se os tipos não couberem no Arrow, usa pickle.
+    Outros erros (disco cheio, permissão, ...) são propagados.
+    """
+    destino = PATH_CACHE_EXCEL / f"{base}.parquet"
+    try:
+        gravar_parquet(df, destino)
+        return {"arquivo": destino.name, "formato": "parquet"}
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        destino = PATH_CACHE_EXCEL / f"{base}.pkl"
+        _gravar_atomico(destino, lambda tmp: df.to_pickle(tmp))
+        return {"arquivo": destino.name, "formato": "pickle"}
+
+
+def _ler_aba(info: dict) -> pd.DataFrame:
+    arquivo = PATH_CACHE_EXCEL / info["arquivo"]
+    if info["formato"] == "pickle":
+        return pd.read_pickle(arquivo)
+    return ler_parquet(arquivo)
+
+
+def ler_excel(path: Union[str, Path], sheet_name: Union[str, int] = 0) -> pd.DataFrame:
+    """
+    Equivalente a pd.read_excel(path, sheet_name=...) lendo através do cache colunar.
+    A primeira leitura converte a aba; as seguintes leem o Parquet (milissegundos).
+    """
+    path = Path(path)
+    manifesto = manifesto_atual(path)
+    chave = str(sheet_name)
+
+    info = manifesto["abas"].get(chave)
+    if info and (PATH_CACHE_EXCEL / info["arquivo"]).exists():
+        return _ler_aba(info)
+
+    df = pd.read_excel(path, sheet_name=sheet_name)
+    base = f"{_prefixo_cache(path)}__{hashlib.sha256(chave.encode('utf-8')).hexdigest()[:8]}"
+    manifesto["abas"][chave] = _gravar_aba(df, base)
+    _salvar_manifesto(path, manifesto)
+    return df
+
+
+# -----------------------
+# Leitura em blocos (memória limitada)
+# -----------------------
+def _valor_celula(v):
+    """Mesma conversão de célula do leitor openpyxl do pandas."""
+    if v is None or v == "":
+        return np.nan
+    if isinstance(v, float) and v.is_integer():
+        return int(v)
+    return v
+
+
+def _bloco_para_df(linhas: list, colunas: List[str]) -> pd.DataFrame:
+    df = pd.DataFrame(linhas, columns=colunas, dtype=object)
+    return df.infer_objects()
+
+
+def _cabecalho(valores) -> List[str]:
+    """Cabeçalho da aba; células vazias no fim da linha (colunas fantasmas) são descartadas."""
+    valores = list(valores)
+    while valores and valores[-1] is None:
+        valores.pop()
+    return [f"Unnamed: {i}" if v is None else str(v) for i, v in enumerate(valores)]
+
+
+def _blocos_openpyxl(path: Path, sheet_name: Union[str, int], tamanho_bloco: int) -> Iterator[pd.DataFrame]:
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+        linhas_iter = ws.iter_rows(values_only=True)
+        colunas = _cabecalho(next(linhas_iter, ()))
+        bloco = []
+        for valores in linhas_iter:
+            if all(v is None for v in valores):
+                continue
+            linha = [_valor_celula(v) for v in valores[:len(colunas)]]
+            bloco.append(linha + [np.nan] * (len(colunas) - len(linha)))
+            if len(bloco) == tamanho_bloco:
+                yield _bloco_para_df(bloco, colunas)
+                bloco = []
+        if bloco:
+            yield _bloco_para_df(bloco, colunas)
+    finally:
+        wb.close()
+
+
+def _blocos_parquet(arquivo: Path, tamanho_bloco: int) -> Iterator[pd.DataFrame]:
+    pf = pq.ParquetFile(arquivo)
+    mistas = json.loads((pf.schema_arrow.metadata or {}).get(_META_MISTAS, b"[]"))
+    for lote in pf.iter_batches(batch_size=tamanho_bloco):
+        com_nulos = [nome for nome, col in zip(lote.schema.names, lote.columns) if col.null_count]
+        df = lote.to_pandas()
+        for c in com_nulos:
+            if df[c].dtype == object:
+                df[c] = df[c].where(df[c].notna(), np.nan)
+        yield _restaurar_colunas_mistas(df, mistas)
+
+
+def ler_excel_em_blocos(path: Union[str, Path], tamanho_bloco: int = 50_000,
+                        sheet_name: Union[str, int] = 0) -> Iterator[pd.DataFrame]:
+    """
+    Itera a aba em DataFrames de até tamanho_bloco linhas (índice reiniciado em cada bloco).
+    Se a aba já está no cache colunar, lê o Parquet em lotes; caso contrário percorre
+    a planilha com openpyxl read_only (sem carregar o arquivo inteiro).
+    """
+    if tamanho_bloco <= 0:
+        raise ValueError("tamanho_bloco deve ser positivo")
+    path = Path(path)
+    info = manifesto_atual(path)["abas"].get(str(sheet_name))
+    if info and info["formato"] == "parquet" and (PATH_CACHE_EXCEL / info["arquivo"]).exists():
+        yield from _blocos_parquet(PATH_CACHE_EXCEL / info["arquivo"], tamanho_bloco)
+    else:
+        yield from _blocos_openpyxl(path, sheet_name, tamanho_bloco)
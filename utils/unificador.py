@@ -2,33 +2,48 @@
 """
 Unificador SIGMA-Q v2 (corrigido)
 - garante unicidade nas chaves de produção agregada
-- remove duplicatas no arquivo de correções antes de aplicar
+- correções manuais em store SQLite indexado (utils/correcoes.py), planilha importada por upsert
 - geração segura do arquivo de correções (não sobrescreve se já existir)
 - mantém regras do projeto (pequenas funções, docstrings em PT-BR)
 """
 
 from pathlib import Path
+from collections import Counter
+from itertools import chain
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 import re
-from typing import Optional, List
+from typing import Optional, List, Dict, Union
 
-from config.config import FILE_PRODUCAO, FILE_DEFEITOS, BASE_UNIFICADA, BASE_DIR
+from config.config import (
+    FILE_PRODUCAO, FILE_DEFEITOS, BASE_DIR, CACHE_MODELO_ID, PATH_ESTADO_UNIFICACAO,
+    CORRECOES_XLSX,
+)
+from utils.ingestao import ler_excel, ler_excel_em_blocos, gravar_parquet, ler_parquet
+from utils.base_unificada import salvar_base_unificada, exportar_base_unificada_excel, EscritorBaseUnificada
+from utils.correcoes import sincronizar_planilha, carregar_correcoes, aplicar_correcoes
+from services.text_normalizer import normalizar, normalizar_lote
 
 # Base do projeto
 BASE_DIR = Path(__file__).resolve().parents[1]
-CORRECOES_FILE = BASE_DIR / "data" / "processed" / "correcoes_manuais.xlsx"
+CORRECOES_FILE = CORRECOES_XLSX
 
 # -----------------------
 # Leitura
 # -----------------------
 def ler_planilha_producao(path: Path, sheet_name: str = "Plan1") -> pd.DataFrame:
-    """Lê a aba principal da planilha de produção."""
-    return pd.read_excel(path, sheet_name=sheet_name, engine="openpyxl")
+    """Lê a aba principal da planilha de produção (via cache colunar)."""
+    return ler_excel(path, sheet_name=sheet_name)
 
 
 def ler_planilha_defeitos(path: Path) -> pd.DataFrame:
-    """Lê a planilha de defeitos (única aba)."""
-    return pd.read_excel(path)
+    """Lê a planilha de defeitos (única aba, via cache colunar)."""
+    return ler_excel(path)
 
 
 # -----------------------
@@ -51,13 +66,8 @@ def normalizar_colunas(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def normalizar_texto(s: Optional[str]) -> str:
-    if pd.isna(s):
-        return ""
-    t = str(s).upper()
-    t = t.replace("–", "-").replace("—", "-")
-    t = re.sub(r"[^A-Z0-9\-\s/]", " ", t)
-    t = re.sub(r"\s+", " ", t).strip()
-    return t
+    """Caixa alta, travessões -> "-", só A-Z 0-9 - / e espaços simples (modo "unificador")."""
+    return normalizar(s, "unificador")
 
 
 # -----------------------
@@ -95,10 +105,16 @@ def extrair_por_regex(s: str) -> Optional[str]:
     return None
 
 
+_RE_TOKENS = re.compile(r"[\s\-/]+")
+
+
+def tokenizar(s: str) -> set:
+    """Conjunto de tokens usado na similaridade (separadores: espaço, hífen e barra)."""
+    return set(_RE_TOKENS.split(s))
+
+
 def token_overlap(a: str, b: str) -> int:
-    t1 = set(re.split(r"[\s\-/]+", a))
-    t2 = set(re.split(r"[\s\-/]+", b))
-    return len(t1 & t2)
+    return len(tokenizar(a) & tokenizar(b))
 
 
 def escolher_por_similaridade(texto: str, candidatos: List[str]) -> Optional[str]:
@@ -110,14 +126,47 @@ def escolher_por_similaridade(texto: str, candidatos: List[str]) -> Optional[str
     return melhor
 
 
+class IndiceModelos:
+    """
+    Índice invertido token -> modelos da produção.
+    - tokens de cada modelo são calculados uma única vez
+    - só pontua candidatos que compartilham ao menos um token com o texto
+    - mesmo desempate de escolher_por_similaridade (maior score, primeiro da lista)
+    Pode ser passado no lugar da lista de modelos em extrair_modelo_id.
+    """
+
+    def __init__(self, modelos: List[str]):
+        self.modelos = list(modelos)
+        self.indice: Dict[str, List[int]] = {}
+        for i, m in enumerate(self.modelos):
+            for t in tokenizar(m):
+                self.indice.setdefault(t, []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.modelos)
+
+    def __iter__(self):
+        return iter(self.modelos)
+
+    def melhor(self, texto: str) -> Optional[str]:
+        if not self.modelos:
+            return None
+        scores = Counter(chain.from_iterable(self.indice.get(t, ()) for t in tokenizar(texto)))
+        if not scores:
+            # todos empatados com score 0 -> primeiro candidato (como na busca linear)
+            return self.modelos[0]
+        melhor_score = max(scores.values())
+        return self.modelos[min(i for i, sc in scores.items() if sc == melhor_score)]
+
+
 def construir_lista_modelos_producao(df_prod: pd.DataFrame) -> List[str]:
     if "MODELO" not in df_prod.columns:
         return []
     ms = df_prod["MODELO"].dropna().astype(str).unique().tolist()
-    return [normalizar_texto(m) for m in ms]
+    return normalizar_lote(ms, "unificador")
 
 
-def extrair_modelo_id(texto: str, modelos_producao: List[str]) -> Optional[str]:
+def extrair_modelo_id(texto: str, modelos_producao: Union[List[str], IndiceModelos]) -> Optional[str]:
     s = normalizar_texto(texto)
     if not s:
         return None
@@ -141,7 +190,10 @@ def extrair_modelo_id(texto: str, modelos_producao: List[str]) -> Optional[str]:
 
     # 4) similaridade com modelos da produção
     if modelos_producao:
-        pick = escolher_por_similaridade(s, modelos_producao)
+        if isinstance(modelos_producao, IndiceModelos):
+            pick = modelos_producao.melhor(s)
+        else:
+            pick = escolher_por_similaridade(s, modelos_producao)
         if pick:
             r2 = extrair_por_regex(pick)
             return r2 if r2 else pick
@@ -155,16 +207,154 @@ def extrair_modelo_id(texto: str, modelos_producao: List[str]) -> Optional[str]:
     return maior
 
 
+# -----------------------
+# Extração MODELO_ID em lote (valores únicos + cache persistente)
+# -----------------------
+# cache em memória: fingerprint -> {texto: MODELO_ID}
+_CACHE_MODELO_ID: Dict[str, Dict[str, Optional[str]]] = {}
+
+
+def fingerprint_extracao(modelos_producao: List[str]) -> str:
+    """
+    Impressão digital das regras de extração + lista de modelos da produção.
+    A ordem é preservada (o desempate por similaridade depende dela).
+    """
+    payload = json.dumps(
+        {
+            "manual": list(MANUAL_MAP.items()),
+            "keywords": list(KEYWORD_MAP.items()),
+            "regex": REGEX_PATTERNS,
+            "modelos": list(modelos_producao),
+        },
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _carregar_cache_modelo_id(fp: str, usar_cache_disco: bool) -> Dict[str, Optional[str]]:
+    """Retorna o cache {texto: MODELO_ID} do fingerprint (memória -> disco -> vazio)."""
+    if fp in _CACHE_MODELO_ID:
+        return _CACHE_MODELO_ID[fp]
+
+    cache: Dict[str, Optional[str]] = {}
+    if usar_cache_disco and CACHE_MODELO_ID.exists():
+        df_cache = pd.read_parquet(CACHE_MODELO_ID)
+        df_cache = df_cache[df_cache["FINGERPRINT"] == fp]
+        cache = dict(zip(df_cache["TEXTO"], df_cache["MODELO_ID"]))
+
+    _CACHE_MODELO_ID[fp] = cache
+    return cache
+
+
+def _salvar_cache_modelo_id(fp: str, cache: Dict[str, Optional[str]]):
+    """Persiste o cache do fingerprint atual (entradas de fingerprints antigos são descartadas)."""
+    df_cache = pd.DataFrame({
+        "FINGERPRINT": fp,
+        "TEXTO": list(cache.keys()),
+        "MODELO_ID": pd.Series(list(cache.values()), dtype=object),
+    })
+    CACHE_MODELO_ID.parent.mkdir(parents=True, exist_ok=True)
+    tmp = CACHE_MODELO_ID.with_suffix(".tmp.parquet")
+    df_cache.to_parquet(tmp, index=False)
+    tmp.replace(CACHE_MODELO_ID)
+
+
+def extrair_modelo_id_batch(textos: pd.Series, modelos_producao: Union[List[str], IndiceModelos],
+                            usar_cache_disco: bool = True) -> pd.Series:
+    """
+    Versão em lote de extrair_modelo_id:
+    - extrai apenas os textos únicos da coluna
+    - reaproveita resultados anteriores (cache por texto + fingerprint das regras/modelos)
+    - devolve o resultado linha a linha (mesmo índice da entrada)
+    - texto ausente (None/NaN) -> None, igual em pandas 2 e 3
+    """
+    # ausentes ficam fora do factorize: o sentinela -1 indexaria o último texto distinto
+    validos = textos.notna().to_numpy()
+    codigos = np.full(len(textos), -1, dtype=np.int64)
+    codigos[validos], unicos = pd.factorize(textos[validos].astype(str))
+
+    fp = fingerprint_extracao(modelos_producao)
+    cache = _carregar_cache_modelo_id(fp, usar_cache_disco)
+
+    indice = None
+    novos = 0
+    resultados = np.empty(len(unicos), dtype=object)
+    for i, t in enumerate(unicos):
+        if t not in cache:
+            if indice is None:
+                indice = modelos_producao if isinstance(modelos_producao, IndiceModelos) \
+                    else IndiceModelos(modelos_producao)
+            cache[t] = extrair_modelo_id(t, indice)
+            novos += 1
+        resultados[i] = cache[t]
+
+    if novos and usar_cache_disco:
+        _salvar_cache_modelo_id(fp, cache)
+
+    saida = np.full(len(textos), None, dtype=object)
+    saida[validos] = resultados[codigos[validos]]
+    return pd.Series(saida, index=textos.index, dtype=object)
+
+
+# -----------------------
+# Chave tipada (PERIODO int32 + código de MODELO_ID)
+# -----------------------
+def calcular_periodo(ano: pd.Series, mes: pd.Series) -> pd.Series:
+    """Período compacto AAAAMM (int32)."""
+    return (ano.astype(int) * 100 + mes.astype(int)).astype(np.int32)
+
+
+def _como_objeto(coluna: pd.Series) -> pd.Series:
+    """
+    MODELO_ID como dtype object (nulo -> None). No pandas 3 o groupby e a leitura
+    de Parquet inferem StringDtype; todos os caminhos da unificação devolvem object.
+    """
+    return coluna.astype(object).where(coluna.notna(), None)
+
+
+def codificar_modelo_id(*colunas: pd.Series) -> List[np.ndarray]:
+    """
+    Códigos int32 de MODELO_ID com categorias compartilhadas entre as colunas.
+    Mesma equivalência da antiga CHAVE_MES textual: nulo == "NA" e espaços
+    finais são ignorados.
+    """
+    todos = pd.concat([c.fillna("NA") for c in colunas], ignore_index=True)
+    codigos, unicos = pd.factorize(todos)
+    rotulos = pd.Index(unicos.astype(str)).str.rstrip()
+    codigos_rotulo, _ = pd.factorize(rotulos)
+    codigos = codigos_rotulo[codigos].astype(np.int32)
+
+    saida, ini = [], 0
+    for c in colunas:
+        saida.append(codigos[ini:ini + len(c)])
+        ini += len(c)
+    return saida
+
+
+def materializar_chave_mes(periodo: pd.Series, modelo_id: pd.Series) -> pd.Series:
+    """CHAVE_MES textual (AAAA-MM-MODELO_ID) — apenas para exibição/correções."""
+    cod_p, unicos_p = pd.factorize(periodo)
+    cod_m, unicos_m = pd.factorize(modelo_id.fillna("NA"))
+    cod_par, unicos_par = pd.factorize(cod_p.astype(np.int64) * max(len(unicos_m), 1) + cod_m)
+
+    rotulos = np.empty(len(unicos_par), dtype=object)
+    for i, par in enumerate(unicos_par):
+        p, m = unicos_p[par // max(len(unicos_m), 1)], unicos_m[par % max(len(unicos_m), 1)]
+        rotulos[i] = f"{p // 100}-{p % 100:02d}-{m}".rstrip()
+    return pd.Series(rotulos[cod_par], index=periodo.index, dtype=object)
+
+
 # -----------------------
 # Produção mensal — agregação e limpeza
 # -----------------------
-def preparar_producao_mensal(df_prod: pd.DataFrame, modelos_producao: List[str]) -> pd.DataFrame:
+def preparar_producao_mensal(df_prod: pd.DataFrame, modelos_producao: List[str],
+                             usar_cache_disco: bool = True) -> pd.DataFrame:
     """Extrai MODELO_ID da produção e soma produção por (ANO, MES, MODELO_ID)."""
     df = df_prod.copy()
     df = normalizar_colunas(df)
 
     df["DATA"] = pd.to_datetime(df["DATA"], errors="coerce", dayfirst=True)
-    df["MODELO_ID"] = df["MODELO"].astype(str).apply(lambda s: extrair_modelo_id(s, modelos_producao))
+    df["MODELO_ID"] = extrair_modelo_id_batch(df["MODELO"], modelos_producao, usar_cache_disco)
     df["ANO"] = df["DATA"].dt.year
     df["MES_NUM"] = df["DATA"].dt.month
 
@@ -175,52 +365,37 @@ def preparar_producao_mensal(df_prod: pd.DataFrame, modelos_producao: List[str])
         .reset_index()
     )
 
-    df_agg["CHAVE_MES"] = (
-        df_agg["ANO"].astype(int).astype(str)
-        + "-"
-        + df_agg["MES_NUM"].astype(int).astype(str).str.zfill(2)
-        + "-"
-        + df_agg["MODELO_ID"].fillna("NA").astype(str)
-    )
-
     df_agg = df_agg.rename(columns={"QTY_GERAL": "PROD_QTY_GERAL"})
+    df_agg["MODELO_ID"] = _como_objeto(df_agg["MODELO_ID"])
+    df_agg["PERIODO"] = calcular_periodo(df_agg["ANO"], df_agg["MES_NUM"])
 
-    # segurança: garantir uma única linha por CHAVE_MES
-    df_agg = df_agg.drop_duplicates(subset=["CHAVE_MES"], keep="last").reset_index(drop=True)
-
-    # limpar espaços acidentais na chave
-    df_agg["CHAVE_MES"] = df_agg["CHAVE_MES"].astype(str).str.strip()
-
-    return df_agg
+    # segurança: garantir uma única linha por (PERIODO, MODELO_ID)
+    (cod_modelo,) = codificar_modelo_id(df_agg["MODELO_ID"])
+    duplicada = pd.DataFrame({"P": df_agg["PERIODO"].to_numpy(), "M": cod_modelo}).duplicated(keep="last")
+    return df_agg[~duplicada.to_numpy()].reset_index(drop=True)
 
 
 # -----------------------
-# Preparar defeitos (extrair modelo_id + chave)
+# Preparar defeitos (extrair modelo_id + período)
 # -----------------------
-def preparar_defeitos(df_def: pd.DataFrame, modelos_producao: List[str]) -> pd.DataFrame:
+def preparar_defeitos(df_def: pd.DataFrame, modelos_producao: List[str],
+                      usar_cache_disco: bool = True) -> pd.DataFrame:
     df = df_def.copy()
     df = normalizar_colunas(df)
     df["DATA"] = pd.to_datetime(df["DATA"], errors="coerce", dayfirst=True)
 
-    df["MODELO_ID"] = df["DESCRICAO"].astype(str).apply(lambda s: extrair_modelo_id(s, modelos_producao))
+    df["MODELO_ID"] = extrair_modelo_id_batch(df["DESCRICAO"], modelos_producao, usar_cache_disco)
     df["ANO"] = df["DATA"].dt.year
     df["MES_NUM"] = df["DATA"].dt.month
-
-    df["CHAVE_MES"] = (
-        df["ANO"].astype(int).astype(str)
-        + "-"
-        + df["MES_NUM"].astype(int).astype(str).str.zfill(2)
-        + "-"
-        + df["MODELO_ID"].fillna("NA").astype(str)
-    )
-    df["CHAVE_MES"] = df["CHAVE_MES"].astype(str).str.strip()
+    df["PERIODO"] = calcular_periodo(df["ANO"], df["MES_NUM"])
     return df
 
 
 # -----------------------
 # Merge (defeitos <- produção mensal)
 # -----------------------
-def unir_bases(df_prod_raw: pd.DataFrame, df_def_raw: pd.DataFrame) -> pd.DataFrame:
+def preparar_entradas(df_prod_raw: pd.DataFrame, df_def_raw: pd.DataFrame):
+    """Normaliza colunas e datas das duas bases e monta o índice de modelos da produção."""
     # normalizar colunas
     df_prod = normalizar_colunas(df_prod_raw.copy())
     df_def = normalizar_colunas(df_def_raw.copy())
@@ -229,27 +404,43 @@ def unir_bases(df_prod_raw: pd.DataFrame, df_def_raw: pd.DataFrame) -> pd.DataFr
     df_prod["DATA"] = pd.to_datetime(df_prod["DATA"], errors="coerce", dayfirst=True)
     df_def["DATA"] = pd.to_datetime(df_def["DATA"], errors="coerce", dayfirst=True)
 
-    # lista de modelos da produção (texto normalizado)
-    modelos_producao = construir_lista_modelos_producao(df_prod)
+    # lista de modelos da produção (texto normalizado) + índice invertido de tokens
+    modelos_producao = IndiceModelos(construir_lista_modelos_producao(df_prod))
+    return df_prod, df_def, modelos_producao
 
-    # preparar produção mensal (agregada e única por CHAVE_MES)
-    df_prod_mensal = preparar_producao_mensal(df_prod, modelos_producao)
 
-    # preparar defeitos (com CHAVE_MES)
-    df_def_prep = preparar_defeitos(df_def, modelos_producao)
+def unir_preparados(df_def_prep: pd.DataFrame, df_prod_mensal: pd.DataFrame) -> pd.DataFrame:
+    """
+    Merge left dos defeitos preparados com a produção mensal agregada.
+    O join usa a chave tipada (PERIODO int32 + código int32 de MODELO_ID com
+    categorias compartilhadas); CHAVE_MES só é materializada no resultado.
+    """
+    cod_def, cod_prod = codificar_modelo_id(df_def_prep["MODELO_ID"], df_prod_mensal["MODELO_ID"])
+    esquerda = df_def_prep.drop(columns=["PERIODO"])
+    esquerda["__PERIODO__"] = df_def_prep["PERIODO"].to_numpy()
+    esquerda["__MODELO__"] = cod_def
+
+    direita = df_prod_mensal.drop(columns=["PERIODO"])
+    direita["__PERIODO__"] = df_prod_mensal["PERIODO"].to_numpy()
+    direita["__MODELO__"] = cod_prod
 
     # garantir unicidade na tabela de produção antes de merge
-    df_prod_mensal = df_prod_mensal.drop_duplicates(subset=["CHAVE_MES"], keep="last").reset_index(drop=True)
+    direita = direita.drop_duplicates(subset=["__PERIODO__", "__MODELO__"], keep="last")
 
-    # merge left por CHAVE_MES — produção já está agregada (1 linha por CHAVE_MES)
+    # merge left — produção já está agregada (1 linha por chave)
     merged = pd.merge(
-        df_def_prep,
-        df_prod_mensal,
-        on="CHAVE_MES",
+        esquerda,
+        direita,
+        on=["__PERIODO__", "__MODELO__"],
         how="left",
         suffixes=("", "_PROD")
     )
 
+    # CHAVE_MES para exibição, na mesma posição de antes (após MES_NUM)
+    chave = materializar_chave_mes(merged["__PERIODO__"], merged["MODELO_ID"])
+    merged = merged.drop(columns=["__PERIODO__", "__MODELO__"])
+    merged.insert(merged.columns.get_loc("MES_NUM") + 1, "CHAVE_MES", chave)
+
     # limpeza final: garantir colunas e tipos
     if "PROD_QTY_GERAL" in merged.columns:
         merged["PROD_QTY_GERAL"] = pd.to_numeric(merged["PROD_QTY_GERAL"], errors="coerce")
@@ -257,6 +448,227 @@ def unir_bases(df_prod_raw: pd.DataFrame, df_def_raw: pd.DataFrame) -> pd.DataFr
     return merged
 
 
+def unir_bases(df_prod_raw: pd.DataFrame, df_def_raw: pd.DataFrame) -> pd.DataFrame:
+    df_prod, df_def, modelos_producao = preparar_entradas(df_prod_raw, df_def_raw)
+
+    # preparar produção mensal (agregada e única por período + modelo)
+    df_prod_mensal = preparar_producao_mensal(df_prod, modelos_producao)
+
+    # preparar defeitos (com PERIODO)
+    df_def_prep = preparar_defeitos(df_def, modelos_producao)
+
+    return unir_preparados(df_def_prep, df_prod_mensal)
+
+
+# -----------------------
+# Unificação paralela (shards por ANO/MES_NUM)
+# -----------------------
+_MODELOS_WORKER: Optional[IndiceModelos] = None
+_SEMENTE_WORKER: set = set()
+
+
+def _iniciar_worker(modelos: List[str], cache: Dict[str, Optional[str]]):
+    """Monta o índice de modelos uma vez por processo e semeia o cache em memória."""
+    global _MODELOS_WORKER, _SEMENTE_WORKER
+    _MODELOS_WORKER = IndiceModelos(modelos)
+    _CACHE_MODELO_ID[fingerprint_extracao(_MODELOS_WORKER)] = dict(cache)
+    _SEMENTE_WORKER = set(cache)
+
+
+def _unir_shard(df_def: pd.DataFrame, df_prod: pd.DataFrame):
+    """
+    Unifica um mês: agrega a produção do mês, prepara os defeitos e faz o merge.
+    Workers não gravam o cache em disco; devolvem as extrações novas ao processo pai.
+    """
+    df_prod_mensal = preparar_producao_mensal(df_prod, _MODELOS_WORKER, usar_cache_disco=False)
+    df_def_prep = preparar_defeitos(df_def, _MODELOS_WORKER, usar_cache_disco=False)
+    merged = unir_preparados(df_def_prep, df_prod_mensal)
+
+    cache = _CACHE_MODELO_ID[fingerprint_extracao(_MODELOS_WORKER)]
+    novos = {t: m for t, m in cache.items() if t not in _SEMENTE_WORKER}
+    _SEMENTE_WORKER.update(novos)
+    return merged, novos
+
+
+def _shards_por_mes(df_prod: pd.DataFrame, df_def: pd.DataFrame):
+    """Pares (defeitos do mês, produção do mês) em ordem de (ANO, MES_NUM)."""
+    chave_def = [df_def["DATA"].dt.year, df_def["DATA"].dt.month]
+    chave_prod = [df_prod["DATA"].dt.year.rename("ANO"), df_prod["DATA"].dt.month.rename("MES")]
+    prod_por_mes = {k: g for k, g in df_prod.groupby(chave_prod, dropna=False, sort=False)}
+
+    for k, g in df_def.groupby(chave_def, dropna=False, sort=True):
+        yield g, prod_por_mes.get(k, df_prod.iloc[:0])
+
+
+def unir_bases_paralelo(df_prod_raw: pd.DataFrame, df_def_raw: pd.DataFrame,
+                        workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    unir_bases em paralelo: defeitos e produção são divididos por (ANO, MES_NUM) e
+    cada mês (produção mensal + preparar_defeitos + merge) roda num ProcessPoolExecutor.
+    O resultado é concatenado na ordem dos meses e reordenado para a ordem original
+    das linhas — idêntico a unir_bases. workers=None usa todos os núcleos.
+    """
+    df_prod, df_def, modelos_producao = preparar_entradas(df_prod_raw, df_def_raw)
+
+    df_def["__POS__"] = np.arange(len(df_def))
+    shards = list(_shards_por_mes(df_prod, df_def))
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(shards) <= 1:
+        # serial: mesmo caminho de unir_bases, sem estado de worker no processo pai
+        df_prod_mensal = preparar_producao_mensal(df_prod, modelos_producao)
+        df_def_prep = preparar_defeitos(df_def.drop(columns=["__POS__"]), modelos_producao)
+        return unir_preparados(df_def_prep, df_prod_mensal)
+
+    fp = fingerprint_extracao(modelos_producao)
+    cache = _carregar_cache_modelo_id(fp, usar_cache_disco=True)
+    with ProcessPoolExecutor(max_workers=min(workers, len(shards)), initializer=_iniciar_worker,
+                             initargs=(list(modelos_producao), cache)) as pool:
+        resultados = list(pool.map(_unir_shard, *zip(*shards)))
+
+    novos = {}
+    for _, n in resultados:
+        novos.update(n)
+    if novos:
+        cache.update(novos)
+        _salvar_cache_modelo_id(fp, cache)
+
+    merged = pd.concat([m for m, _ in resultados], ignore_index=True)
+    merged = merged.sort_values("__POS__", kind="stable").drop(columns=["__POS__"])
+    # meses sem produção chegam com colunas vazias de outro dtype: alinha com unir_bases
+    for c in ("MODELO_ID", "MODELO_ID_PROD"):
+        if c in merged.columns:
+            merged[c] = merged[c].astype(object)
+    return merged.reset_index(drop=True)
+
+
+# -----------------------
+# Unificação incremental (watermark DATA/ORDEM + meses de produção)
+# -----------------------
+COLUNAS_DERIVADAS = ["MODELO_ID", "ANO", "MES_NUM", "PERIODO"]
+VERSAO_ESTADO = 2
+
+
+def _hash_linhas(df: pd.DataFrame) -> np.ndarray:
+    """Hash 64 bits do conteúdo de cada linha (independente do índice)."""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def _rotulo_mes(datas: pd.Series) -> pd.Series:
+    return datas.dt.strftime("%Y-%m").fillna("NaT")
+
+
+def _hash_meses_producao(df_prod: pd.DataFrame, hashes: np.ndarray) -> Dict[str, str]:
+    """Assinatura de cada mês da produção (multiconjunto das linhas do mês)."""
+    meses = _rotulo_mes(df_prod["DATA"]).to_numpy()
+    out = {}
+    for mes in np.unique(meses):
+        hs = np.sort(hashes[meses == mes])
+        out[str(mes)] = hashlib.sha256(hs.tobytes()).hexdigest()[:16]
+    return out
+
+
+def _calcular_watermark(df_def: pd.DataFrame) -> Optional[dict]:
+    """Maior (DATA, ORDEM) já processado."""
+    if "ORDEM" not in df_def.columns or df_def["DATA"].isna().all():
+        return None
+    ult = df_def.dropna(subset=["DATA"]).sort_values(["DATA", "ORDEM"]).iloc[-1]
+    return {"DATA": ult["DATA"].isoformat(), "ORDEM": int(ult["ORDEM"])}
+
+
+def _acima_watermark(df_def: pd.DataFrame, wm: Optional[dict]) -> np.ndarray:
+    """Linhas estritamente depois do watermark (certamente novas)."""
+    if wm is None or "ORDEM" not in df_def.columns:
+        return np.zeros(len(df_def), dtype=bool)
+    data_wm = pd.Timestamp(wm["DATA"])
+    acima = (df_def["DATA"] > data_wm) | ((df_def["DATA"] == data_wm) & (df_def["ORDEM"] > wm["ORDEM"]))
+    return acima.to_numpy()
+
+
+def _carregar_estado_unificacao(fp: str) -> Optional[dict]:
+    """Estado salvo da última unificação (None se ausente ou de outras regras/modelos)."""
+    path_estado = PATH_ESTADO_UNIFICACAO / "estado.json"
+    if not path_estado.exists():
+        return None
+    estado = json.loads(path_estado.read_text(encoding="utf-8"))
+    if estado.get("fingerprint") != fp or estado.get("versao") != VERSAO_ESTADO:
+        return None
+    for nome in ("producao_mensal", "derivados"):
+        df = ler_parquet(PATH_ESTADO_UNIFICACAO / f"{nome}.parquet")
+        df["MODELO_ID"] = _como_objeto(df["MODELO_ID"])
+        estado[nome] = df
+    return estado
+
+
+def _salvar_estado_unificacao(fp: str, wm: Optional[dict], meses: Dict[str, str],
+                              df_prod_mensal: pd.DataFrame, derivados: pd.DataFrame):
+    PATH_ESTADO_UNIFICACAO.mkdir(parents=True, exist_ok=True)
+    gravar_parquet(df_prod_mensal, PATH_ESTADO_UNIFICACAO / "producao_mensal.parquet")
+    gravar_parquet(derivados, PATH_ESTADO_UNIFICACAO / "derivados.parquet")
+    estado = {"versao": VERSAO_ESTADO, "fingerprint": fp, "watermark": wm, "meses_producao": meses}
+    tmp = PATH_ESTADO_UNIFICACAO / "estado.tmp.json"
+    tmp.write_text(json.dumps(estado, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp.replace(PATH_ESTADO_UNIFICACAO / "estado.json")
+
+
+def unir_bases_incremental(df_prod_raw: pd.DataFrame, df_def_raw: pd.DataFrame,
+                           reconstruir: bool = False, verbose: bool = False) -> pd.DataFrame:
+    """
+    Mesmo resultado de unir_bases, reaproveitando a última execução:
+    - produção: reagrega apenas os meses cujas linhas mudaram
+    - defeitos: extrai MODELO_ID/PERIODO apenas das linhas novas (após o watermark
+      DATA/ORDEM) ou alteradas (hash da linha desconhecido)
+    O estado é descartado (reconstrução completa) quando reconstruir=True ou quando
+    as regras de extração / lista de modelos da produção mudam.
+    """
+    df_prod, df_def, modelos_producao = preparar_entradas(df_prod_raw, df_def_raw)
+    fp = fingerprint_extracao(modelos_producao)
+    estado = None if reconstruir else _carregar_estado_unificacao(fp)
+
+    hash_prod = _hash_linhas(df_prod)
+    hash_def = _hash_linhas(df_def)
+    meses = _hash_meses_producao(df_prod, hash_prod)
+
+    if estado is None:
+        df_prod_mensal = preparar_producao_mensal(df_prod, modelos_producao)
+        df_def_prep = preparar_defeitos(df_def, modelos_producao)
+    else:
+        # 1) produção: apenas meses novos/alterados são reagregados
+        meses_antigos = estado["meses_producao"]
+        alterados = {m for m in set(meses) | set(meses_antigos) if meses.get(m) != meses_antigos.get(m)}
+        prev = estado["producao_mensal"]
+        rotulos_prev = (
+            prev["ANO"].astype(int).astype(str) + "-" + prev["MES_NUM"].astype(int).astype(str).str.zfill(2)
+        )
+        mask_prod = _rotulo_mes(df_prod["DATA"]).isin(alterados).to_numpy()
+        partes = [prev[~rotulos_prev.isin(alterados)]]
+        if mask_prod.any():
+            partes.append(preparar_producao_mensal(df_prod[mask_prod], modelos_producao))
+        df_prod_mensal = pd.concat(partes, ignore_index=True)
+
+        # 2) defeitos: novos (após watermark) ou alterados (hash desconhecido)
+        derivados = estado["derivados"].drop_duplicates("__HASH__").set_index("__HASH__")
+        novos = _acima_watermark(df_def, estado.get("watermark")) | ~np.isin(hash_def, derivados.index.to_numpy())
+
+        partes = [derivados.reindex(hash_def[~novos]).set_axis(np.flatnonzero(~novos))]
+        if novos.any():
+            df_novos = preparar_defeitos(df_def[novos], modelos_producao)
+            partes.append(df_novos[COLUNAS_DERIVADAS].set_axis(np.flatnonzero(novos)))
+        deriv = pd.concat(partes).sort_index()
+
+        df_def_prep = df_def.copy()
+        for c in COLUNAS_DERIVADAS:
+            df_def_prep[c] = deriv[c].set_axis(df_def_prep.index)  # Series: preserva o dtype object
+        if verbose:
+            print(f"[Unificador] incremental: {int(novos.sum())} linhas de defeitos processadas, "
+                  f"{len(alterados)} meses de produção reagregados")
+
+    derivados = df_def_prep[COLUNAS_DERIVADAS].assign(__HASH__=hash_def).drop_duplicates("__HASH__")
+    _salvar_estado_unificacao(fp, _calcular_watermark(df_def), meses, df_prod_mensal, derivados)
+
+    return unir_preparados(df_def_prep, df_prod_mensal)
+
+
 # -----------------------
 # Arquivo de correções (gera apenas se não existir)
 # -----------------------
@@ -277,63 +689,66 @@ def gerar_arquivo_correcoes(df: pd.DataFrame):
     df_faltando.to_excel(CORRECOES_FILE, index=False)
     print(f"Arquivo de correções criado em: {CORRECOES_FILE}")
 
-def aplicar_correcoes_manuais(df: pd.DataFrame) -> pd.DataFrame:
+def gerar_arquivo_correcoes_em_blocos(partes: List[Path], colunas: List[str]):
     """
-    Aplica correções manuais SEMPRE sobrescrevendo (OPÇÃO B).
-    O match é feito por DATA + CODIGO + DESCRICAO.
+    Mesmo arquivo de gerar_arquivo_correcoes, montado a partir de partes Parquet
+    (linhas sem produção de cada bloco): uma parte por vez em memória, planilha
+    gravada em modo write_only do openpyxl.
     """
-    path_corr = BASE_DIR / "data" / "processed" / "correcoes_manuais.xlsx"
-
-    if not path_corr.exists():
-        return df
-
-    df_corr = pd.read_excel(path_corr)
+    if CORRECOES_FILE.exists():
+        return  # não recriar
 
-    # Normalizar tipos
-    df_corr["DATA"] = pd.to_datetime(df_corr["DATA"], errors="coerce")
-    df["DATA"] = pd.to_datetime(df["DATA"], errors="coerce")
+    from openpyxl import Workbook
 
-    # Chave única para merge
-    df["__KEY__"] = df["DATA"].astype(str) + "|" + df["CODIGO"].astype(str) + "|" + df["DESCRICAO"].astype(str)
-    df_corr["__KEY__"] = df_corr["DATA"].astype(str) + "|" + df_corr["CODIGO"].astype(str) + "|" + df_corr["DESCRICAO"].astype(str)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    ws.append(colunas)
+    for parte in partes:
+        df = ler_parquet(parte)
+        df = df.astype(object).where(df.notna(), None)
+        for linha in df.itertuples(index=False, name=None):
+            ws.append([v.to_pydatetime() if isinstance(v, pd.Timestamp) else v for v in linha])
 
-    # Merge
-    df = df.merge(
-        df_corr.drop_duplicates("__KEY__"),
-        on="__KEY__",
-        how="left",
-        suffixes=("", "_CORR")
-    )
+    CORRECOES_FILE.parent.mkdir(parents=True, exist_ok=True)
+    wb.save(CORRECOES_FILE)
+    print(f"Arquivo de correções criado em: {CORRECOES_FILE}")
 
-    # Campos que podem ser sobrescritos
-    campos = [
-        "MODELO_ID", "ANO", "MES_NUM", "CHAVE_MES",
-        "ANO_PROD", "MES_NUM_PROD", "MODELO_ID_PROD",
-        "PROD_QTY_GERAL"
-    ]
 
-    for c in campos:
-        if f"{c}_CORR" in df.columns:
-            df[c] = df[f"{c}_CORR"].combine_first(df[c])
-            df.drop(columns=[f"{c}_CORR"], inplace=True)
+def aplicar_correcoes_manuais(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aplica correções manuais SEMPRE sobrescrevendo (OPÇÃO B).
+    O match é feito por DATA + CODIGO + DESCRICAO (hash 64 bits no store SQLite).
+    A planilha de correções é importada para o store sempre que muda.
+    """
+    sincronizar_planilha()
 
-    df.drop(columns=["__KEY__"], inplace=True)
+    df_corr = carregar_correcoes()
+    if df_corr.empty and not len(df_corr.columns):
+        return df
 
-    return df
+    return aplicar_correcoes(df, df_corr)
 
 # -----------------------
 # Salvar / Orquestrar
 # -----------------------
-def salvar_base_unificada(df: pd.DataFrame, path: Path = BASE_UNIFICADA):
-    path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_excel(path, index=False)
-
-
-def criar_base_unificada(path_prod: Path = FILE_PRODUCAO, path_def: Path = FILE_DEFEITOS) -> pd.DataFrame:
+def criar_base_unificada(path_prod: Path = FILE_PRODUCAO, path_def: Path = FILE_DEFEITOS,
+                         incremental: bool = False, reconstruir: bool = False,
+                         exportar_excel: bool = False, workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Lê as bases, unifica, aplica correções e salva no dataset particionado.
+    incremental=True reaproveita o estado da última execução (reconstruir=True força rebuild completo).
+    workers > 1 unifica em paralelo, um processo por mês (ignorado no modo incremental).
+    exportar_excel=True também gera base_de_dados_unificada.xlsx.
+    """
     df_prod = ler_planilha_producao(path_prod)
     df_def = ler_planilha_defeitos(path_def)
 
-    merged = unir_bases(df_prod, df_def)
+    if incremental:
+        merged = unir_bases_incremental(df_prod, df_def, reconstruir=reconstruir)
+    elif workers and workers > 1:
+        merged = unir_bases_paralelo(df_prod, df_def, workers=workers)
+    else:
+        merged = unir_bases(df_prod, df_def)
 
     # gerar arquivo inicial de correções (se ainda não existir)
     gerar_arquivo_correcoes(merged)
@@ -342,4 +757,55 @@ def criar_base_unificada(path_prod: Path = FILE_PRODUCAO, path_def: Path = FILE_
     merged = aplicar_correcoes_manuais(merged)
 
     salvar_base_unificada(merged)
+    if exportar_excel:
+        exportar_base_unificada_excel(merged)
     return merged   # ← ESTAVA FALTANDO ISSO
+
+
+def criar_base_unificada_em_blocos(path_prod: Path = FILE_PRODUCAO, path_def: Path = FILE_DEFEITOS,
+                                   tamanho_bloco: int = 50_000, verbose: bool = False) -> int:
+    """
+    Versão em streaming de criar_base_unificada para planilhas de defeitos grandes.
+    A produção (pequena) é lida inteira; os defeitos passam em blocos de tamanho_bloco
+    linhas por preparar_defeitos -> merge com a produção mensal -> correções -> gravação.
+    O pico de memória depende do tamanho do bloco, não do tamanho da planilha
+    (as linhas sem produção da planilha inicial de correções vão para partes Parquet
+    temporárias, uma por bloco). Retorna o total de linhas gravadas.
+    """
+    df_prod = normalizar_colunas(ler_planilha_producao(path_prod))
+    df_prod["DATA"] = pd.to_datetime(df_prod["DATA"], errors="coerce", dayfirst=True)
+    modelos_producao = IndiceModelos(construir_lista_modelos_producao(df_prod))
+    df_prod_mensal = preparar_producao_mensal(df_prod, modelos_producao)
+
+    # correções: store carregado uma vez (a planilha inicial só é gerada ao final,
+    # com as linhas sem produção de todos os blocos)
+    gerar_modelo = not CORRECOES_FILE.exists()
+    sincronizar_planilha()
+    df_corr = carregar_correcoes()
+
+    CORRECOES_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix=".sem_producao-", dir=CORRECOES_FILE.parent) as staging:
+        sem_producao: List[Path] = []
+        colunas: Optional[List[str]] = None
+
+        total = 0
+        with EscritorBaseUnificada() as escritor:
+            for bloco in ler_excel_em_blocos(path_def, tamanho_bloco=tamanho_bloco):
+                merged = unir_preparados(preparar_defeitos(bloco, modelos_producao), df_prod_mensal)
+                if gerar_modelo:
+                    colunas = colunas or [str(c) for c in merged.columns]
+                    faltando = merged[merged["PROD_QTY_GERAL"].isna()]
+                    if len(faltando):
+                        parte = Path(staging) / f"part-{len(sem_producao):05d}.parquet"
+                        gravar_parquet(faltando, parte)
+                        sem_producao.append(parte)
+                if len(df_corr.columns):
+                    merged = aplicar_correcoes(merged, df_corr)
+                escritor.anexar(merged)
+                total += len(merged)
+                if verbose:
+                    print(f"[Unificador] bloco gravado: {total} linhas")
+
+        if gerar_modelo and colunas is not None:
+            gerar_arquivo_correcoes_em_blocos(sem_producao, colunas)
+    return total